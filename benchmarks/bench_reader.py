@@ -0,0 +1,136 @@
+"""Benchmark FileReader on synthetic multi-day archives.
+
+Usage: python benchmarks/bench_reader.py [--days 1 7 30] [--rates 30 100]
+    [--formats gt3x agdc] [--workers N] [--data-dir DIR] [--output results.json]
+
+Archives are written with `tests.synthetic` into the data directory, and
+reused by later runs. Each stage is measured in a fresh process, which reports
+the wall time of the stage, the throughput in samples per second, and the peak
+resident set size of the process (including the stages it depends on):
+
+- open: entering the FileReader context, which decodes the archive
+- to_pandas: converting acceleration to a data frame, without calibration
+- calibrate: converting acceleration to a data frame, with calibration
+
+Peak RSS relies on the resource module, which is only available on Unix.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from tests.synthetic import write_archive  # noqa: E402
+from pygt3x.reader import FileReader  # noqa: E402
+
+STAGES = ["open", "to_pandas", "calibrate"]
+DEFAULT_DATA_DIR = os.path.join(ROOT, "benchmarks", "data")
+
+
+def _peak_rss():
+    """Return the peak resident set size of the process, in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(file_name: str, stage: str, workers: int = 1):
+    """Run a stage on a file, returning its wall time and number of samples."""
+    start = time.perf_counter()
+    with FileReader(file_name, workers=workers) as reader:
+        samples = len(reader.samples)
+        if stage == "open":
+            return time.perf_counter() - start, samples
+        start = time.perf_counter()
+        df = reader.to_pandas(calibrate=stage == "calibrate")
+        return time.perf_counter() - start, len(df)
+
+
+def archive(data_dir: str, days: int, rate: int, format: str):
+    """Return the file name of a synthetic archive, writing it if needed."""
+    file_name = os.path.join(data_dir, f"synthetic_{days}d_{rate}hz.{format}")
+    if not os.path.exists(file_name):
+        os.makedirs(data_dir, exist_ok=True)
+        temporary = f"{file_name}.tmp"
+        write_archive(temporary, days * 86400, rate, format)
+        os.rename(temporary, file_name)
+    return file_name
+
+
+def run_stage(file_name: str, stage: str, workers: int):
+    """Measure a stage in a fresh process."""
+    output = subprocess.run(
+        [
+            sys.executable,
+            __file__,
+            "--measure",
+            file_name,
+            stage,
+            "--workers",
+            str(workers),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 7, 30])
+    parser.add_argument("--rates", type=int, nargs="+", default=[30, 100])
+    parser.add_argument("--formats", nargs="+", default=["gt3x", "agdc"])
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Processes decoding each file"
+    )
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--measure", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        seconds, samples = measure(*args.measure, workers=args.workers)
+        print(
+            json.dumps(
+                {"seconds": seconds, "samples": samples, "peak_rss": _peak_rss()}
+            )
+        )
+        return
+
+    results = []
+    print(
+        f"{'format':>6} {'days':>4} {'Hz':>4} {'stage':>10} {'seconds':>9} "
+        f"{'Msamples/s':>10} {'peak RSS MB':>11}"
+    )
+    for format in args.formats:
+        for days in args.days:
+            for rate in args.rates:
+                file_name = archive(args.data_dir, days, rate, format)
+                for stage in args.stages:
+                    result = run_stage(file_name, stage, args.workers)
+                    result.update(format=format, days=days, rate=rate, stage=stage)
+                    result["samples_per_second"] = result["samples"] / result["seconds"]
+                    results.append(result)
+                    print(
+                        f"{format:>6} {days:>4} {rate:>4} {stage:>10} "
+                        f"{result['seconds']:9.2f} "
+                        f"{result['samples_per_second'] / 1e6:10.1f} "
+                        f"{result['peak_rss'] / 2**20:11.0f}",
+                        flush=True,
+                    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
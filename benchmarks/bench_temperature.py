@@ -0,0 +1,78 @@
+"""Benchmark temperature decoding.
+
+Usage: python benchmarks/bench_temperature.py [FILE]
+
+By default, the AGDC file with temperature of the test resources is used.
+"""
+
+import os
+import struct
+import sys
+import timeit
+from zipfile import ZipFile
+
+import numpy as np
+
+from pygt3x import Types
+from pygt3x.activity_payload import read_temperature_payloads
+from pygt3x.log_index import gather_payloads, scan_records
+from pygt3x.reader import FileReader
+
+DEFAULT_FILE = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "tests",
+    "resources",
+    "temperature",
+    "CPW1C48210013_baseline.agdc",
+)
+
+
+def read_temperature_loop(payload_bytes, timestamp):
+    """Decode a temperature payload as was done before vectorization."""
+    data = np.empty((1, 2))
+    for i in range(len(payload_bytes) // 3):
+        sensor = payload_bytes[i * 3]
+        fmt = "<H" if sensor == 0 else "<h"
+        (value,) = struct.unpack(fmt, payload_bytes[i * 3 + 1 : (i + 1) * 3])
+        data[0, sensor] = value
+    return np.concatenate(([[timestamp]], data), axis=1)
+
+
+def main(file_name):
+    with ZipFile(file_name) as zip_file:
+        buffer = zip_file.read("log.bin")
+    index = scan_records(buffer)
+    records = index[index["type"] == Types.TemperatureRecord.value]
+    payloads = gather_payloads(buffer, records)
+    timestamps = records["timestamp"]
+
+    def per_record():
+        return np.concatenate(
+            [
+                read_temperature_loop(payload.tobytes(), timestamp)
+                for payload, timestamp in zip(payloads, timestamps.tolist())
+            ]
+        )
+
+    def batched():
+        return read_temperature_payloads(payloads, timestamps)
+
+    def temperature_only():
+        with FileReader(file_name, streams=["temperature"]) as reader:
+            return reader.temperature
+
+    np.testing.assert_array_equal(per_record(), batched())
+    print(f"{len(records)} temperature records")
+    for name, function in [
+        ("per record", per_record),
+        ("batched", batched),
+        ("temperature only read", temperature_only),
+    ]:
+        number, _ = timeit.Timer(function).autorange()
+        best = min(timeit.repeat(function, number=number, repeat=5)) / number
+        print(f"{name:>22}: {best * 1e3:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FILE)
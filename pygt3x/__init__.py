@@ -38,3 +38,13 @@ class Types(Enum):
     LongPress = 28
     ButtonEvent = 29
     TemperatureRecord = 30
+
+
+from pygt3x.batch import FileResult, read_many  # noqa: E402, F401
+from pygt3x.catalog import (  # noqa: E402, F401
+    FileSummary,
+    inspect,
+    inspect_directory,
+    inspect_many,
+)
+from pygt3x.export import ExportedFile, read_export  # noqa: E402, F401
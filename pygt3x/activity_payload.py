@@ -1,10 +1,45 @@
 """Binary payload parsing."""
 
-import struct
+import io
+from typing import Optional
 
 import numpy as np
+from numpy import typing as npt
 
 NHANES_SCALE = 341
+# Number of bytes holding two NHANES samples of 36 bits
+NHANES_PACK_SIZE = 9
+# Number of NHANES samples decoded at a time
+NHANES_BLOCK_SIZE = 1 << 18
+
+# Acceleration samples, as stored in memory. The time of a sample is its timestamp
+# (in seconds) plus its index within the second divided by the sample rate.
+SAMPLE_DTYPE = np.dtype(
+    [
+        ("timestamp", "<i8"),
+        ("sample", "<u2"),
+        ("x", "<i2"),
+        ("y", "<i2"),
+        ("z", "<i2"),
+        ("idle_sleep_mode", "?"),
+    ]
+)
+
+# Idle sleep mode gaps, as run-length segments. Samples of every second from start
+# (included) to end (excluded), in seconds, hold the same X, Y and Z values.
+ISM_SEGMENT_DTYPE = np.dtype(
+    [
+        ("start", "<i8"),
+        ("end", "<i8"),
+        ("x", "<i2"),
+        ("y", "<i2"),
+        ("z", "<i2"),
+    ]
+)
+
+
+# Sets of 3 bytes of temperature payloads
+TEMPERATURE_DTYPE = np.dtype([("sensor", "u1"), ("value", "<u2")])
 
 
 def unpack_bitpack_acceleration(source: bytes):
@@ -31,18 +66,41 @@ def unpack_bitpack_acceleration(source: bytes):
 
     """
     data = np.frombuffer(source, dtype=np.uint8)
-    if (data.shape[0] % 3) == 1:
-        data = np.pad(data, (0, 2), "constant")
-    fst_uint8, mid_uint8, lst_uint8 = (
-        np.reshape(data, (data.shape[0] // 3, 3)).astype(np.uint16).T
+    return unpack_bitpack_acceleration_records(data.reshape((1, -1)))[0]
+
+
+def unpack_bitpack_acceleration_records(data: npt.NDArray[np.uint8]):
+    """
+    Unpack the 12-bit activity of several payloads of the same size at once.
+
+    This applies the unpacking of `unpack_bitpack_acceleration`, including the
+    padding of odd-length payloads, to every row of `data`.
+
+    Parameters:
+    -----------
+    data:
+        Payload bytes, one row per record
+
+    Returns:
+    --------
+    Acceleration samples as Int16 values, with shape (records, samples, 3)
+
+    """
+    if (data.shape[1] % 3) == 1:
+        data = np.pad(data, ((0, 0), (0, 2)), "constant")
+    fst_uint8, mid_uint8, lst_uint8 = np.moveaxis(
+        np.reshape(data, (data.shape[0], data.shape[1] // 3, 3)).astype(np.uint16),
+        2,
+        0,
     )
     fst_uint12 = (fst_uint8 << 4) + (mid_uint8 >> 4)
     snd_uint12 = ((mid_uint8 % 16) << 8) + lst_uint8
-    concat = np.concatenate((fst_uint12[:, None], snd_uint12[:, None]), axis=1)
-    try:
-        data = concat.reshape((-1, 3))
-    except ValueError:
-        data = concat.reshape((-1))[:-1].reshape((-1, 3))
+    concat = np.stack((fst_uint12, snd_uint12), axis=2).reshape(
+        (data.shape[0], 2 * fst_uint12.shape[1])
+    )
+    if concat.shape[1] % 3 != 0:
+        concat = concat[:, :-1]
+    data = concat.reshape((concat.shape[0], concat.shape[1] // 3, 3))
     data[data > 2047] = data[data > 2047] + 61440
 
     return data.astype(np.int16)
@@ -62,16 +120,45 @@ def unpack_bitpack_temperature(source: bytes):
     Temperature samples as Int16 values
 
     """
-    data = np.empty((1, 2))
-    for i in range(len(source) // 3):
-        sensor = source[i * 3]
-        if sensor == 0:
-            (value,) = struct.unpack("<H", source[i * 3 + 1 : (i + 1) * 3])
-        else:
-            assert sensor == 1
-            (value,) = struct.unpack("<h", source[i * 3 + 1 : (i + 1) * 3])
-        data[0, sensor] = value
-    return data
+    data = np.frombuffer(source, dtype=np.uint8)
+    return unpack_bitpack_temperature_records(data.reshape((1, -1)))
+
+
+def unpack_bitpack_temperature_records(data: npt.NDArray[np.uint8]):
+    """
+    Unpack the temperature of several payloads of the same size at once.
+
+    Each set of 3 bytes holds a sensor number followed by a 16-bit value, which is
+    unsigned for sensor 0 (MCU) and signed for sensor 1 (ADXL). The payloads are
+    viewed as arrays of `TEMPERATURE_DTYPE`, and when a sensor appears several
+    times in a payload, its last value is kept. Sensors missing from a payload are
+    set to NaN.
+
+    Parameters:
+    -----------
+    data:
+        Payload bytes, one row per record
+
+    Returns:
+    --------
+    Temperature values with shape (records, 2), one column per sensor
+
+    """
+    size = data.shape[1] - data.shape[1] % TEMPERATURE_DTYPE.itemsize
+    values = np.ascontiguousarray(data[:, :size]).view(TEMPERATURE_DTYPE)
+    sensor = values["sensor"]
+    assert (sensor <= 1).all()
+    output = np.full((data.shape[0], 2), np.nan)
+    for column, value_type in enumerate(["<u2", "<i2"]):
+        is_sensor = sensor == column
+        # Position of the last value of the sensor in each payload
+        last = sensor.shape[1] - 1 - np.argmax(is_sensor[:, ::-1], axis=1)
+        found = is_sensor.any(axis=1)
+        rows = np.flatnonzero(found)
+        output[rows, column] = (
+            values["value"][rows, last[found]].astype("<u2").view(value_type)
+        )
+    return output
 
 
 def read_nhanes_payload(source, start_date: int, sample_rate: float):
@@ -87,15 +174,228 @@ def read_nhanes_payload(source, start_date: int, sample_rate: float):
     sample_rate:
         Sampling rate
     """
-    payload_bytes = source.read()
-    data = np.round(
-        unpack_bitpack_acceleration(payload_bytes) / NHANES_SCALE, 3
-    ).reshape((-1, 3))
-    data = data[:, [1, 0, 2]]
-    time = ((np.ones(data.shape[0]).cumsum() - 1) / sample_rate) + start_date / 1e9
-    return np.concatenate(
-        (time.reshape((-1, 1)), data, np.zeros((data.shape[0], 1))), axis=1
+    samples = read_nhanes_samples(source, sample_rate)
+    output = samples_to_array(samples, sample_rate, start_date / 1e9)
+    output[:, 1:4] = np.round(output[:, 1:4] / NHANES_SCALE, 3)
+    return output
+
+
+def read_nhanes_samples(
+    source,
+    sample_rate: float,
+    size: Optional[int] = None,
+    block_size: int = NHANES_BLOCK_SIZE,
+):
+    """
+    Read NHANES GT3x data as samples.
+
+    Timestamps are counted in seconds from the start of the recording, and values
+    are left unscaled (see `NHANES_SCALE`). Data is decoded by blocks, written
+    straight into a preallocated array.
+
+    Parameters:
+    -----------
+    source:
+        IO stream for activity.bin file data
+    sample_rate:
+        Sampling rate
+    size:
+        Size of the activity data in bytes. If unknown, the data is read at once.
+    block_size:
+        Number of samples decoded at a time
+
+    Returns:
+    --------
+    Array of `SAMPLE_DTYPE`
+    """
+    if size is None:
+        data = source.read()
+        source, size = io.BytesIO(data), len(data)
+    # A partial pack at the end of the data yields up to 2 more samples
+    samples = np.zeros(2 * (size // NHANES_PACK_SIZE) + 2, dtype=SAMPLE_DTYPE)
+    length = 0
+    for buffer in _read_nhanes_packs(source, block_size):
+        values = unpack_bitpack_acceleration(buffer)
+        _nhanes_to_samples(values, length, sample_rate, samples[length:])
+        length += values.shape[0]
+    return samples[:length]
+
+
+def iter_nhanes_samples(source, sample_rate: float, block_size: int):
+    """
+    Decode NHANES GT3x data by blocks.
+
+    Parameters:
+    -----------
+    source:
+        IO stream for activity.bin file data
+    sample_rate:
+        Sampling rate
+    block_size:
+        Number of samples per block, rounded down to an even number
+
+    Returns:
+    --------
+    Generator of arrays of `SAMPLE_DTYPE`, see `read_nhanes_samples`
+    """
+    position = 0
+    for buffer in _read_nhanes_packs(source, block_size):
+        values = unpack_bitpack_acceleration(buffer)
+        block = np.zeros(values.shape[0], dtype=SAMPLE_DTYPE)
+        _nhanes_to_samples(values, position, sample_rate, block)
+        position += values.shape[0]
+        yield block
+
+
+def _read_nhanes_packs(source, block_size: int):
+    """
+    Read NHANES data by blocks of whole packs.
+
+    Samples are 36 bits long, so data is split on packs of two samples (9 bytes),
+    and each block decodes exactly as if the data was read at once. Only the last
+    block can hold a partial pack.
+    """
+    read_size = max(block_size // 2, 1) * NHANES_PACK_SIZE
+    remainder = b""
+    while True:
+        data = source.read(read_size)
+        buffer = remainder + data
+        if data:
+            end = len(buffer) - len(buffer) % NHANES_PACK_SIZE
+            buffer, remainder = buffer[:end], buffer[end:]
+        if buffer:
+            yield buffer
+        if not data:
+            break
+
+
+def _nhanes_to_samples(values, position: int, sample_rate: float, output):
+    """Write decoded NHANES values, starting at a sample position, into output."""
+    count = values.shape[0]
+    output = output[:count]
+    positions = np.arange(position, position + count)
+    output["timestamp"] = positions // sample_rate
+    output["sample"] = positions % sample_rate
+    # NHANES files store Y before X
+    output["x"] = values[:, 1]
+    output["y"] = values[:, 0]
+    output["z"] = values[:, 2]
+
+
+def samples_to_array(samples, sample_rate: float, time_offset: float = 0):
+    """
+    Convert samples to an array of time, X, Y, Z and idle sleep mode columns.
+
+    Parameters:
+    -----------
+    samples:
+        Array of `SAMPLE_DTYPE`
+    sample_rate:
+        Sampling rate
+    time_offset:
+        Time added to sample timestamps, in seconds
+
+    Returns:
+    --------
+    Float array of shape samples.shape + (5,)
+    """
+    output = np.empty(samples.shape + (5,))
+    output[..., 0] = samples_to_time(samples, sample_rate, time_offset)
+    output[..., 1] = samples["x"]
+    output[..., 2] = samples["y"]
+    output[..., 3] = samples["z"]
+    output[..., 4] = samples["idle_sleep_mode"]
+    return output
+
+
+def fill_idle_sleep_mode(segment, sample_rate: int, output):
+    """
+    Write the samples of an idle sleep mode segment.
+
+    Parameters:
+    -----------
+    segment:
+        Item of `ISM_SEGMENT_DTYPE`
+    sample_rate:
+        Sampling rate
+    output:
+        Array of `SAMPLE_DTYPE` with room for the samples of the segment
+    """
+    seconds = int(segment["end"]) - int(segment["start"])
+    output = output[: seconds * sample_rate].reshape((seconds, sample_rate))
+    output["timestamp"] = np.arange(segment["start"], segment["end"]).reshape((-1, 1))
+    output["sample"] = np.arange(sample_rate)
+    for axis in ["x", "y", "z"]:
+        output[axis] = segment[axis]
+    output["idle_sleep_mode"] = True
+
+
+def idle_sleep_mode_to_samples(segments, sample_rate: int):
+    """
+    Expand idle sleep mode segments into samples.
+
+    Parameters:
+    -----------
+    segments:
+        Array of `ISM_SEGMENT_DTYPE`
+    sample_rate:
+        Sampling rate
+
+    Returns:
+    --------
+    Array of `SAMPLE_DTYPE`, in the order of the segments
+    """
+    sizes = (segments["end"] - segments["start"]) * sample_rate
+    output = np.empty(int(sizes.sum()), dtype=SAMPLE_DTYPE)
+    offset = 0
+    for segment, size in zip(segments, sizes.tolist()):
+        fill_idle_sleep_mode(segment, sample_rate, output[offset : offset + size])
+        offset += size
+    return output
+
+
+def concatenate_samples(records):
+    """
+    Concatenate records of samples into a single array.
+
+    Records are joined through a byte view, which avoids promoting the fields of
+    every record as `np.concatenate` does for structured arrays.
+
+    Parameters:
+    -----------
+    records:
+        Sequence of arrays of `SAMPLE_DTYPE`
+
+    Returns:
+    --------
+    One dimensional array of `SAMPLE_DTYPE`
+    """
+    if len(records) == 0:
+        return np.empty(0, dtype=SAMPLE_DTYPE)
+    data = np.concatenate(
+        [np.ascontiguousarray(record).reshape(-1).view(np.uint8) for record in records]
     )
+    return data.view(SAMPLE_DTYPE)
+
+
+def samples_to_time(samples, sample_rate: float, time_offset: float = 0):
+    """Return the time of samples, in seconds."""
+    if time_offset:
+        # Samples are counted from the start of the recording
+        position = samples["timestamp"] * sample_rate + samples["sample"]
+        return position / sample_rate + time_offset
+    return samples["timestamp"] + samples["sample"] / sample_rate
+
+
+def _records_to_samples(data, timestamps):
+    """Build samples from the acceleration and timestamps of several records."""
+    output = np.zeros(data.shape[:2], dtype=SAMPLE_DTYPE)
+    output["timestamp"] = np.asarray(timestamps).reshape((-1, 1))
+    output["sample"] = np.arange(data.shape[1])
+    output["x"] = data[:, :, 0]
+    output["y"] = data[:, :, 1]
+    output["z"] = data[:, :, 2]
+    return output
 
 
 def read_activity1_payload(payload_bytes: bytes, timestamp: int, sample_rate: float):
@@ -109,13 +409,31 @@ def read_activity1_payload(payload_bytes: bytes, timestamp: int, sample_rate: fl
     timestamp:
         Event timestamp
     """
-    data = unpack_bitpack_acceleration(payload_bytes)
-    time = ((np.ones(data.shape[0]).cumsum() - 1) / sample_rate) + timestamp
-    data = np.concatenate(
-        (time.reshape((-1, 1)), data, np.zeros((data.shape[0], 1))), axis=1
-    )
-    data = data[:, [0, 2, 1, 3, 4]]
-    return data
+    data = np.frombuffer(payload_bytes, dtype=np.uint8).reshape((1, -1))
+    return samples_to_array(read_activity1_payloads(data, [timestamp])[0], sample_rate)
+
+
+def read_activity1_payloads(data, timestamps):
+    """
+    Parse several Activity 1 Payloads of the same size.
+
+    Parameters:
+    -----------
+    data:
+        Payload bytes, one row per record
+    timestamps:
+        Event timestamps
+
+    Returns:
+    --------
+    Array of `SAMPLE_DTYPE` with shape (records, samples)
+    """
+    data = unpack_bitpack_acceleration_records(data)
+    output = _records_to_samples(data, timestamps)
+    # Activity 1 stores Y before X
+    output["x"] = data[:, :, 1]
+    output["y"] = data[:, :, 0]
+    return output
 
 
 def read_activity2_payload(payload_bytes, timestamp, sample_rate):
@@ -128,14 +446,29 @@ def read_activity2_payload(payload_bytes, timestamp, sample_rate):
     timestamp:
         Event timestamp
     """
-    if (len(payload_bytes) % 6) != 0:
-        payload_bytes = payload_bytes[: -(len(payload_bytes) % 6) + 1]
-    data = np.frombuffer(payload_bytes, dtype=np.int16).reshape((-1, 3))
-    time = ((np.ones(data.shape[0]).cumsum() - 1) / sample_rate) + timestamp
-    data = np.concatenate(
-        (time.reshape(-1, 1), data, np.zeros((data.shape[0], 1))), axis=1
-    )
-    return data.reshape((-1, 5))
+    data = np.frombuffer(payload_bytes, dtype=np.uint8).reshape((1, -1))
+    return samples_to_array(read_activity2_payloads(data, [timestamp])[0], sample_rate)
+
+
+def read_activity2_payloads(data, timestamps):
+    """Read several Activity 2 Payloads of the same size.
+
+    Parameters:
+    -----------
+    data:
+        Payload bytes, one row per record
+    timestamps:
+        Event timestamps
+
+    Returns:
+    --------
+    Array of `SAMPLE_DTYPE` with shape (records, samples)
+    """
+    if (data.shape[1] % 6) != 0:
+        data = data[:, : -(data.shape[1] % 6) + 1]
+    data = np.ascontiguousarray(data).view(np.int16)
+    data = data.reshape((data.shape[0], data.shape[1] // 3, 3))
+    return _records_to_samples(data, timestamps)
 
 
 def read_activity3_payload(payload_bytes, timestamp, sample_rate):
@@ -148,12 +481,26 @@ def read_activity3_payload(payload_bytes, timestamp, sample_rate):
     timestamp:
         Event timestamp
     """
-    data = unpack_bitpack_acceleration(payload_bytes)
-    time = ((np.ones(data.shape[0]).cumsum() - 1) / sample_rate) + timestamp
-    data = np.concatenate(
-        (time.reshape(-1, 1), data, np.zeros((data.shape[0], 1))), axis=1
-    )
-    return data
+    data = np.frombuffer(payload_bytes, dtype=np.uint8).reshape((1, -1))
+    return samples_to_array(read_activity3_payloads(data, [timestamp])[0], sample_rate)
+
+
+def read_activity3_payloads(data, timestamps):
+    """Parse several Activity 3 Payloads of the same size.
+
+    Parameters:
+    -----------
+    data:
+        Payload bytes, one row per record
+    timestamps:
+        Event timestamps
+
+    Returns:
+    --------
+    Array of `SAMPLE_DTYPE` with shape (records, samples)
+    """
+    data = unpack_bitpack_acceleration_records(data)
+    return _records_to_samples(data, timestamps)
 
 
 def read_temperature_payload(payload_bytes, timestamp):
@@ -166,8 +513,25 @@ def read_temperature_payload(payload_bytes, timestamp):
     timestamp:
         Event timestamp
     """
-    data = unpack_bitpack_temperature(payload_bytes)
-    data = np.concatenate(
-        (np.array(timestamp).repeat(len(data)).reshape(-1, 1), data), axis=1
-    )
-    return data
+    data = np.frombuffer(payload_bytes, dtype=np.uint8).reshape((1, -1))
+    return read_temperature_payloads(data, [timestamp])
+
+
+def read_temperature_payloads(data, timestamps):
+    """Parse several Temperature Payloads of the same size.
+
+    Parameters:
+    -----------
+    data:
+        Payload bytes, one row per record
+    timestamps:
+        Event timestamps
+
+    Returns:
+    --------
+    Array of timestamp, MCU and ADXL temperature columns, one row per record
+    """
+    output = np.empty((data.shape[0], 3))
+    output[:, 0] = timestamps
+    output[:, 1:] = unpack_bitpack_temperature_records(data)
+    return output
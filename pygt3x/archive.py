@@ -0,0 +1,173 @@
+"""Open archives from files, in-memory buffers or file objects."""
+
+import io
+import mmap
+import os
+import struct
+from typing import IO, Dict, Optional, Union
+from zipfile import ZIP_STORED, ZipFile, ZipInfo
+
+# Local file header signature, and size of its fixed part
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+LOCAL_HEADER_SIZE = 30
+
+Source = Union[str, bytes, bytearray, memoryview, IO[bytes]]
+
+
+class _BufferFile(io.RawIOBase):
+    """Read-only file object over a buffer, which does not copy it."""
+
+    def __init__(self, buffer: memoryview):
+        """Initialise."""
+        self.buffer = buffer
+        self.position = 0
+
+    def readable(self):
+        """Return True."""
+        return True
+
+    def seekable(self):
+        """Return True."""
+        return True
+
+    def readinto(self, b):
+        """Copy bytes from the current position into b."""
+        data = self.buffer[self.position : self.position + len(b)]
+        b[: len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        """Move to a position, as for other file objects."""
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += len(self.buffer)
+        if offset < 0:
+            raise ValueError("Negative seek position")
+        self.position = offset
+        return offset
+
+    def tell(self):
+        """Return the current position."""
+        return self.position
+
+
+def _is_mappable(source):
+    """Return whether a file object holds a whole file, which can be mapped."""
+    if type(source) not in (io.FileIO, io.BufferedReader):
+        return False
+    if isinstance(source, io.BufferedReader) and type(source.raw) is not io.FileIO:
+        return False
+    try:
+        if source.tell() != 0:
+            return False
+        size = source.seek(0, io.SEEK_END)
+        source.seek(0)
+        return size == os.fstat(source.fileno()).st_size
+    except (OSError, ValueError):
+        return False
+
+
+def _member_data(buffer: memoryview, info: ZipInfo):
+    """Return the data of a stored member, found after its local header."""
+    start = info.header_offset
+    header = buffer[start : start + LOCAL_HEADER_SIZE]
+    if header[:4] != LOCAL_HEADER_SIGNATURE:
+        return None
+    name_size, extra_size = struct.unpack("<HH", header[26:30])
+    start += LOCAL_HEADER_SIZE + name_size + extra_size
+    if start + info.file_size > len(buffer):
+        return None
+    return buffer[start : start + info.file_size]
+
+
+class Archive:
+    """Zip archive read from a file name, a bytes-like object or a file object.
+
+    Members which are stored without compression can be accessed as views of the
+    archive, so that they are neither copied nor decompressed. For files, the
+    archive is memory-mapped; in-memory archives are viewed directly. Other file
+    objects, such as members of tar files, are read into memory.
+
+    Parameters:
+    -----------
+    source:
+        File name, bytes-like object holding the archive, or seekable binary file
+        object
+    """
+
+    def __init__(self, source: Source):
+        """Open the archive."""
+        self.buffer: Optional[memoryview] = None
+        self.mmap: Optional[mmap.mmap] = None
+        self.views: Dict[str, Optional[memoryview]] = {}
+        self.mappable = False
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self.buffer = memoryview(source).cast("B")
+            self.zip_file = ZipFile(_BufferFile(self.buffer))
+            return
+        # Files opened here, and file objects holding a whole file, are mapped
+        self.mappable = isinstance(source, (str, os.PathLike)) or _is_mappable(source)
+        self.zip_file = ZipFile(source)
+
+    def _archive_buffer(self):
+        """Return a view of the whole archive, or None if it cannot be read."""
+        if self.buffer is not None:
+            return self.buffer
+        fp = self.zip_file.fp
+        if isinstance(fp, io.BytesIO):
+            self.buffer = fp.getbuffer()
+        elif self.mappable:
+            try:
+                self.mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Empty file, or a file system which does not support mapping
+                return None
+            self.buffer = memoryview(self.mmap)
+        else:
+            # Offsets of members are positions within the file object
+            try:
+                fp.seek(0)
+                self.buffer = memoryview(fp.read())
+            except (OSError, ValueError):
+                return None
+        return self.buffer
+
+    def member_view(self, name: str):
+        """
+        Return the content of a member stored without compression.
+
+        Parameters:
+        -----------
+        name:
+            Member name
+
+        Returns:
+        --------
+        memoryview of the member within the archive, or None if it is compressed,
+        encrypted, or the archive cannot be read
+        """
+        if name in self.views:
+            return self.views[name]
+        info = self.zip_file.getinfo(name)
+        view = None
+        if info.compress_type == ZIP_STORED and not info.flag_bits & 0x1:
+            buffer = self._archive_buffer()
+            if buffer is not None:
+                view = _member_data(buffer, info)
+        self.views[name] = view
+        return view
+
+    def close(self):
+        """Close the archive, and unmap it once its views are no longer used."""
+        self.views.clear()
+        self.buffer = None
+        self.zip_file.close()
+        if self.mmap is not None:
+            try:
+                self.mmap.close()
+            except BufferError:
+                # Arrays still refer to the mapping, which is unmapped with them
+                pass
+            self.mmap = None
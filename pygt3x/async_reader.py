@@ -0,0 +1,149 @@
+"""Read files from asyncio code without blocking the event loop."""
+
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import Optional, Set
+
+import numpy as np
+
+from pygt3x.archive import Source
+from pygt3x.reader import FileReader
+
+# Returned by next() once chunks are exhausted
+_DONE = object()
+
+
+class AsyncFileReader:
+    """Read GT3X/AGDC files from asyncio code.
+
+    Opening the archive, decompressing and decoding it run in an executor, so that
+    the event loop keeps serving other tasks, and many archives can be read
+    concurrently. With `lazy=True`, `iter_chunks` decodes one chunk at a time, when
+    the consumer asks for it, which bounds memory use per archive.
+
+    Attributes of the underlying `FileReader`, such as `info`, `samples` or
+    `stats`, are available on this reader. A blocking call cannot be interrupted:
+    when the calling task is cancelled, the call runs to its end in the executor,
+    and leaving the context waits for it before closing the archive.
+
+    Parameters:
+    -----------
+    source:
+        Input file name, archive bytes, or seekable binary file object
+    executor:
+        Executor running blocking calls. Defaults to the default executor of the
+        event loop. Since the reader state is shared between calls, it must be a
+        thread pool.
+    options:
+        Options of `FileReader`
+    """
+
+    def __init__(
+        self,
+        source: Source,
+        executor: Optional[Executor] = None,
+        **options,
+    ):
+        """Initialise."""
+        self.reader = FileReader(source, **options)
+        self.executor = executor
+        # Calls running in the executor, which may outlive cancelled tasks
+        self._pending: Set[asyncio.Future] = set()
+
+    def __getattr__(self, name):
+        """Return attributes of the underlying reader."""
+        if name == "reader":
+            raise AttributeError(name)
+        return getattr(self.reader, name)
+
+    def _submit(self, function, *args):
+        """Start a blocking call in the executor, and keep track of it."""
+        future = asyncio.get_running_loop().run_in_executor(
+            self.executor, function, *args
+        )
+        self._pending.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def _forget(self, future):
+        """Stop tracking a call which ended."""
+        self._pending.discard(future)
+        if not future.cancelled():
+            # Errors of calls whose task was cancelled are not raised anywhere
+            future.exception()
+
+    async def _run(self, function, *args, **kwargs):
+        """Run a blocking call in the executor."""
+        # Shielded, so that the call is still tracked if the task is cancelled
+        return await asyncio.shield(
+            self._submit(functools.partial(function, *args, **kwargs))
+        )
+
+    async def __aenter__(self):
+        """Open the archive, and decode it unless the reader is lazy."""
+        await self._run(self.reader.__enter__)
+        return self
+
+    async def __aexit__(self, typ, value, traceback):
+        """Wait for calls still running in the executor, and close file descriptors."""
+        while self._pending:
+            await asyncio.wait(list(self._pending))
+        self.reader.__exit__(typ, value, traceback)
+
+    async def iter_chunks(
+        self, seconds: int = 3600, calibrate: bool = True, dtype=np.float32
+    ):
+        """Yield acceleration data frames of bounded size, in time order.
+
+        Each chunk is decoded in the executor once the previous one has been
+        consumed. Lazy readers decode the log incrementally, as in
+        `FileReader.iter_chunks`, while other readers split decoded data.
+
+        Parameters:
+        -----------
+        seconds
+            Number of seconds of acceleration data per chunk.
+        calibrate
+            Calibrate acceleration data.
+        dtype
+            Float type of the X, Y and Z columns.
+        """
+        chunks = self.reader._iter_frames(seconds, calibrate, dtype)
+        future = None
+        try:
+            while True:
+                future = self._submit(next, chunks, _DONE)
+                chunk = await asyncio.shield(future)
+                if chunk is _DONE:
+                    return
+                yield chunk
+        finally:
+            if future is not None and not future.done():
+                # Cancelled while a chunk was decoded, which must end first
+                await asyncio.wait([future])
+            chunks.close()
+
+    async def to_pandas(self, calibrate: bool = True, dtype=np.float32):
+        """Return acceleration data as pandas data frame, see `FileReader`."""
+        return await self._run(self.reader.to_pandas, calibrate, dtype)
+
+    async def temperature_to_pandas(self, calibrate: bool = True):
+        """Return temperature data as pandas data frame, see `FileReader`."""
+        return await self._run(self.reader.temperature_to_pandas, calibrate)
+
+    async def idle_sleep_mode_to_pandas(self, calibrate: bool = True, dtype=np.float32):
+        """Return idle sleep mode gaps as pandas data frame, see `FileReader`."""
+        return await self._run(self.reader.idle_sleep_mode_to_pandas, calibrate, dtype)
+
+    async def events_to_pandas(self, stream: str):
+        """Return the events of a stream as pandas data frame, see `FileReader`."""
+        return await self._run(self.reader.events_to_pandas, stream)
+
+    async def counts(self, epoch: int = 60, calibrate: bool = True, seconds=3600):
+        """Return ActiGraph activity counts, see `FileReader.counts`."""
+        return await self._run(self.reader.counts, epoch, calibrate, seconds)
+
+    async def export(self, directory: str, format: str = "npy", **options):
+        """Write data to columnar files, see `FileReader.export`."""
+        return await self._run(self.reader.export, directory, format, **options)
@@ -0,0 +1,180 @@
+"""Read many files in parallel."""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+from pygt3x.components import Info
+from pygt3x.reader import FileReader
+
+OUTPUT_FORMATS = {"pickle": "pkl", "parquet": "parquet", "csv": "csv"}
+
+
+@dataclass
+class FileResult:
+    """
+    Outcome of reading one file with `read_many`.
+
+    Attributes:
+    -----------
+    file_name:
+        Input file name
+    info:
+        File metadata, if the file could be opened
+    acceleration_rows:
+        Number of acceleration samples written
+    temperature_rows:
+        Number of temperature samples written
+    outputs:
+        Names of the files written
+    warnings:
+        Warnings logged while reading the file
+    error:
+        Error which stopped reading the file, if any
+    """
+
+    file_name: str
+    info: Optional[Info] = None
+    acceleration_rows: int = 0
+    temperature_rows: int = 0
+    outputs: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+class _WarningCollector(logging.Handler):
+    """Keep the messages of warnings logged by pygt3x."""
+
+    def __init__(self):
+        """Initialise."""
+        super().__init__(logging.WARNING)
+        self.messages: List[str] = []
+
+    def emit(self, record):
+        """Store a log record."""
+        self.messages.append(record.getMessage())
+
+
+def _output_names(file_names: Sequence[str], output: str, format: str):
+    """Return the acceleration output file name of each input file."""
+    extension = OUTPUT_FORMATS[format]
+    names = [
+        os.path.join(output, os.path.splitext(os.path.basename(f))[0])
+        for f in file_names
+    ]
+    if len(set(names)) != len(names):
+        raise ValueError("Input files must have distinct names")
+    return [f"{name}.{extension}" for name in names]
+
+
+def _read_file(file_name: str, output_name: str, calibrate: bool, format: str):
+    """Read a file and write its data to disk, returning only metadata."""
+    result = FileResult(str(file_name))
+    collector = _WarningCollector()
+    logger = logging.getLogger("pygt3x")
+    logger.addHandler(collector)
+    try:
+        with FileReader(file_name) as reader:
+            result.info = reader.info
+            df = reader.to_pandas(calibrate=calibrate)
+            getattr(df, f"to_{format}")(output_name)
+            result.acceleration_rows = len(df)
+            result.outputs.append(output_name)
+            if len(reader.temperature) > 0:
+                df = reader.temperature_to_pandas(calibrate=calibrate)
+                base, extension = os.path.splitext(output_name)
+                temperature_name = f"{base}_temperature{extension}"
+                getattr(df, f"to_{format}")(temperature_name)
+                result.temperature_rows = len(df)
+                result.outputs.append(temperature_name)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    finally:
+        logger.removeHandler(collector)
+    result.warnings = collector.messages
+    return result
+
+
+def _error_result(file_name, error: BaseException):
+    """Return the result of a file whose worker failed."""
+    return FileResult(str(file_name), error=f"{type(error).__name__}: {error}")
+
+
+def _read_file_in_process(arguments):
+    """Read a file in a process of its own, so that a crash only affects it."""
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        try:
+            return executor.submit(_read_file, *arguments).result()
+        except Exception as e:
+            return _error_result(arguments[0], e)
+
+
+def read_many(
+    file_names: Sequence[str],
+    output: str,
+    workers: Optional[int] = None,
+    calibrate: bool = True,
+    format: str = "pickle",
+):
+    """
+    Read files in a process pool and write their data to disk.
+
+    For each input file, acceleration data is written to `<output>/<name>.<ext>`
+    and temperature data, if any, to `<output>/<name>_temperature.<ext>`. Workers
+    only send metadata back, and a file which cannot be read does not stop the
+    others from being read. If a worker dies, for instance when it runs out of
+    memory, the files which were not read yet are read again, each in a process
+    of its own, so that only the file which killed its worker reports an error.
+
+    Parameters:
+    -----------
+    file_names:
+        Input file names, which must have distinct base names
+    output:
+        Output directory, created if needed
+    workers:
+        Number of processes. Defaults to the number of CPUs. With a single worker,
+        files are read in the current process.
+    calibrate:
+        Calibrate acceleration and temperature data
+    format:
+        Output format: "pickle", "parquet" or "csv"
+
+    Returns:
+    --------
+    List of `FileResult`, in the order of `file_names`
+    """
+    if format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {format}")
+    output_names = _output_names(file_names, output, format)
+    os.makedirs(output, exist_ok=True)
+    if workers == 1:
+        return [
+            _read_file(f, o, calibrate, format)
+            for f, o in zip(file_names, output_names)
+        ]
+
+    arguments = [(f, o, calibrate, format) for f, o in zip(file_names, output_names)]
+    results: List[Optional[FileResult]] = [None] * len(arguments)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_read_file, *a) for a in arguments]
+        for i, future in enumerate(futures):
+            try:
+                results[i] = future.result()
+            except BrokenProcessPool:
+                # A worker died, and the files it did not finish are read again
+                pass
+            except Exception as e:
+                results[i] = _error_result(file_names[i], e)
+    unfinished = [i for i, result in enumerate(results) if result is None]
+    if unfinished:
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as threads:
+            retried = threads.map(
+                _read_file_in_process, [arguments[i] for i in unfinished]
+            )
+            for i, result in zip(unfinished, retried):
+                results[i] = result
+    return results
@@ -0,0 +1,147 @@
+"""On-disk cache of decoded files."""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from importlib.metadata import PackageNotFoundError, version
+from typing import Dict
+from zipfile import ZipFile
+
+import numpy as np
+
+# Version of the cache layout, to be increased whenever decoded data changes
+CACHE_FORMAT = 2
+
+DEFAULT_CACHE_SIZE = 4 << 30
+
+METADATA_FILE = "metadata.json"
+
+
+def _package_version():
+    """Return the installed pygt3x version."""
+    try:
+        return version("pygt3x")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def cache_key(zip_file: ZipFile, **options):
+    """
+    Compute the cache key of an archive.
+
+    The archive content is identified through the CRC-32 and size of its members,
+    which are stored in its central directory, so that nothing has to be
+    decompressed or hashed.
+
+    Parameters:
+    -----------
+    zip_file:
+        Opened archive
+    options:
+        Reading options which change the decoded data
+
+    Returns:
+    --------
+    Hexadecimal key
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{CACHE_FORMAT}:{_package_version()}".encode())
+    digest.update(json.dumps(options, sort_keys=True).encode())
+    for info in sorted(zip_file.infolist(), key=lambda i: i.filename):
+        digest.update(f"{info.filename}:{info.CRC}:{info.file_size}\n".encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Directory of decoded arrays, evicted in least recently used order.
+
+    Each entry is a directory named after its key, holding one .npy file per array,
+    which can be memory-mapped, and a JSON metadata file.
+
+    Parameters:
+    -----------
+    directory:
+        Cache directory, created if needed
+    max_size:
+        Size of the cache directory above which entries are evicted, in bytes
+    """
+
+    def __init__(self, directory: str, max_size: int = DEFAULT_CACHE_SIZE):
+        """Initialise."""
+        self.directory = directory
+        self.max_size = max_size
+
+    def load(self, key: str):
+        """
+        Load a cache entry.
+
+        Returns:
+        --------
+        Tuple of memory-mapped arrays by name and metadata, or None if there is no
+        entry for `key`
+        """
+        path = os.path.join(self.directory, key)
+        try:
+            with open(os.path.join(path, METADATA_FILE)) as f:
+                metadata = json.load(f)
+            arrays = {
+                name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+                for name in metadata["arrays"]
+            }
+        except (OSError, ValueError, KeyError):
+            return None
+        # Mark the entry as recently used
+        os.utime(path)
+        return arrays, metadata["metadata"]
+
+    def store(self, key: str, arrays: Dict[str, np.ndarray], metadata: Dict):
+        """
+        Store a cache entry, then evict old entries if the cache is too large.
+
+        The entry is written to a temporary directory which is renamed once
+        complete, so that readers never see partial entries.
+
+        Parameters:
+        -----------
+        key:
+            Cache key
+        arrays:
+            Arrays by name
+        metadata:
+            JSON serializable metadata
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, key)
+        temporary = tempfile.mkdtemp(prefix=".tmp-", dir=self.directory)
+        try:
+            for name, array in arrays.items():
+                np.save(os.path.join(temporary, f"{name}.npy"), array)
+            with open(os.path.join(temporary, METADATA_FILE), "w") as f:
+                json.dump({"arrays": list(arrays), "metadata": metadata}, f)
+            os.rename(temporary, path)
+        except OSError:
+            # The entry may have been stored by another process
+            shutil.rmtree(temporary, ignore_errors=True)
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits its size."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            try:
+                size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                entries.append((entry.stat().st_mtime, size, entry.path))
+            except OSError:
+                # The entry was removed by another process
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
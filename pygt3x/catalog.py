@@ -0,0 +1,236 @@
+"""Read file metadata without decoding data, for catalogs of many files."""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+from zipfile import ZipFile
+
+import numpy as np
+
+from pygt3x import Types
+from pygt3x.activity_payload import NHANES_PACK_SIZE
+from pygt3x.components import Info
+from pygt3x.event_payload import read_idle_sleep_mode_setting
+from pygt3x.log_index import ACTIVITY_TYPES, HEADER_SIZE, validate_checksums
+from pygt3x.reader import CHUNK_READ_SIZE, LogReader
+
+FILE_EXTENSIONS = (".gt3x", ".agdc")
+
+
+@dataclass
+class FileSummary:
+    """
+    Metadata of a file, as returned by `inspect`.
+
+    Attributes:
+    -----------
+    file_name:
+        Input file name
+    info:
+        File metadata
+    calibration:
+        Content of calibration.json, if any
+    temperature_calibration:
+        Content of temperature_calibration.json, if any
+    idle_sleep_mode_activated:
+        Whether idle sleep mode was enabled on the device, if known
+    first_timestamp:
+        Timestamp of the first second of acceleration data, in seconds
+    last_timestamp:
+        Timestamp of the last second of acceleration data, in seconds
+    error:
+        Error which stopped reading the file, if any (`inspect_many` only)
+    """
+
+    file_name: str
+    info: Optional[Info] = None
+    calibration: Optional[Dict] = None
+    temperature_calibration: Optional[Dict] = None
+    idle_sleep_mode_activated: Optional[bool] = None
+    first_timestamp: Optional[float] = None
+    last_timestamp: Optional[float] = None
+    error: Optional[str] = None
+
+
+def _read_json(zip_file: ZipFile, file_name: str):
+    """Read a JSON member of an archive, if it exists."""
+    if file_name not in zip_file.namelist():
+        return None
+    with zip_file.open(file_name) as f:
+        return json.load(f)
+
+
+def _inspect_log(zip_file: ZipFile, summary: FileSummary):
+    """Read the time span and the Params records of log.bin.
+
+    As when reading data, idle sleep mode gaps extend acceleration data up to the
+    event which ends them, or up to the last record if they are not ended.
+    """
+    first = last = last_record = None
+    idle_sleep_mode = False
+    with zip_file.open("log.bin") as source:
+        for buffer, index in LogReader(source).read_blocks(CHUNK_READ_SIZE):
+            data = np.frombuffer(buffer, dtype=np.uint8)
+            last_record = int(index["timestamp"][-1])
+            is_activity = np.isin(index["type"], ACTIVITY_TYPES) & (
+                index["payload_size"] > 1
+            )
+            is_event = (index["type"] == Types.Event.value) & (
+                index["payload_size"] == 1
+            )
+            event = np.zeros(len(index), dtype=np.uint8)
+            event[is_event] = data[index["offset"][is_event] + HEADER_SIZE]
+            is_start, is_end = event == 0x08, event == 0x09
+            # Records with an invalid checksum are skipped, as when reading data
+            checked = np.flatnonzero(is_activity | is_start | is_end)
+            is_valid = np.zeros(len(index), dtype=bool)
+            is_valid[checked] = validate_checksums(buffer, index[checked])
+            is_activity &= is_valid
+            is_start &= is_valid
+            is_end &= is_valid
+            timestamps = np.concatenate(
+                (index["timestamp"][is_activity], index["timestamp"][is_end] - 1)
+            ).astype(np.int64)
+            if len(timestamps) > 0:
+                low, high = int(timestamps.min()), int(timestamps.max())
+                first = low if first is None else min(first, low)
+                last = high if last is None else max(last, high)
+            changes = np.flatnonzero(is_activity | is_start | is_end)
+            if len(changes) > 0:
+                idle_sleep_mode = bool(is_start[changes[-1]])
+            params = index[index["type"] == Types.Params.value]
+            params = params[validate_checksums(buffer, params)]
+            for offset, payload_size in zip(
+                params["offset"].tolist(), params["payload_size"].tolist()
+            ):
+                start = offset + HEADER_SIZE
+                activated = read_idle_sleep_mode_setting(
+                    buffer[start : start + payload_size]
+                )
+                if activated is not None:
+                    summary.idle_sleep_mode_activated = bool(activated)
+    if idle_sleep_mode and last is not None and last_record is not None:
+        last = max(last, last_record - 1)
+    summary.first_timestamp = None if first is None else float(first)
+    summary.last_timestamp = None if last is None else float(last)
+
+
+def _inspect_nhanes(zip_file: ZipFile, summary: FileSummary):
+    """Compute the time span of NHANES activity.bin from its size."""
+    info = summary.info
+    assert info is not None
+    size = zip_file.getinfo("activity.bin").file_size
+    # Samples take 36 bits, see NHANES_PACK_SIZE
+    num_samples = size * 8 // (NHANES_PACK_SIZE * 4)
+    if num_samples > 0 and info.sample_rate > 0:
+        summary.first_timestamp = info.start_date / 1e9
+        summary.last_timestamp = (
+            summary.first_timestamp + (num_samples - 1) // info.sample_rate
+        )
+
+
+def inspect(file_name: str):
+    """
+    Read the metadata of a file without decoding its data.
+
+    Only info.txt, the calibration JSON files and the Params records of log.bin
+    are parsed. The record headers of log.bin are indexed block by block to find
+    the time span of acceleration data, but no activity payload is decoded.
+
+    Parameters:
+    -----------
+    file_name:
+        Input file name
+
+    Returns:
+    --------
+    FileSummary
+    """
+    summary = FileSummary(str(file_name))
+    with ZipFile(file_name) as zip_file:
+        summary.info = Info.read_zip(zip_file)
+        summary.calibration = _read_json(zip_file, "calibration.json")
+        summary.temperature_calibration = _read_json(
+            zip_file, "temperature_calibration.json"
+        )
+        if "log.bin" in zip_file.namelist():
+            _inspect_log(zip_file, summary)
+        else:
+            _inspect_nhanes(zip_file, summary)
+    return summary
+
+
+def _inspect_file(file_name: str):
+    """Inspect a file, storing errors in the summary instead of raising them."""
+    try:
+        return inspect(file_name)
+    except Exception as e:
+        return FileSummary(str(file_name), error=f"{type(e).__name__}: {e}")
+
+
+def inspect_many(
+    file_names: Sequence[str],
+    workers: Optional[int] = None,
+    use_processes: bool = False,
+):
+    """
+    Inspect files in a thread or process pool.
+
+    Most of the work is decompressing log.bin, which releases the GIL, so threads
+    are usually enough. A file which cannot be read does not stop the others from
+    being read.
+
+    Parameters:
+    -----------
+    file_names:
+        Input file names
+    workers:
+        Number of threads or processes. Defaults to the executor default. With a
+        single worker, files are read in the current thread.
+    use_processes:
+        Use a process pool instead of a thread pool
+
+    Returns:
+    --------
+    List of `FileSummary`, in the order of `file_names`
+    """
+    if workers == 1:
+        return [_inspect_file(f) for f in file_names]
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        return list(executor.map(_inspect_file, file_names))
+
+
+def inspect_directory(
+    directory: str,
+    workers: Optional[int] = None,
+    use_processes: bool = False,
+    extensions: Sequence[str] = FILE_EXTENSIONS,
+):
+    """
+    Inspect the GT3X/AGDC files of a directory and its subdirectories.
+
+    Parameters:
+    -----------
+    directory:
+        Directory to scan
+    workers:
+        Number of threads or processes, see `inspect_many`
+    use_processes:
+        Use a process pool instead of a thread pool
+    extensions:
+        Extensions of the files to inspect, case insensitive
+
+    Returns:
+    --------
+    List of `FileSummary`, sorted by file name
+    """
+    extensions = tuple(e.lower() for e in extensions)
+    file_names: List[str] = []
+    for root, _, files in os.walk(directory):
+        file_names.extend(
+            os.path.join(root, f) for f in files if f.lower().endswith(extensions)
+        )
+    return inspect_many(sorted(file_names), workers, use_processes)
@@ -107,6 +107,8 @@ class Info:
     subject_name: Optional[str]
     timezone: Optional[str]
     unexpected_resets: Union[str, int]
+    lux_scale_factor: Optional[float] = None
+    lux_max_value: Optional[float] = None
 
     @staticmethod
     def read_zip(zip_file):
@@ -151,4 +153,14 @@ class Info:
             subject_name=output.get("Subject Name", None),
             timezone=output.get("TimeZone", None),
             unexpected_resets=output.get("Unexpected Resets", 0),
+            lux_scale_factor=(
+                float(output["Lux Scale Factor"].replace(",", "."))
+                if "Lux Scale Factor" in output
+                else None
+            ),
+            lux_max_value=(
+                float(output["Lux Max Value"].replace(",", "."))
+                if "Lux Max Value" in output
+                else None
+            ),
         )
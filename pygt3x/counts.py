@@ -0,0 +1,561 @@
+"""Compute ActiGraph activity counts from raw acceleration."""
+
+from typing import List
+
+import numpy as np
+
+# Band-pass filter of the counts algorithm. Trailing zeros match ActiLife constants.
+INPUT_COEFFICIENTS = np.array(
+    [
+        -0.009341062898525,
+        -0.025470289659360,
+        -0.004235264826105,
+        0.044152415456420,
+        0.036493718347760,
+        -0.011893961934740,
+        -0.022917390623150,
+        -0.006788163862310,
+        0.000000000000000,
+    ]
+)
+OUTPUT_COEFFICIENTS = np.array(
+    [
+        1.00000000000000000000,
+        -3.63367395910957000000,
+        5.03689812757486000000,
+        -3.09612247819666000000,
+        0.50620507633883000000,
+        0.32421701566682000000,
+        -0.15685485875559000000,
+        0.01949130205890000000,
+        0.00000000000000000000,
+    ]
+)
+# Gain applied after the band-pass filter. ActiLife uses 17.127404 and the firmware
+# uses 17.128125.
+COUNTS_GAIN = (3.0 / 4096.0) / (2.6 / 256.0) * 237.5
+MIN_COUNT = 4
+MAX_COUNT = 128
+
+# Upsampling and downsampling factors to 30 Hz, by sample rate
+RESAMPLE_FACTORS = {
+    30: (1, 1),
+    40: (3, 4),
+    50: (3, 5),
+    60: (1, 2),
+    70: (3, 7),
+    80: (3, 8),
+    90: (1, 3),
+    100: (3, 10),
+}
+
+# Sample rates which are resampled to 30 Hz through 256 Hz
+POW2_RATES = (32, 64, 128, 256)
+# Low-pass filter applied after upsampling to 256 Hz
+POW2_FILTER = np.array(
+    [
+        -0.000001,
+        -0.000002,
+        -0.000004,
+        -0.000005,
+        -0.000006,
+        -0.000006,
+        -0.000004,
+        0.000000,
+        0.000005,
+        0.000011,
+        0.000017,
+        0.000022,
+        0.000023,
+        0.000020,
+        0.000013,
+        -0.000000,
+        -0.000016,
+        -0.000033,
+        -0.000049,
+        -0.000059,
+        -0.000061,
+        -0.000052,
+        -0.000031,
+        -0.000000,
+        0.000038,
+        0.000077,
+        0.000111,
+        0.000132,
+        0.000133,
+        0.000112,
+        0.000066,
+        -0.000000,
+        -0.000078,
+        -0.000156,
+        -0.000222,
+        -0.000260,
+        -0.000259,
+        -0.000214,
+        -0.000125,
+        0.000000,
+        0.000145,
+        0.000288,
+        0.000404,
+        0.000469,
+        0.000464,
+        0.000380,
+        0.000220,
+        -0.000000,
+        -0.000250,
+        -0.000493,
+        -0.000687,
+        -0.000791,
+        -0.000777,
+        -0.000632,
+        -0.000363,
+        0.000000,
+        0.000409,
+        0.000801,
+        0.001108,
+        0.001269,
+        0.001240,
+        0.001003,
+        0.000574,
+        -0.000000,
+        -0.000639,
+        -0.001246,
+        -0.001715,
+        -0.001956,
+        -0.001903,
+        -0.001534,
+        -0.000873,
+        0.000000,
+        0.000966,
+        0.001875,
+        0.002574,
+        0.002926,
+        0.002839,
+        0.002280,
+        0.001295,
+        -0.000000,
+        -0.001425,
+        -0.002762,
+        -0.003783,
+        -0.004293,
+        -0.004158,
+        -0.003335,
+        -0.001892,
+        0.000000,
+        0.002078,
+        0.004025,
+        0.005513,
+        0.006257,
+        0.006061,
+        0.004866,
+        0.002763,
+        -0.000000,
+        -0.003045,
+        -0.005909,
+        -0.008115,
+        -0.009237,
+        -0.008981,
+        -0.007240,
+        -0.004131,
+        0.000000,
+        0.004606,
+        0.009005,
+        0.012468,
+        0.014325,
+        0.014075,
+        0.011483,
+        0.006641,
+        -0.000000,
+        -0.007655,
+        -0.015271,
+        -0.021640,
+        -0.025543,
+        -0.025900,
+        -0.021926,
+        -0.013250,
+        0.000000,
+        0.017180,
+        0.037161,
+        0.058432,
+        0.079245,
+        0.097796,
+        0.112422,
+        0.121780,
+        0.125000,
+        0.121780,
+        0.112422,
+        0.097796,
+        0.079245,
+        0.058432,
+        0.037161,
+        0.017180,
+        0.000000,
+        -0.013250,
+        -0.021926,
+        -0.025900,
+        -0.025543,
+        -0.021640,
+        -0.015271,
+        -0.007655,
+        -0.000000,
+        0.006641,
+        0.011483,
+        0.014075,
+        0.014325,
+        0.012468,
+        0.009005,
+        0.004606,
+        0.000000,
+        -0.004131,
+        -0.007240,
+        -0.008981,
+        -0.009237,
+        -0.008115,
+        -0.005909,
+        -0.003045,
+        -0.000000,
+        0.002763,
+        0.004866,
+        0.006061,
+        0.006257,
+        0.005513,
+        0.004025,
+        0.002078,
+        0.000000,
+        -0.001892,
+        -0.003335,
+        -0.004158,
+        -0.004293,
+        -0.003783,
+        -0.002762,
+        -0.001425,
+        -0.000000,
+        0.001295,
+        0.002280,
+        0.002839,
+        0.002926,
+        0.002574,
+        0.001875,
+        0.000966,
+        0.000000,
+        -0.000873,
+        -0.001534,
+        -0.001903,
+        -0.001956,
+        -0.001715,
+        -0.001246,
+        -0.000639,
+        -0.000000,
+        0.000574,
+        0.001003,
+        0.001240,
+        0.001269,
+        0.001108,
+        0.000801,
+        0.000409,
+        0.000000,
+        -0.000363,
+        -0.000632,
+        -0.000777,
+        -0.000791,
+        -0.000687,
+        -0.000493,
+        -0.000250,
+        -0.000000,
+        0.000220,
+        0.000380,
+        0.000464,
+        0.000469,
+        0.000404,
+        0.000288,
+        0.000145,
+        0.000000,
+        -0.000125,
+        -0.000214,
+        -0.000259,
+        -0.000260,
+        -0.000222,
+        -0.000156,
+        -0.000078,
+        -0.000000,
+        0.000066,
+        0.000112,
+        0.000133,
+        0.000132,
+        0.000111,
+        0.000077,
+        0.000038,
+        -0.000000,
+        -0.000031,
+        -0.000052,
+        -0.000061,
+        -0.000059,
+        -0.000049,
+        -0.000033,
+        -0.000016,
+        -0.000000,
+        0.000013,
+        0.000020,
+        0.000023,
+        0.000022,
+        0.000017,
+        0.000011,
+        0.000005,
+        0.000000,
+        -0.000004,
+        -0.000006,
+        -0.000006,
+        -0.000005,
+        -0.000004,
+        -0.000002,
+        -0.000001,
+    ]
+)
+# Gain of the low-pass filter applied at 256 Hz, which is one minus its pole
+POW2_GAIN = 0.307990357416655
+
+
+class CountsCalculator:
+    """
+    Compute activity counts from acceleration fed in consecutive blocks.
+
+    This implements the ActiGraph counts algorithm as in ActiLife: data is resampled
+    to 30 Hz, band-pass filtered, scaled, trimmed, downsampled to 10 Hz and summed
+    by epoch. Filter states are kept between blocks, so that counts do not depend
+    on how data is split. Requires scipy.
+
+    Parameters:
+    -----------
+    sample_rate:
+        Sampling rate, which must be a multiple of 10 from 30 to 100 Hz, or a power
+        of 2 from 32 to 256 Hz
+    epoch:
+        Epoch length, in seconds
+    """
+
+    def __init__(self, sample_rate: int, epoch: int = 60):
+        """Initialise."""
+        try:
+            from scipy import signal
+        except ImportError as error:
+            raise ImportError(
+                "Activity counts require scipy, install pygt3x[counts]"
+            ) from error
+        if sample_rate not in RESAMPLE_FACTORS and sample_rate not in POW2_RATES:
+            raise ValueError(f"Unsupported sample rate for counts: {sample_rate}")
+        self.signal = signal
+        self.sample_rate = sample_rate
+        self.epoch = epoch
+        self._resampler = (
+            _Pow2Resampler(signal, sample_rate)
+            if sample_rate in POW2_RATES
+            else _Resampler(signal, sample_rate)
+        )
+        self._bpf_state = None
+        # Trimmed 30 Hz values, and 10 Hz values, which do not fill a group yet
+        self._trimmed = np.empty((0, 3))
+        self._values_10hz = np.empty((0, 3))
+
+    def update(self, acceleration):
+        """
+        Feed acceleration data.
+
+        Parameters:
+        -----------
+        acceleration:
+            Calibrated acceleration, with shape (samples, 3)
+
+        Returns:
+        --------
+        Counts of the epochs completed by this data, with shape (epochs, 3)
+        """
+        return self._count(self._resampler.update(acceleration))
+
+    def finish(self):
+        """
+        Flush the data fed so far.
+
+        Returns:
+        --------
+        Counts of the remaining complete epochs, with shape (epochs, 3)
+        """
+        return self._count(self._resampler.finish())
+
+    def _count(self, data):
+        """Turn 30 Hz data into counts of complete epochs."""
+        signal = self.signal
+        if len(data) > 0:
+            # Resampled data is rounded as in ActiLife
+            data = np.round(data, 3)
+            if self._bpf_state is None:
+                zi = signal.lfilter_zi(INPUT_COEFFICIENTS, OUTPUT_COEFFICIENTS)
+                self._bpf_state = zi.reshape((-1, 1)) * data[0]
+            data, self._bpf_state = signal.lfilter(
+                INPUT_COEFFICIENTS,
+                OUTPUT_COEFFICIENTS,
+                data,
+                axis=0,
+                zi=self._bpf_state,
+            )
+            data = np.abs(COUNTS_GAIN * data)
+            data[data < MIN_COUNT] = 0
+            data[data > MAX_COUNT] = MAX_COUNT
+            data = np.floor(data)
+        trimmed = np.concatenate((self._trimmed, data))
+        groups = len(trimmed) // 3
+        values = np.floor(trimmed[: groups * 3].reshape((groups, 3, 3)).sum(1) / 3)
+        self._trimmed = trimmed[groups * 3 :]
+        values = np.concatenate((self._values_10hz, values))
+        size = 10 * self.epoch
+        epochs = len(values) // size
+        counts = values[: epochs * size].reshape((epochs, size, 3)).sum(1)
+        self._values_10hz = values[epochs * size :]
+        return counts
+
+
+class _Resampler:
+    """Resample data to 30 Hz as ActiLife does for multiples of 10 Hz."""
+
+    def __init__(self, signal, sample_rate: int):
+        """Initialise."""
+        self.signal = signal
+        self.sample_rate = sample_rate
+        self.upsample_factor, self.downsample_factor = RESAMPLE_FACTORS[sample_rate]
+        # Number of upsampled samples so far
+        self.position = 0
+        self.state = np.zeros((1, 3))
+
+    def update(self, data):
+        """Return the 30 Hz samples of data."""
+        upsample_factor = self.upsample_factor
+        upsampled = np.zeros((len(data) * upsample_factor, 3))
+        upsampled[::upsample_factor] = data
+        # The low-pass filter does a poor job of rejecting higher frequencies,
+        # which causes some aliasing. It is kept for compatibility.
+        if self.sample_rate not in [30, 60, 90]:
+            a_fp = np.pi / (np.pi + 2 * upsample_factor)
+            b_fp = (np.pi - 2 * upsample_factor) / (np.pi + 2 * upsample_factor)
+            gain = a_fp * upsample_factor
+            upsampled, self.state = self.signal.lfilter(
+                [gain, gain], [1, b_fp], upsampled, axis=0, zi=self.state
+            )
+        start = -self.position % self.downsample_factor
+        self.position += len(upsampled)
+        return upsampled[start :: self.downsample_factor]
+
+    def finish(self):
+        """Return the remaining 30 Hz samples."""
+        return np.empty((0, 3))
+
+
+class _Pow2Resampler:
+    """
+    Resample data to 30 Hz as ActiLife does for powers of 2.
+
+    Data is upsampled to 256 Hz, low-pass filtered, then linearly interpolated to
+    30 Hz. The first filter is centered, so its output lags the input by half its
+    length, which is flushed by `finish`.
+    """
+
+    def __init__(self, signal, sample_rate: int):
+        """Initialise."""
+        self.signal = signal
+        self.factor = 256 // sample_rate
+        # Data sampled at 256 Hz is not filtered
+        self.delay = (len(POW2_FILTER) - 1) // 2 if self.factor > 1 else 0
+        self.fir_state = np.zeros((len(POW2_FILTER) - 1, 3))
+        self.iir_state = None
+        # Number of filtered samples skipped because of the delay
+        self.skipped = 0
+        # 256 Hz samples not yet interpolated, starting at index offset
+        self.data = np.empty((0, 3))
+        self.offset = 0
+        # Number of 30 Hz samples returned
+        self.count = 0
+
+    def update(self, data):
+        """Return the 30 Hz samples which can be computed from data so far."""
+        upsampled = np.zeros((len(data) * self.factor, 3))
+        upsampled[:: self.factor] = data * self.factor
+        return self._interpolate(self._filter(upsampled), final=False)
+
+    def finish(self):
+        """Return the remaining 30 Hz samples."""
+        # Centering the filter pads the data with zeros
+        filtered = self._filter(np.zeros((self.delay, 3)))
+        return self._interpolate(filtered, final=True)
+
+    def _filter(self, upsampled):
+        """Low-pass filter 256 Hz data."""
+        signal = self.signal
+        filtered = upsampled
+        if self.factor > 1:
+            filtered, self.fir_state = signal.lfilter(
+                POW2_FILTER, [1], upsampled, axis=0, zi=self.fir_state
+            )
+        skip = min(self.delay - self.skipped, len(filtered))
+        self.skipped += skip
+        filtered = filtered[skip:]
+        if len(filtered) == 0:
+            return filtered
+        decay = 1 - POW2_GAIN
+        filtered = POW2_GAIN * filtered / decay
+        if self.iir_state is None:
+            zi = signal.lfilter_zi([decay], [1, -decay])
+            self.iir_state = zi.reshape((-1, 1)) * filtered[0]
+        filtered, self.iir_state = signal.lfilter(
+            [decay], [1, -decay], filtered, axis=0, zi=self.iir_state
+        )
+        return filtered
+
+    def _interpolate(self, filtered, final):
+        """Linearly interpolate 256 Hz data to 30 Hz."""
+        self.data = np.concatenate((self.data, filtered))
+        available = self.offset + len(self.data)
+        if final:
+            # The last sample is left to zero, as in ActiLife
+            total = available * 30 // 256
+            end = max(total - 1, 0)
+        else:
+            # Keep a margin so that the last samples are only computed once the
+            # total length is known
+            end = max(int((available - 10) * 30 // 256), self.count)
+            while end > self.count and np.floor((256 / 30) * end) >= available - 10:
+                end -= 1
+        step = (256 / 30) * np.arange(self.count + 1, end + 1, dtype=float)
+        indexes = (np.floor(step) - 1).astype(int) - self.offset
+        data = self.data
+        diffs = data[indexes + 1] - data[indexes]
+        base = data[indexes] - diffs * (indexes + self.offset + 1).reshape((-1, 1))
+        output = step.reshape((-1, 1)) * diffs + base
+        self.count = end
+        if final and total > 0:
+            output = np.concatenate((output, np.zeros((1, 3))))
+        # Keep the samples needed for the next interpolation
+        keep = int(np.floor((256 / 30) * (self.count + 1))) - 1 - self.offset
+        keep = min(max(keep, 0), len(data))
+        self.data = data[keep:]
+        self.offset += keep
+        return output
+
+
+def counts(acceleration, sample_rate: int, epoch: int = 60):
+    """
+    Compute activity counts.
+
+    Parameters:
+    -----------
+    acceleration:
+        Calibrated acceleration, with shape (samples, 3)
+    sample_rate:
+        Sampling rate
+    epoch:
+        Epoch length, in seconds
+
+    Returns:
+    --------
+    Counts of complete epochs, with shape (epochs, 3)
+    """
+    calculator = CountsCalculator(sample_rate, epoch)
+    chunks: List[np.ndarray] = [calculator.update(acceleration), calculator.finish()]
+    return np.concatenate(chunks)
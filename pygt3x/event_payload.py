@@ -0,0 +1,238 @@
+"""Vectorized parsing of log.bin event payloads other than activity."""
+
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+from numpy import typing as npt
+
+from pygt3x import Types
+
+# Battery voltage, in millivolts
+BATTERY_DTYPE = np.dtype([("timestamp", "<i8"), ("voltage", "<u2")])
+
+# Light sensor values, to be scaled with the lux scale factor of info.txt
+LUX_DTYPE = np.dtype([("timestamp", "<i8"), ("lux", "<u2")])
+
+# Capacitive wear sensor. State is 1 when the device is worn, 0 otherwise.
+CAPSENSE_DTYPE = np.dtype(
+    [
+        ("timestamp", "<i8"),
+        ("signal", "<u2"),
+        ("reference", "<u2"),
+        ("state", "u1"),
+        ("bursts", "u1"),
+    ]
+)
+
+# Event types of each stream which can be decoded besides acceleration and
+# temperature
+EVENT_STREAMS: Dict[str, Tuple[Types, ...]] = {
+    "battery": (Types.Battery,),
+    "lux": (Types.Lux,),
+    "capsense": (Types.Capsense,),
+    "epoch": (Types.Epoch, Types.Epoch2, Types.Epoch3, Types.Epoch4),
+    "sensor_data": (Types.SensorSchema, Types.SensorData),
+    "imu_9dof": (Types.Imu9dof,),
+}
+
+# Event types needed to decode each stream
+STREAM_TYPES: Dict[str, Tuple[Types, ...]] = {
+    "acceleration": (Types.Activity, Types.Activity2, Types.Activity3, Types.Event),
+    "temperature": (Types.TemperatureRecord,),
+    **EVENT_STREAMS,
+}
+
+STREAMS: Tuple[str, ...] = tuple(STREAM_TYPES)
+
+DEFAULT_STREAMS: Tuple[str, ...] = ("acceleration", "temperature")
+
+
+def stream_types(streams: Iterable[str]):
+    """
+    Return the event types to read in order to decode streams.
+
+    Params records are always read, since they hold the idle sleep mode setting.
+    """
+    types = {Types.Params.value}
+    for stream in streams:
+        types.update(type.value for type in STREAM_TYPES[stream])
+    return sorted(types)
+
+
+def read_idle_sleep_mode_setting(payload_bytes: bytes):
+    """
+    Read whether idle sleep mode is enabled from a Params payload.
+
+    Parameters:
+    -----------
+    payload_bytes:
+        Data bytes, made of 8-byte parameters
+
+    Returns:
+    --------
+    Whether idle sleep mode is enabled, or None if the payload does not say
+    """
+    activated = None
+    params = np.frombuffer(payload_bytes, dtype="<u8")
+    for param in params:
+        buffer = param.tobytes()
+        address = np.frombuffer(buffer, dtype="<u1")
+        if address[2] == 0x02:
+            activated = np.bitwise_and(address[4], 4) == 4
+    return activated
+
+
+def raw_event_dtype(payload_size: int):
+    """
+    Return the dtype of events kept as raw payloads.
+
+    Payloads are padded with zeros to `payload_size`, and `size` holds the number
+    of bytes of each payload.
+    """
+    return np.dtype(
+        [
+            ("timestamp", "<i8"),
+            ("type", "u1"),
+            ("size", "<u2"),
+            ("payload", "u1", (payload_size,)),
+        ]
+    )
+
+
+def read_battery_payloads(data: npt.NDArray[np.uint8], timestamps):
+    """
+    Parse the payloads of several battery records at once.
+
+    Parameters:
+    -----------
+    data:
+        Payload bytes, one row of 2 bytes per record
+    timestamps:
+        Record timestamps
+
+    Returns:
+    --------
+    Array of `BATTERY_DTYPE`
+    """
+    events = np.empty(len(data), dtype=BATTERY_DTYPE)
+    events["timestamp"] = timestamps
+    events["voltage"] = data[:, :2].copy().view("<u2").reshape(-1)
+    return events
+
+
+def read_lux_payloads(data: npt.NDArray[np.uint8], timestamps):
+    """
+    Parse the payloads of several lux records at once.
+
+    Parameters:
+    -----------
+    data:
+        Payload bytes, one row of 2 bytes per record
+    timestamps:
+        Record timestamps
+
+    Returns:
+    --------
+    Array of `LUX_DTYPE`
+    """
+    events = np.empty(len(data), dtype=LUX_DTYPE)
+    events["timestamp"] = timestamps
+    events["lux"] = data[:, :2].copy().view("<u2").reshape(-1)
+    return events
+
+
+def read_capsense_payloads(data: npt.NDArray[np.uint8], timestamps):
+    """
+    Parse the payloads of several capsense records at once.
+
+    Parameters:
+    -----------
+    data:
+        Payload bytes, one row of 6 bytes per record
+    timestamps:
+        Record timestamps
+
+    Returns:
+    --------
+    Array of `CAPSENSE_DTYPE`
+    """
+    events = np.empty(len(data), dtype=CAPSENSE_DTYPE)
+    events["timestamp"] = timestamps
+    events["signal"] = data[:, 0:2].copy().view("<u2").reshape(-1)
+    events["reference"] = data[:, 2:4].copy().view("<u2").reshape(-1)
+    events["state"] = data[:, 4]
+    events["bursts"] = data[:, 5]
+    return events
+
+
+def read_raw_payloads(
+    data: npt.NDArray[np.uint8], timestamps, types, payload_size: int
+):
+    """
+    Keep the payloads of several records of the same size as raw bytes.
+
+    Parameters:
+    -----------
+    data:
+        Payload bytes, one row per record
+    timestamps:
+        Record timestamps
+    types:
+        Record types
+    payload_size:
+        Size of the payload field, at least the number of columns of `data`
+
+    Returns:
+    --------
+    Array of `raw_event_dtype(payload_size)`
+    """
+    events = np.zeros(len(data), dtype=raw_event_dtype(payload_size))
+    events["timestamp"] = timestamps
+    events["type"] = types
+    events["size"] = data.shape[1]
+    events["payload"][:, : data.shape[1]] = data
+    return events
+
+
+# Decoders of the streams with a known payload layout. Other event streams are
+# kept as raw payloads.
+EVENT_READERS = {
+    "battery": (read_battery_payloads, 2),
+    "lux": (read_lux_payloads, 2),
+    "capsense": (read_capsense_payloads, 6),
+}
+
+EVENT_DTYPES = {
+    "battery": BATTERY_DTYPE,
+    "lux": LUX_DTYPE,
+    "capsense": CAPSENSE_DTYPE,
+}
+
+
+def empty_events(stream: str):
+    """Return an empty array of events of a stream."""
+    if stream in EVENT_READERS:
+        return np.empty(0, dtype=EVENT_DTYPES[stream])
+    return np.empty(0, dtype=raw_event_dtype(0))
+
+
+def concatenate_events(stream: str, events):
+    """
+    Concatenate arrays of events of a stream.
+
+    Raw payloads are padded to the size of the largest one.
+    """
+    if not events:
+        return empty_events(stream)
+    if stream in EVENT_READERS:
+        return np.concatenate(events)
+    payload_size = max(e.dtype["payload"].shape[0] for e in events)
+    output = np.zeros(sum(len(e) for e in events), dtype=raw_event_dtype(payload_size))
+    position = 0
+    for e in events:
+        end = position + len(e)
+        for name in ["timestamp", "type", "size"]:
+            output[name][position:end] = e[name]
+        output["payload"][position:end, : e.dtype["payload"].shape[0]] = e["payload"]
+        position = end
+    return output
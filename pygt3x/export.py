@@ -0,0 +1,273 @@
+"""Export decoded data to memory-mappable columnar files."""
+
+import io
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from pygt3x.components import Info
+
+# Version of the export layout
+EXPORT_FORMAT = 1
+
+EXPORT_FORMATS = ("npy", "arrow")
+
+METADATA_FILE = "metadata.json"
+
+# Shape written in .npy headers until the length of a column is known
+_RESERVED_SHAPE = (np.iinfo(np.int64).max,)
+
+
+def _import_pyarrow():
+    """Import pyarrow, which Arrow exports require."""
+    try:
+        import pyarrow
+    except ImportError as error:
+        raise ImportError(
+            "Arrow exports require pyarrow, install pygt3x[arrow]"
+        ) from error
+    return pyarrow
+
+
+def _npy_header(dtype: np.dtype, shape):
+    """Return the .npy header of a one-dimensional array."""
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(
+        header,
+        {
+            "descr": np.lib.format.dtype_to_descr(dtype),
+            "fortran_order": False,
+            "shape": shape,
+        },
+    )
+    return header.getvalue()
+
+
+class _NpyColumnWriter:
+    """
+    Append values to a .npy file whose length is only known once complete.
+
+    Room for the header is reserved when the file is created, and the header is
+    rewritten with the actual length when the file is closed.
+    """
+
+    def __init__(self, path: str, dtype):
+        """Create the file."""
+        self.dtype = np.dtype(dtype)
+        self.length = 0
+        self.file = open(path, "wb")
+        self.file.write(_npy_header(self.dtype, _RESERVED_SHAPE))
+
+    def write(self, values: np.ndarray):
+        """Append values."""
+        self.file.write(np.ascontiguousarray(values, dtype=self.dtype).data)
+        self.length += len(values)
+
+    def close(self):
+        """Write the header and close the file."""
+        header = _npy_header(self.dtype, (self.length,))
+        # Headers are padded to a multiple of 64 bytes, which leaves enough room
+        # for any length
+        assert len(header) == len(_npy_header(self.dtype, _RESERVED_SHAPE))
+        self.file.seek(0)
+        self.file.write(header)
+        self.file.close()
+
+
+class ExportWriter:
+    """
+    Write data frames to a directory of columnar files, one batch at a time.
+
+    Each table is stored either as one .npy file per column in a subdirectory, or as
+    an Arrow IPC file, and metadata is written to a JSON file once all tables are
+    complete. The index of the data frames is stored as the Timestamp column.
+
+    Parameters:
+    -----------
+    directory:
+        Output directory, created if needed
+    format:
+        "npy" or "arrow". Arrow requires pyarrow.
+    """
+
+    def __init__(self, directory: str, format: str = "npy"):
+        """Initialise."""
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {format}")
+        self.directory = directory
+        self.format = format
+        self.columns: Dict[str, List[str]] = {}
+        self.metadata: Dict = {}
+        self._writers: Dict[str, Dict[str, _NpyColumnWriter]] = {}
+        self._arrow_writers: Dict = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def __enter__(self):
+        """Return the writer."""
+        return self
+
+    def __exit__(self, typ, value, traceback):
+        """Close all files, writing metadata if no error occurred."""
+        self.close(write_metadata=typ is None)
+
+    def write(self, table: str, df: pd.DataFrame):
+        """Append a data frame to a table."""
+        columns = {"Timestamp": df.index.to_numpy()}
+        columns.update({name: df[name].to_numpy() for name in df.columns})
+        if table not in self.columns:
+            self.columns[table] = list(columns)
+        if self.format == "npy":
+            self._write_npy(table, columns)
+        else:
+            self._write_arrow(table, columns)
+
+    def _write_npy(self, table, columns):
+        """Append columns to .npy files."""
+        writers = self._writers.get(table)
+        if writers is None:
+            path = os.path.join(self.directory, table)
+            os.makedirs(path, exist_ok=True)
+            writers = {
+                name: _NpyColumnWriter(os.path.join(path, f"{name}.npy"), values.dtype)
+                for name, values in columns.items()
+            }
+            self._writers[table] = writers
+        for name, values in columns.items():
+            writers[name].write(values)
+
+    def _write_arrow(self, table, columns):
+        """Append columns to an Arrow IPC file as a record batch."""
+        pa = _import_pyarrow()
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(values) for values in columns.values()], names=list(columns)
+        )
+        writer = self._arrow_writers.get(table)
+        if writer is None:
+            path = os.path.join(self.directory, f"{table}.arrow")
+            writer = pa.ipc.new_file(path, batch.schema)
+            self._arrow_writers[table] = writer
+        writer.write_batch(batch)
+
+    def close(self, write_metadata: bool = True):
+        """Close all files, then write metadata."""
+        for writers in self._writers.values():
+            for writer in writers.values():
+                writer.close()
+        for arrow_writer in self._arrow_writers.values():
+            arrow_writer.close()
+        self._writers = {}
+        self._arrow_writers = {}
+        if write_metadata:
+            with open(os.path.join(self.directory, METADATA_FILE), "w") as f:
+                json.dump(
+                    {
+                        "export_format": EXPORT_FORMAT,
+                        "format": self.format,
+                        "tables": self.columns,
+                        "metadata": self.metadata,
+                    },
+                    f,
+                )
+
+
+class ExportedFile:
+    """
+    Data exported with `FileReader.export`, memory-mapped from disk.
+
+    Columns of .npy exports are mapped without copying. Arrow tables are mapped
+    as well, but columns spanning several record batches, and boolean columns, are
+    copied when converted to NumPy arrays.
+
+    Parameters:
+    -----------
+    directory:
+        Export directory
+
+    Attributes:
+    -----------
+    info:
+        File metadata
+    idle_sleep_mode_activated:
+        Whether idle sleep mode was enabled on the device
+    """
+
+    def __init__(self, directory: str):
+        """Read metadata."""
+        self.directory = directory
+        with open(os.path.join(directory, METADATA_FILE)) as f:
+            metadata = json.load(f)
+        if metadata["export_format"] != EXPORT_FORMAT:
+            raise ValueError(
+                f"Unsupported export format version: {metadata['export_format']}"
+            )
+        self.format = metadata["format"]
+        self.columns: Dict[str, List[str]] = metadata["tables"]
+        self.info = Info(**metadata["metadata"]["info"])
+        self.idle_sleep_mode_activated: Optional[bool] = metadata["metadata"][
+            "idle_sleep_mode_activated"
+        ]
+
+    def table(self, name: str = "acceleration"):
+        """Return a table as a memory-mapped pyarrow Table (Arrow exports only)."""
+        pa = _import_pyarrow()
+        if self.format != "arrow":
+            raise ValueError("Only Arrow exports can be read as Arrow tables")
+        source = pa.memory_map(os.path.join(self.directory, f"{name}.arrow"))
+        return pa.ipc.open_file(source).read_all()
+
+    def arrays(self, name: str = "acceleration") -> Dict[str, np.ndarray]:
+        """Return the columns of a table as NumPy arrays, empty if it was not written.
+
+        Parameters:
+        -----------
+        name
+            "acceleration" or "temperature"
+        """
+        if name not in self.columns:
+            return {}
+        if self.format == "npy":
+            return {
+                column: np.load(
+                    os.path.join(self.directory, name, f"{column}.npy"), mmap_mode="r"
+                ).view(np.ndarray)
+                for column in self.columns[name]
+            }
+        table = self.table(name)
+        return {
+            column: table.column(column).to_numpy() for column in self.columns[name]
+        }
+
+    def to_pandas(self, name: str = "acceleration"):
+        """Return a table as a pandas data frame indexed by timestamp.
+
+        The data frame wraps the arrays returned by `arrays`.
+
+        Parameters:
+        -----------
+        name
+            "acceleration" or "temperature"
+        """
+        arrays = self.arrays(name)
+        if not arrays:
+            return pd.DataFrame(index=pd.Index([], name="Timestamp"))
+        index = pd.Index(arrays.pop("Timestamp"), name="Timestamp", copy=False)
+        return pd.DataFrame(arrays, index=index, copy=False)
+
+
+def read_export(directory: str):
+    """
+    Open data exported with `FileReader.export`.
+
+    Parameters:
+    -----------
+    directory:
+        Export directory
+
+    Returns:
+    --------
+    ExportedFile
+    """
+    return ExportedFile(directory)
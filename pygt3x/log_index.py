@@ -0,0 +1,292 @@
+"""Index of log.bin records."""
+
+import os
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from pygt3x import Types
+
+HEADER_SIZE = 8
+
+ACTIVITY_TYPES = [Types.Activity.value, Types.Activity2.value, Types.Activity3.value]
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("offset", "<i8"),
+        ("separator", "u1"),
+        ("type", "u1"),
+        ("timestamp", "<u4"),
+        ("payload_size", "<u2"),
+    ]
+)
+
+
+def scan_records(buffer: bytes):
+    """
+    Index the records stored in a log.bin buffer.
+
+    Each record is made of an 8 byte header, a payload and a 1 byte checksum. Since
+    the position of a record depends on the payload size of the previous one, the
+    buffer is walked once to collect record offsets, then all header fields are
+    gathered in one vectorized pass. As with `LogReader.read_event`, scanning stops
+    at the first truncated record.
+
+    Parameters:
+    -----------
+    buffer:
+        Decompressed log.bin content
+
+    Returns:
+    --------
+    Structured array of `RECORD_DTYPE`, one row per record
+
+    """
+    length = len(buffer)
+    offsets: List[int] = []
+    append = offsets.append
+    position = 0
+    while position + HEADER_SIZE <= length:
+        payload_size = buffer[position + 6] | (buffer[position + 7] << 8)
+        next_position = position + HEADER_SIZE + payload_size + 1
+        if next_position > length:
+            break
+        append(position)
+        position = next_position
+
+    index = np.empty(len(offsets), dtype=RECORD_DTYPE)
+    index["offset"] = offsets
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    header = data[index["offset"][:, None] + np.arange(HEADER_SIZE)]
+    index["separator"] = header[:, 0]
+    index["type"] = header[:, 1]
+    index["timestamp"] = header[:, 2:6].copy().view("<u4").reshape(-1)
+    index["payload_size"] = header[:, 6:8].copy().view("<u2").reshape(-1)
+    return index
+
+
+def validate_checksums(buffer: bytes, index: np.ndarray):
+    """
+    Verify the checksums of indexed records in a single pass.
+
+    The checksum of a record is the one's complement of the XOR of its header and
+    payload bytes, so the XOR of a whole valid record, checksum included, is 0xFF.
+    All records are reduced at once with a segmented XOR over the buffer.
+
+    Parameters:
+    -----------
+    buffer:
+        Decompressed log.bin content
+    index:
+        Records to verify, as returned by `scan_records`
+
+    Returns:
+    --------
+    Boolean mask which is True for records with a valid checksum
+
+    """
+    if len(index) == 0:
+        return np.ones(0, dtype=bool)
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    bounds = np.empty(2 * len(index), dtype=np.int64)
+    bounds[0::2] = index["offset"]
+    bounds[1::2] = index["offset"] + HEADER_SIZE + index["payload_size"] + 1
+    if bounds[-1] == len(data):
+        # reduceat runs the last segment up to the end of the buffer
+        bounds = bounds[:-1]
+    return np.bitwise_xor.reduceat(data, bounds)[0::2] == 0xFF
+
+
+def gather_payloads(buffer: bytes, index: np.ndarray):
+    """
+    Gather the payloads of records which share the same payload size.
+
+    Parameters:
+    -----------
+    buffer:
+        Decompressed log.bin content
+    index:
+        Records to gather, which must all have the same payload size
+
+    Returns:
+    --------
+    Payload bytes as an array of shape (records, payload_size)
+
+    """
+    payload_size = int(index["payload_size"][0]) if len(index) > 0 else 0
+    assert (index["payload_size"] == payload_size).all()
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    return data[index["offset"][:, None] + HEADER_SIZE + np.arange(payload_size)]
+
+
+def select_time_range(
+    index: np.ndarray,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    types: Sequence[int] = (Types.TemperatureRecord.value,),
+    margin: int = 0,
+    is_valid: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+):
+    """
+    Select the records needed to decode data between two timestamps.
+
+    Besides records within the range, this keeps the last valid activity record
+    before `start - margin`, whose values are used to fill idle sleep mode gaps,
+    records up to the first activity record from `end + margin` on, which may close
+    an idle sleep mode gap, and the Params records which come before. Records which
+    travel back in time by up to `margin` seconds, across `start` or `end`, are
+    thus parsed as in a full read. Temperature records, and records of other
+    `types`, are selected by their own timestamp, since they are not logged in
+    order with activity.
+
+    Parameters:
+    -----------
+    index:
+        Records of the log, as returned by `scan_records`
+    start:
+        First timestamp to decode, in seconds
+    end:
+        Timestamp to decode until (excluded), in seconds
+    types:
+        Types of the records selected by their own timestamp
+    margin:
+        Number of seconds of activity records kept before `start` and after `end`
+    is_valid:
+        Function returning whether the checksums of records are valid, to skip
+        corrupt activity records before `start`. Records are assumed valid if it
+        is None.
+
+    Returns:
+    --------
+    Selected records, in their original order
+
+    """
+    is_activity = np.isin(index["type"], ACTIVITY_TYPES) & (index["payload_size"] > 1)
+    first = 0
+    if start is not None:
+        before = np.flatnonzero(is_activity & (index["timestamp"] < start - margin))
+        # Corrupt records are dropped by the parser, which would then have no
+        # values to fill idle sleep mode gaps with
+        for position in before[::-1].tolist():
+            if is_valid is None or is_valid(index[position : position + 1])[0]:
+                first = position
+                break
+    last = len(index)
+    if end is not None:
+        after = np.flatnonzero(is_activity & (index["timestamp"] >= end + margin))
+        after = after[after >= first]
+        if len(after) > 0:
+            last = int(after[0]) + 1
+    selected = np.zeros(len(index), dtype=bool)
+    selected[first:last] = True
+    selected[:first] = index["type"][:first] == Types.Params.value
+    in_range = np.isin(index["type"], types)
+    if start is not None:
+        in_range &= index["timestamp"] >= start
+    if end is not None:
+        in_range &= index["timestamp"] < end
+    selected |= in_range
+    return index[selected]
+
+
+def partition_records(index: np.ndarray, partitions: int, types: Sequence[int]):
+    """
+    Split records into time-contiguous partitions which can be parsed on their own.
+
+    A partition can only start with an activity record which directly follows an
+    activity record of the previous second, among records of `types`, when all
+    records of `types` before it have earlier timestamps than all records from it
+    on. Activity records end idle sleep mode and no record travels back in time
+    across the boundary, so parsing a partition from a fresh state gives the same
+    records as parsing it after the previous ones. Boundaries are chosen as close
+    as possible to an even split of the records.
+
+    Parameters:
+    -----------
+    index:
+        Records of the log, as returned by `scan_records`
+    partitions:
+        Number of partitions wanted
+    types:
+        Types of the records which change the state of the parser
+
+    Returns:
+    --------
+    Positions of the first record of each partition, starting with 0. There may be
+    fewer partitions than requested.
+
+    """
+    positions = np.flatnonzero(np.isin(index["type"], types))
+    if partitions < 2 or len(positions) < 2:
+        return [0]
+    records = index[positions]
+    timestamps = records["timestamp"].astype(np.int64)
+    is_activity = np.isin(records["type"], ACTIVITY_TYPES) & (
+        records["payload_size"] > 1
+    )
+    latest_before = np.maximum.accumulate(timestamps)[:-1]
+    earliest_after = np.minimum.accumulate(timestamps[::-1])[::-1][1:]
+    is_boundary = (
+        is_activity[1:]
+        & is_activity[:-1]
+        & (timestamps[1:] == timestamps[:-1] + 1)
+        & (latest_before < earliest_after)
+    )
+    starts = positions[1:][is_boundary]
+    if len(starts) == 0:
+        return [0]
+    targets = len(index) * np.arange(1, partitions) // partitions
+    closest = np.searchsorted(starts, targets).clip(max=len(starts) - 1)
+    before = (closest - 1).clip(min=0)
+    closer = np.abs(starts[before] - targets) < np.abs(starts[closest] - targets)
+    chosen = np.where(closer, starts[before], starts[closest])
+    return [0] + np.unique(chosen).tolist()
+
+
+def save_index(file_name: str, index: np.ndarray, crc: int, size: int):
+    """
+    Save a record index to a sidecar file.
+
+    Parameters:
+    -----------
+    file_name:
+        Sidecar file name
+    index:
+        Records of the log, as returned by `scan_records`
+    crc:
+        CRC-32 of the indexed log.bin, as stored in the archive
+    size:
+        Size of the indexed log.bin
+    """
+    with open(file_name, "wb") as f:
+        np.savez(f, index=index, log=np.array([crc, size], dtype=np.int64))
+
+
+def load_index(file_name: str, crc: int, size: int):
+    """
+    Load a record index from a sidecar file.
+
+    Parameters:
+    -----------
+    file_name:
+        Sidecar file name
+    crc:
+        CRC-32 of log.bin, as stored in the archive
+    size:
+        Size of log.bin
+
+    Returns:
+    --------
+    Index of log.bin records, or None if the file does not exist or was made for
+    another log
+
+    """
+    if not os.path.exists(file_name):
+        return None
+    with np.load(file_name) as data:
+        if data["log"].tolist() != [crc, size]:
+            return None
+        index = data["index"]
+    if index.dtype != RECORD_DTYPE:
+        return None
+    return index
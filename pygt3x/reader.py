@@ -1,27 +1,138 @@
 """Read data from files."""
 
+import bisect
 import json
 import logging
-from collections import Counter
-from typing import Optional
-from zipfile import ZipFile
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
 from pygt3x import Types
 from pygt3x.activity_payload import (
-    read_activity1_payload,
-    read_activity2_payload,
-    read_activity3_payload,
-    read_nhanes_payload,
-    read_temperature_payload,
+    ISM_SEGMENT_DTYPE,
+    NHANES_SCALE,
+    SAMPLE_DTYPE,
+    concatenate_samples,
+    fill_idle_sleep_mode,
+    iter_nhanes_samples,
+    read_activity1_payloads,
+    read_activity2_payloads,
+    read_activity3_payloads,
+    read_nhanes_samples,
+    read_temperature_payloads,
+    samples_to_array,
+    samples_to_time,
 )
+from pygt3x.archive import Archive, Source
+from pygt3x.cache import DEFAULT_CACHE_SIZE, ResultCache, cache_key
 from pygt3x.calibration import CalibrationV2Service
 from pygt3x.components import Header, Info, RawEvent
+from pygt3x.counts import CountsCalculator
+from pygt3x.event_payload import (
+    DEFAULT_STREAMS,
+    EVENT_DTYPES,
+    EVENT_READERS,
+    EVENT_STREAMS,
+    STREAMS,
+    concatenate_events,
+    empty_events,
+    read_idle_sleep_mode_setting,
+    read_raw_payloads,
+    stream_types,
+)
+from pygt3x.export import ExportWriter
+from pygt3x.log_index import (
+    HEADER_SIZE,
+    gather_payloads,
+    load_index,
+    save_index,
+    scan_records,
+    partition_records,
+    select_time_range,
+    validate_checksums,
+)
+from pygt3x.stats import ReadStats, timer
 
 logger = logging.getLogger(__name__)
 
+# Number of bytes of log.bin decompressed at a time when reading in chunks
+CHUNK_READ_SIZE = 1 << 20
+# Number of seconds records can travel back in time when reading in chunks
+MAX_TIME_TRAVEL = 600
+# Number of samples converted at a time by to_pandas
+CONVERT_BLOCK_SIZE = 1 << 16
+
+KNOWN_TYPES = [type.value for type in Types]
+
+ACTIVITY_READERS = {
+    Types.Activity: read_activity1_payloads,
+    Types.Activity2: read_activity2_payloads,
+    Types.Activity3: read_activity3_payloads,
+}
+
+
+@dataclass
+class SampleCountSummary:
+    """
+    Seconds of acceleration data which do not hold sample rate samples.
+
+    Attributes:
+    -----------
+    seconds:
+        Number of seconds checked
+    short_seconds:
+        Number of seconds with fewer samples than the sample rate
+    long_seconds:
+        Number of seconds with more samples than the sample rate
+    short_ranges:
+        Runs of consecutive short seconds, as (first, last + 1) tuples
+    long_ranges:
+        Runs of consecutive long seconds, as (first, last + 1) tuples
+    """
+
+    seconds: int = 0
+    short_seconds: int = 0
+    long_seconds: int = 0
+    short_ranges: List[Tuple[int, int]] = field(default_factory=list)
+    long_ranges: List[Tuple[int, int]] = field(default_factory=list)
+
+
+def _count_samples_per_second(seconds):
+    """Return the distinct seconds of samples and their number of samples."""
+    if len(seconds) == 0:
+        return seconds, np.zeros(0, dtype=np.int64)
+    steps = np.diff(seconds)
+    if len(steps) == 0 or steps.min() >= 0:
+        # Samples are in time order, so each second is a run
+        starts = np.flatnonzero(steps) + 1
+        starts = np.concatenate(([0], starts))
+        return seconds[starts], np.diff(starts, append=len(seconds))
+    first = seconds.min()
+    if seconds.max() - first <= 4 * len(seconds):
+        counts = np.bincount(seconds - first)
+        values = np.flatnonzero(counts)
+        return values + first, counts[values]
+    # Seconds are too far apart for a dense count
+    return np.unique(seconds, return_counts=True)
+
+
+def _second_ranges(seconds, ranges: List[Tuple[int, int]]):
+    """Append runs of consecutive seconds to ranges, extending the last one."""
+    if len(seconds) == 0:
+        return
+    breaks = np.flatnonzero(np.diff(seconds) != 1) + 1
+    firsts = seconds[np.concatenate(([0], breaks))].tolist()
+    lasts = seconds[np.concatenate((breaks - 1, [len(seconds) - 1]))].tolist()
+    for first, last in zip(firsts, lasts):
+        if ranges and ranges[-1][1] == first:
+            ranges[-1] = (ranges[-1][0], last + 1)
+        else:
+            ranges.append((first, last + 1))
+
 
 class FileReader:
     """Read GT3X/AGDC files.
@@ -29,24 +140,128 @@ class FileReader:
     Parameters:
     -----------
     file_name:
-        Input file name
+        Input file name, bytes-like object holding the archive, or seekable binary
+        file object. When log.bin is stored without compression, it is parsed from
+        a memory map of the file (or from the buffer), without being copied.
+    num_rows:
+        Number of events to read
+    verify_checksums:
+        Verify event checksums. Can be disabled for trusted archives which have
+        already been validated.
+    lazy:
+        Do not parse data when entering the context. This is meant for reading
+        large files with `iter_chunks`.
+    start:
+        Only read data from this timestamp on, in seconds
+    end:
+        Only read data before this timestamp, in seconds
+    index_file:
+        Sidecar file holding the index of log.bin records. It is written the first
+        time the archive is read, and used to locate records afterwards.
+    cache_dir:
+        Directory where decoded data is cached. Reading the same archive again
+        then maps the cached arrays instead of decoding the archive. Only reads
+        of whole archives fill the cache, but time windows are served from it.
+    cache_size:
+        Size of the cache directory above which least recently used entries are
+        evicted, in bytes
+    fill_idle_sleep_mode:
+        Fill in gaps created by idle sleep mode with the last values recorded. If
+        False, gaps are only kept as segments in `idle_sleep_mode_segments`, which
+        saves memory for recordings with long idle periods.
+    validate_sample_counts:
+        Check that each second of acceleration data holds sample rate samples.
+        Seconds which do not are reported in `sample_counts`, and logged as a
+        single warning.
+    streams:
+        Data to decode, among "acceleration", "temperature" and the event streams
+        of `pygt3x.event_payload.EVENT_STREAMS`. Event streams are decoded in the
+        same pass as acceleration, and stored in `events`. Records which are not
+        needed for these streams are skipped without reading their payload or
+        verifying their checksum.
+    collect_stats:
+        Collect the wall time of each reading stage and counters of the records
+        read in `stats`, see `pygt3x.stats.ReadStats`. Statistics are not
+        collected by default.
+    workers:
+        Experimental: number of processes decoding log.bin when entering the
+        context, 1 by default. Records are split into time-contiguous partitions,
+        which are parsed in separate processes and stitched back, giving the same
+        data as a single process. Decompressing, indexing and verifying checksums
+        still run in this process, and records and results are copied between
+        processes, which has so far cost more than the parallel decoding saves:
+        reading a 1-day recording is slower with 2 or 4 workers than with 1.
+        Lazy reads are not affected.
     """
 
-    def __init__(self, file_name: str, num_rows: Optional[int] = None):
+    def __init__(
+        self,
+        file_name: Source,
+        num_rows: Optional[int] = None,
+        verify_checksums: bool = True,
+        lazy: bool = False,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        index_file: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        fill_idle_sleep_mode: bool = True,
+        validate_sample_counts: bool = True,
+        streams: Iterable[str] = DEFAULT_STREAMS,
+        collect_stats: bool = False,
+        workers: int = 1,
+    ):
         """Initialise."""
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.workers = workers
+        self.streams = frozenset(streams)
+        unknown = self.streams.difference(STREAMS)
+        if unknown:
+            raise ValueError(f"Unknown streams: {sorted(unknown)}")
         self.file_name = file_name
-        self.acceleration = np.empty((0, 5))
+        self.verify_checksums = verify_checksums
+        self.lazy = lazy
+        self.start = start
+        self.end = end
+        self.index_file = index_file
+        self.cache = None if cache_dir is None else ResultCache(cache_dir, cache_size)
+        # Acceleration samples, see SAMPLE_DTYPE
+        self.samples = np.empty(0, dtype=SAMPLE_DTYPE)
+        # Array built by the acceleration property, and the samples it was built from
+        self._acceleration: Optional[np.ndarray] = None
+        self._acceleration_samples: Optional[np.ndarray] = None
+        # Time of sample timestamp 0, in seconds
+        self.time_offset = 0.0
+        self.fill_idle_sleep_mode = fill_idle_sleep_mode
+        # Idle sleep mode gaps, see ISM_SEGMENT_DTYPE. Unless fill_idle_sleep_mode is
+        # False, they are also filled in in samples.
+        self.idle_sleep_mode_segments = np.empty(0, dtype=ISM_SEGMENT_DTYPE)
         self.temperature = np.empty((0, 3))
+        # Decoded events of each requested event stream
+        self.events: Dict[str, np.ndarray] = {
+            stream: empty_events(stream)
+            for stream in EVENT_STREAMS
+            if stream in self.streams
+        }
         self.idle_sleep_mode_activated = None
+        self.validate_sample_counts = validate_sample_counts
+        # Result of sample count validation, None if it was skipped
+        self.sample_counts: Optional[SampleCountSummary] = None
         self.num_rows = num_rows
         self.nhanes = None
+        # Timings and counters of the read, None unless collect_stats is True
+        self.stats: Optional[ReadStats] = ReadStats() if collect_stats else None
 
     def __enter__(self):
         """Open zipped file and ret up readers."""
-        self.zipfile = ZipFile(self.file_name)
+        self.archive = Archive(self.file_name)
+        self.zipfile = self.archive.zip_file
         try:
             self.logfile = self.zipfile.open("log.bin", "r")
-            self.logreader = LogReader(self.logfile)
+            self.logreader = LogReader(
+                self.logfile, self.stats, self.archive.member_view("log.bin")
+            )
             self.nhanes = False
         except KeyError:
             # V1 file
@@ -54,16 +269,115 @@ class FileReader:
             self.logfile = self.zipfile.open("log.txt", "r")
             self.activity_file = self.zipfile.open("activity.bin", "r")
             self.nhanes = True
-        self.info = Info.read_zip(self.zipfile)
-        self.calibration = self.read_json("calibration.json")
-        self.temperature_calibration = self.read_json("temperature_calibration.json")
-        self._get_data(self.num_rows)
+        use_cache = self.cache is not None and not self.lazy and self.num_rows is None
+        if use_cache:
+            key = cache_key(
+                self.zipfile,
+                verify_checksums=self.verify_checksums,
+                fill_idle_sleep_mode=self.fill_idle_sleep_mode,
+                streams=sorted(self.streams),
+            )
+            with timer(self.stats, "cache"):
+                loaded = self._load_cache(key)
+            if loaded:
+                self._validate_sample_counts(self.samples)
+                if self.stats is not None:
+                    self.stats.samples += len(self.samples)
+                return self
+        with timer(self.stats, "metadata"):
+            self.info = Info.read_zip(self.zipfile)
+            self.calibration = self.read_json("calibration.json")
+            self.temperature_calibration = self.read_json(
+                "temperature_calibration.json"
+            )
+        if not self.lazy:
+            self._get_data(self.num_rows)
+            if use_cache and self.start is None and self.end is None:
+                with timer(self.stats, "cache"):
+                    self._store_cache(key)
         return self
 
+    def _load_cache(self, key):
+        """Take decoded data from the cache, returning whether it was there."""
+        entry = self.cache.load(key)
+        if entry is None:
+            return False
+        arrays, metadata = entry
+        self.info = Info(**metadata["info"])
+        self.calibration = metadata["calibration"]
+        self.temperature_calibration = metadata["temperature_calibration"]
+        self.idle_sleep_mode_activated = metadata["idle_sleep_mode_activated"]
+        self.time_offset = metadata["time_offset"]
+        self.samples = self._select_samples(arrays["samples"])
+        self.temperature = self._select_rows(arrays["temperature"])
+        self.idle_sleep_mode_segments = self._select_segments(
+            arrays["idle_sleep_mode_segments"]
+        )
+        for stream in self.events:
+            self.events[stream] = self._select_events(arrays[f"events_{stream}"])
+        return True
+
+    def _store_cache(self, key):
+        """Store decoded data in the cache."""
+        idle_sleep_mode_activated = self.idle_sleep_mode_activated
+        if idle_sleep_mode_activated is not None:
+            idle_sleep_mode_activated = bool(idle_sleep_mode_activated)
+        self.cache.store(
+            key,
+            {
+                "samples": self.samples,
+                "temperature": self.temperature,
+                "idle_sleep_mode_segments": self.idle_sleep_mode_segments,
+                **{
+                    f"events_{stream}": events for stream, events in self.events.items()
+                },
+            },
+            {
+                "info": asdict(self.info),
+                "calibration": self.calibration,
+                "temperature_calibration": self.temperature_calibration,
+                "idle_sleep_mode_activated": idle_sleep_mode_activated,
+                "time_offset": self.time_offset,
+            },
+        )
+
     def __exit__(self, typ, value, traceback):
         """Close file descriptors."""
         self.logfile.__exit__(typ, value, traceback)
-        self.zipfile.__exit__(typ, value, traceback)
+        if self.logreader is not None:
+            self.logreader.buffer = None
+        self.archive.close()
+
+    @property
+    def acceleration(self):
+        """Acceleration as an array of time, X, Y, Z and idle sleep mode columns.
+
+        The array is built from `samples` on first access, and kept until `samples`
+        is replaced. It takes 40 bytes per sample: prefer `samples` or `to_pandas`.
+        """
+        if self._acceleration is None or self._acceleration_samples is not self.samples:
+            self._acceleration = self._samples_to_array(self.samples)
+            self._acceleration_samples = self.samples
+        return self._acceleration
+
+    @acceleration.setter
+    def acceleration(self, acceleration):
+        """Replace the acceleration array, which is deprecated."""
+        warnings.warn(
+            "Assigning FileReader.acceleration is deprecated and does not change "
+            "samples or to_pandas; assign FileReader.samples instead",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        self._acceleration = acceleration
+        self._acceleration_samples = self.samples
+
+    def _samples_to_array(self, samples):
+        """Convert samples to a float array, with NHANES values scaled."""
+        output = samples_to_array(samples, self.info.sample_rate, self.time_offset)
+        if self.nhanes:
+            output[:, 1:4] = np.round(output[:, 1:4] / NHANES_SCALE, 3)
+        return output
 
     def read_json(self, file_name):
         """Read calibration info from file."""
@@ -73,34 +387,6 @@ class FileReader:
             calibration = json.load(f)
             return calibration
 
-    def _fill_ism(self, idle_sleep_mode_started, idle_sleep_mode_ended, last_values):
-        """Fill in gaps created by idle sleep mode."""
-        timestamps = (
-            np.arange(idle_sleep_mode_started, idle_sleep_mode_ended)
-            .repeat(self.info.sample_rate)
-            .reshape(-1, 1)
-        )
-        add = np.tile(
-            ((np.ones((self.info.sample_rate, 1))).cumsum() - 1)
-            / self.info.sample_rate,
-            timestamps.shape[0] // self.info.sample_rate,
-        )
-        timestamps += add.reshape((-1, 1))
-        values = last_values.reshape((1, 4)).repeat(timestamps.shape[0], axis=0)
-
-        result = np.concatenate((timestamps, values), axis=1).reshape(
-            (-1, self.info.sample_rate, 5), order="C"
-        )
-        result[:, :, 4] = 1
-        return result
-
-    def _validate_payload(self, payload):
-        shape = payload.shape
-        expected_shape = (self.info.sample_rate, 5)
-        if shape[1:] != expected_shape and shape != expected_shape:
-            logger.warning("Unexpected payload shape %s", shape)
-        return payload
-
     def read_events(self, num_rows=None):
         """Read events from file.
 
@@ -121,11 +407,14 @@ class FileReader:
 
     def _get_data_nhanes(self):
         """Yield NHANES acceleration data."""
-        payload = read_nhanes_payload(
-            self.activity_file,
-            self.info.start_date,
-            self.info.sample_rate,
-        )
+        self.time_offset = self.info.start_date / 1e9
+        file_size = self.zipfile.getinfo("activity.bin").file_size
+        with timer(self.stats, "decode"):
+            payload = read_nhanes_samples(
+                self.activity_file, self.info.sample_rate, file_size
+            )
+        if self.stats is not None:
+            self.stats.bytes_read += file_size
         return [payload], []
 
     def _get_data_default(self, num_rows=None):
@@ -136,162 +425,190 @@ class FileReader:
         num_rows
             Number of events to read.
         """
-        acceleration = []
-        temperature = []
-        idle_sleep_mode_started = None
-        # This is used for filling in gaps created by idle sleep mode
-        last_values = None
-        last_idsm_ts = 0
-        # Initialize evt in case there are no events in the GT3x file
-        evt = None
-        for evt in self.read_events(num_rows):
-
-            if not evt.is_checksum_valid:
-                logger.warning(
-                    "Event checksum does not match at %s .", evt.header.timestamp
-                )
-                continue
+        parser = self._parser()
+        log_buffer, index, last_timestamp = self._read_log(parser, num_rows)
+        parser.feed(log_buffer, index)
+        parser.last_timestamp = last_timestamp
+        parser.finish()
+        self._set_events(parser)
+        return parser.acceleration, parser.temperature
 
-            try:
-                type = Types(evt.header.event_type)
-            except ValueError:
-                logger.warning("Unsupported event type %s", evt.header.event_type)
-                continue
+    def _read_log(self, parser, num_rows=None):
+        """Read log.bin records, within the time range if there is one.
 
-            if type == Types.Params:
-                params = np.frombuffer(evt.payload, dtype="<u8")
-                for param in params:
-                    buffer = param.tobytes()
-                    address = np.frombuffer(buffer, dtype="<u1")
-                    if address[2] == 0x02:
-                        self.idle_sleep_mode_activated = (
-                            np.bitwise_and(address[4], 4) == 4
-                        )
+        Returns:
+        --------
+        Tuple of a buffer holding the records, their index within this buffer, and
+        the timestamp of the last record in the time range (None if there is none).
+        Records of types which are not needed may have been dropped, so that this
+        timestamp, up to which idle sleep mode is filled in, is returned on its own.
+        """
+        if self.start is None and self.end is None and self.index_file is None:
+            index = self.logreader.read_index(num_rows)
+            return self.logreader.buffer, index, _last_timestamp(index)
+        index = self._read_log_index()[:num_rows]
+        index = select_time_range(
+            index,
+            self.start,
+            self.end,
+            parser.timestamped_types,
+            MAX_TIME_TRAVEL,
+            self._has_valid_checksums if self.verify_checksums else None,
+        )
+        last_timestamp = _last_timestamp(index)
+        index = index[np.isin(index["type"], parser.types)]
+        return (*self.logreader.read_records(index), last_timestamp)
 
-            # dt is time delta w.r.t. last valid acceleration datapoint
-            try:
-                last_second = acceleration[-1][0, 0]
-            except IndexError:
-                dt = 0
-            else:
-                dt = evt.header.timestamp - last_second
+    def _get_data_partitioned(self, num_rows=None):
+        """Decode partitions of log.bin in a process pool.
 
-            # Time travel dt is relative to last event,
-            # no matter whether it had valid data
-            # or was e.g. ISM start/end
-            time_travel_dt = last_idsm_ts - evt.header.timestamp
-            if time_travel_dt > 0:
-                logger.debug(
-                    "%s --> %s time drift by %s s",
-                    evt.header.timestamp,
-                    dt,
-                    time_travel_dt,
-                )
+        The log is indexed and checksums are verified at once, then records are
+        split into partitions which can be parsed on their own (see
+        `partition_records`). Each partition is parsed, deduplicated and joined by
+        a worker, and partitions are concatenated in order.
 
-            # Idle sleep mode is encoded as an event with payload 8 when entering
-            # and 09 when leaving.
-            if type == Types.Event and evt.payload == b"\x08":
-                if not self.idle_sleep_mode_activated:
-                    logger.error(
-                        "Found activation of idle sleep mode in the data, but idle "
-                        "sleep mode was not activated in the device. This is probably a"
-                        "bug in the parser."
-                    )
-                last_idsm_ts = evt.header.timestamp
-                dt_idm = dt
-                if dt >= 2:
-                    ts = pd.to_datetime(evt.header.timestamp, unit="s")
-                    logger.debug("Missed %s s before %s", dt, ts)
+        Returns:
+        --------
+        Tuple of samples (None if there are none), idle sleep mode segments and
+        temperature arrays
+        """
+        parser = self._parser()
+        log_buffer, index, last_timestamp = self._read_log(parser, num_rows)
+        index = parser.select(log_buffer, index)
+        starts = partition_records(index, self.workers, parser.parsed_types)
+        ends = starts[1:] + [len(index)]
+        activated = self._idle_sleep_mode_settings(log_buffer, index, starts)
+        # Checksums were verified by select
+        settings = replace(parser.settings, verify_checksums=False)
+        arguments = [
+            (
+                settings,
+                None if self.stats is None else ReadStats(),
+                setting,
+                last_timestamp if end == len(index) else None,
+                *_slice_records(log_buffer, index[start:end]),
+            )
+            for start, end, setting in zip(starts, ends, activated)
+        ]
+        if len(arguments) == 1:
+            results = [_decode_partition(*arguments[0])]
+        else:
+            level = logger.getEffectiveLevel()
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = [
+                    executor.submit(_decode_partition_in_worker, level, *a)
+                    for a in arguments
+                ]
+                results = [future.result() for future in futures]
+            for result in results:
+                for record in result.log_records:
+                    logging.getLogger(record.name).handle(record)
+        self.idle_sleep_mode_activated = results[-1].idle_sleep_mode_activated
+        for stream in self.events:
+            self.events[stream] = self._select_events(
+                concatenate_events(stream, [r.events[stream] for r in results])
+            )
+        if self.stats is not None:
+            for result in results:
+                self.stats.merge(result.stats)
+        temperature = [t for r in results for t in r.temperature]
+        results = [r for r in results if r.samples is not None]
+        if not results:
+            return None, None, temperature
+        samples = concatenate_samples([r.samples for r in results])
+        segments = np.concatenate([r.segments for r in results])
+        return samples, segments, temperature
 
-                if idle_sleep_mode_started is not None:
-                    logger.warning(
-                        "Idle sleep mode was already active at %s",
-                        idle_sleep_mode_started,
-                    )
-                idle_sleep_mode_started = evt.header.timestamp
-                continue
-            if type == Types.Event and evt.payload == b"\x09":
-                if idle_sleep_mode_started is not None and last_values is not None:
-                    last_idsm_ts = evt.header.timestamp
-                    # Fill in missing data for dt past payloads
-                    fill_start = idle_sleep_mode_started - (dt_idm - 1)
+    def _idle_sleep_mode_settings(self, log_buffer, index, starts):
+        """Return the idle sleep mode setting in effect where partitions start."""
+        params = index[index["type"] == Types.Params.value]
+        positions = np.flatnonzero(index["type"] == Types.Params.value).tolist()
+        settings = []
+        activated = self.idle_sleep_mode_activated
+        i = 0
+        for start in starts:
+            while i < len(positions) and positions[i] < start:
+                offset = int(params["offset"][i]) + HEADER_SIZE
+                setting = read_idle_sleep_mode_setting(
+                    log_buffer[offset : offset + int(params["payload_size"][i])]
+                )
+                if setting is not None:
+                    activated = setting
+                i += 1
+            settings.append(activated)
+        return settings
 
-                    payload = self._validate_payload(
-                        self._fill_ism(fill_start, evt.header.timestamp, last_values)
-                    )
-                    idle_sleep_mode_started = None
-                    acceleration.extend(payload)
-                    continue
-                else:
-                    logger.warning(
-                        "Idle sleep mode was not active at %s", evt.header.timestamp
-                    )
-                    continue
+    def _has_valid_checksums(self, index):
+        """Return whether the checksums of indexed records are valid."""
+        return validate_checksums(*self.logreader.read_records(index))
 
-            # An 'Activity' (id: 0x00) log record type with a 1-byte payload is
-            # captured on a USB connection event (and does not represent a reading
-            # from the activity monitor's accelerometer). This event is captured
-            # upon docking the activity monitor (via USB) to a PC or CentrePoint
-            # Data Hub (CDH) device. Therefore, such records cannot be parsed as the
-            # traditional activity log records and can be ignored.
-            if type in [Types.Activity, Types.Activity3]:
-                if evt.header.payload_size == 1:
-                    continue
+    def _read_log_index(self):
+        """Index log.bin records, using the sidecar index file if there is one."""
+        log_info = self.zipfile.getinfo("log.bin")
+        if self.index_file is not None:
+            index = load_index(self.index_file, log_info.CRC, log_info.file_size)
+            if index is not None:
+                return index
+        index = self.logreader.read_index()
+        if self.index_file is not None:
+            save_index(self.index_file, index, log_info.CRC, log_info.file_size)
+        return index
 
-            if type == Types.Activity3:
-                payload = read_activity3_payload(
-                    evt.payload, evt.header.timestamp, self.info.sample_rate
-                )
-            elif type == Types.Activity2:
-                payload = read_activity2_payload(
-                    evt.payload, evt.header.timestamp, self.info.sample_rate
-                )
-            elif type == Types.Activity:
-                payload = read_activity1_payload(
-                    evt.payload, evt.header.timestamp, self.info.sample_rate
-                )
-            elif type == Types.TemperatureRecord:
-                temperature.append(
-                    read_temperature_payload(evt.payload, evt.header.timestamp)
-                )
-                continue
-            else:
-                continue
-            if payload.shape[0] > 0:
-                last_values = payload[-1, 1:]
-                # Without the next line, if we miss an ISM stop event, we would
-                # think we are in ISM even when receiving accelerometer data.
-                idle_sleep_mode_started = None
-            if payload.shape[0] != 0:
-                if time_travel_dt > 0:
-                    logger.debug(
-                        "%s>%s time drift by %s s",
-                        evt.header.timestamp,
-                        dt,
-                        time_travel_dt,
-                    )
-                    logger.debug("Last valid second: %s", acceleration[-1][0, 0])
-                    acceleration[-1 + int(dt)] = self._validate_payload(payload)
-                else:
-                    acceleration.append(self._validate_payload(payload))
+    def _parser(self):
+        """Return a parser of log.bin records, with the options of this reader."""
+        settings = _ParserSettings(
+            self.info.sample_rate,
+            self.streams,
+            self.verify_checksums,
+            self.fill_idle_sleep_mode,
+        )
+        return _LogParser(settings, self.stats, self.idle_sleep_mode_activated)
 
-        if idle_sleep_mode_started is not None:
-            # Idle sleep mode was started but not finished before the recording
-            # ended. This means that we might be missing some records at the end of
-            # the file.
-            assert evt is not None
-            idle_sleep_mode_ended = evt.header.timestamp
-            payload = self._validate_payload(
-                self._fill_ism(
-                    idle_sleep_mode_started - (dt_idm - 1),
-                    idle_sleep_mode_ended,
-                    last_values,
-                )
+    def _set_events(self, parser):
+        """Take the events and the idle sleep mode setting decoded by a parser."""
+        self.idle_sleep_mode_activated = parser.idle_sleep_mode_activated
+        for stream, events in parser.events.items():
+            self.events[stream] = self._select_events(
+                concatenate_events(stream, events)
             )
-            acceleration.extend(payload)
-        if evt is not None:
-            logger.debug("last ts %s", evt.header.timestamp)
-        return acceleration, temperature
+
+    def _select_events(self, events):
+        """Keep events with a timestamp between start and end."""
+        if self.start is not None:
+            events = events[events["timestamp"] >= self.start]
+        if self.end is not None:
+            events = events[events["timestamp"] < self.end]
+        return events
+
+    def _select_rows(self, data):
+        """Keep rows of data with a timestamp between start and end."""
+        if self.start is not None:
+            data = data[data[:, 0] >= self.start]
+        if self.end is not None:
+            data = data[data[:, 0] < self.end]
+        return data
+
+    def _select_samples(self, samples):
+        """Keep samples with a time between start and end."""
+        if self.start is None and self.end is None:
+            return samples
+        time = samples_to_time(samples, self.info.sample_rate, self.time_offset)
+        selected = np.ones(len(samples), dtype=bool)
+        if self.start is not None:
+            selected &= time >= self.start
+        if self.end is not None:
+            selected &= time < self.end
+        return samples[selected]
+
+    def _select_segments(self, segments):
+        """Clip idle sleep mode segments to the seconds between start and end."""
+        if self.start is not None:
+            segments = segments.copy()
+            segments["start"] = np.maximum(segments["start"], np.ceil(self.start))
+        if self.end is not None:
+            segments = segments.copy()
+            segments["end"] = np.minimum(segments["end"], np.ceil(self.end))
+        return segments[segments["start"] < segments["end"]]
 
     def _get_data(self, num_rows=None):
         """Yield acceleration data.
@@ -301,43 +618,174 @@ class FileReader:
         num_rows
             Number of events to read.
         """
-        if not self.logreader:
-            acceleration, temperature = self._get_data_nhanes()
+        if self.logreader and self.workers > 1:
+            samples, segments, temperature = self._get_data_partitioned(num_rows)
         else:
-            acceleration, temperature = self._get_data_default(num_rows=num_rows)
-
-        # Check for and remove identical samples
-        if len(acceleration) > 1:
-            assert len(acceleration[0].shape) == 2
-            acceleration, counts = np.unique(acceleration, axis=0, return_counts=True)
-            duplicates_removed = acceleration[counts > 1]
-            if duplicates_removed.size > 0:
-                logger.warning(
-                    "%s duplicate accelerometer records removed.",
-                    duplicates_removed.shape[0],
-                )
-                for d in duplicates_removed:
-                    logger.debug(
-                        "Duplicate accelerometer record removed: %s", d.tolist()
+            if not self.logreader:
+                acceleration, temperature = self._get_data_nhanes()
+            else:
+                acceleration, temperature = self._get_data_default(num_rows=num_rows)
+
+            # Check for and remove identical samples
+            acceleration = _remove_duplicates(acceleration, self.stats)
+
+            samples = segments = None
+            if len(acceleration) > 0:
+                with timer(self.stats, "join"):
+                    samples, segments = _join_records(
+                        acceleration, self.info.sample_rate, self.fill_idle_sleep_mode
                     )
 
-        if len(acceleration) > 0:
-            self.acceleration = np.concatenate(acceleration)
+        if samples is not None:
+            with timer(self.stats, "join"):
+                self.samples = self._select_samples(samples)
+                self.idle_sleep_mode_segments = self._select_segments(segments)
+            self._count_filled_samples(self.idle_sleep_mode_segments)
         if len(temperature) > 0:
-            self.temperature = np.concatenate(temperature)
+            self.temperature = self._select_rows(np.concatenate(temperature))
 
-        # Make sure each second appears sample rate times
-        counter = Counter(self.acceleration[:, 0].astype(int))
-        wrong_freq_cases = [
-            (k, v) for k, v in counter.items() if v != self.info.sample_rate
-        ]
-        for w in wrong_freq_cases:
-            logger.warning(
-                "Timestamp (second) %s has %s samples instead of %s.",
-                w[0],
-                w[1],
+        self._validate_sample_counts(self.samples)
+        if self.stats is not None:
+            self.stats.samples += len(self.samples)
+
+    def _count_filled_samples(self, segments):
+        """Add the samples filled in for idle sleep mode segments to stats."""
+        if self.stats is not None and self.fill_idle_sleep_mode:
+            seconds = int((segments["end"] - segments["start"]).sum())
+            self.stats.idle_sleep_mode_samples += seconds * self.info.sample_rate
+
+    def _validate_sample_counts(self, samples):
+        """Make sure each second appears sample rate times.
+
+        Results are added to `sample_counts`, so that chunks of a recording can be
+        validated one after the other.
+        """
+        if not self.validate_sample_counts:
+            return
+        with timer(self.stats, "validate"):
+            self._count_samples(samples)
+
+    def _count_samples(self, samples):
+        """Add the seconds of samples which hold too few or many samples."""
+        if self.sample_counts is None:
+            self.sample_counts = SampleCountSummary()
+        if self.time_offset:
+            seconds = samples_to_time(
+                samples, self.info.sample_rate, self.time_offset
+            ).astype(np.int64)
+        else:
+            seconds = samples["timestamp"]
+        seconds, counts = _count_samples_per_second(seconds)
+        summary = self.sample_counts
+        summary.seconds += len(seconds)
+        short = seconds[counts < self.info.sample_rate]
+        long = seconds[counts > self.info.sample_rate]
+        if len(short) == 0 and len(long) == 0:
+            return
+        summary.short_seconds += len(short)
+        summary.long_seconds += len(long)
+        _second_ranges(short, summary.short_ranges)
+        _second_ranges(long, summary.long_ranges)
+        wrong = np.concatenate((short, long))
+        logger.warning(
+            "%s seconds have fewer and %s seconds more than %s samples, from second "
+            "%s to %s.",
+            len(short),
+            len(long),
+            self.info.sample_rate,
+            wrong.min(),
+            wrong.max(),
+        )
+
+    def iter_chunks(
+        self, seconds: int = 3600, calibrate: bool = True, dtype=np.float32
+    ):
+        """Yield acceleration data as pandas data frames of bounded size.
+
+        The log is decompressed and parsed incrementally, so that memory use is set
+        by `seconds` rather than by the length of the recording. Idle sleep mode
+        gaps are filled in, duplicate records removed and chunks yielded in time
+        order, as long as records do not travel back in time by more than
+        `MAX_TIME_TRAVEL` seconds: the concatenated chunks are then the data frame
+        returned by `to_pandas`. Temperature data and events are available in
+        `temperature` and `events` once all chunks have been read.
+
+        Parameters:
+        -----------
+        seconds
+            Number of seconds of acceleration data per chunk.
+        calibrate
+            Calibrate acceleration data.
+        dtype
+            Float type of the X, Y and Z columns.
+        """
+        if self.nhanes:
+            self.time_offset = self.info.start_date / 1e9
+            for samples in iter_nhanes_samples(
+                self.activity_file,
                 self.info.sample_rate,
+                seconds * self.info.sample_rate,
+            ):
+                samples = self._select_samples(samples)
+                if self.stats is not None:
+                    self.stats.samples += len(samples)
+                if samples.shape[0] > 0:
+                    yield self._acceleration_to_pandas(samples, calibrate, dtype)
+            if self.stats is not None:
+                self.stats.bytes_read += self.zipfile.getinfo("activity.bin").file_size
+            return
+
+        parser = self._parser()
+        duplicate_filter = _DuplicateFilter()
+        segments: List[np.ndarray] = []
+        with self.zipfile.open("log.bin", "r") as source:
+            log_reader = LogReader(
+                source, self.stats, self.archive.member_view("log.bin")
             )
+            for log_buffer, index in log_reader.read_blocks(
+                CHUNK_READ_SIZE, self.num_rows
+            ):
+                parser.feed(log_buffer, index)
+                # Keep enough records to handle time travel in later records
+                while parser.num_seconds >= seconds + MAX_TIME_TRAVEL:
+                    chunk = self._pop_chunk(parser, duplicate_filter, seconds, segments)
+                    if chunk is not None:
+                        yield self._acceleration_to_pandas(chunk, calibrate, dtype)
+        parser.finish()
+        while parser.acceleration:
+            chunk = self._pop_chunk(parser, duplicate_filter, seconds, segments)
+            if chunk is not None:
+                yield self._acceleration_to_pandas(chunk, calibrate, dtype)
+        if len(parser.temperature) > 0:
+            self.temperature = self._select_rows(np.concatenate(parser.temperature))
+        self._set_events(parser)
+        if segments:
+            self.idle_sleep_mode_segments = np.concatenate(segments)
+
+    def _pop_chunk(self, parser, duplicate_filter, seconds, segments):
+        """Take complete acceleration records from a parser.
+
+        Idle sleep mode segments of the records are appended to `segments`.
+        """
+        acceleration = _remove_duplicates(
+            parser.pop(seconds), self.stats, duplicate_filter
+        )
+        duplicate_filter.release(parser.last_popped_second - MAX_TIME_TRAVEL)
+        if len(acceleration) == 0:
+            return None
+        with timer(self.stats, "join"):
+            samples, chunk_segments = _join_records(
+                acceleration, self.info.sample_rate, self.fill_idle_sleep_mode
+            )
+            segments.append(self._select_segments(chunk_segments))
+            samples = self._select_samples(samples)
+        self._count_filled_samples(segments[-1])
+        if samples.shape[0] == 0:
+            return None
+        self._validate_sample_counts(samples)
+        if self.stats is not None:
+            self.stats.samples += len(samples)
+        return samples
 
     def calibrate_acceleration(self, acceleration):
         """Calibrates acceleration samples."""
@@ -375,7 +823,7 @@ class FileReader:
             calibrated_temperature = temperature
         elif calibration["calibrationMethod"] == 1:
             # Use calibration method 1 to calibrate temperature
-            calibrated_temperature = temperature
+            calibrated_temperature = temperature.copy()
             adxl_temp = temperature[:, 2]
             adxl_gain = (calibration["tempHigh"] - calibration["tempLow"]) / (
                 calibration["adxlTempHigh"] - calibration["adxlTempLow"]
@@ -399,18 +847,142 @@ class FileReader:
             )
         return calibrated_temperature
 
-    def to_pandas(self, calibrate: bool = True):
-        """Return acceleration data as pandas data frame."""
-        col_names = ["Timestamp", "X", "Y", "Z", "IdleSleepMode"]
-        df = pd.DataFrame(self.acceleration, columns=col_names)
-        if calibrate and not self.nhanes:
-            df[["X", "Y", "Z"]] = self.calibrate_acceleration(
-                df[["X", "Y", "Z"]].values
-            )
-        df.IdleSleepMode = df.IdleSleepMode == 1
-        df.set_index("Timestamp", drop=True, inplace=True)
-        df = df.apply(lambda x: pd.to_numeric(x, downcast="float"))  # type: ignore
-        df.sort_index(kind="stable", inplace=True)
+    def to_pandas(self, calibrate: bool = True, dtype=np.float32):
+        """Return acceleration data as pandas data frame.
+
+        Parameters:
+        -----------
+        calibrate
+            Calibrate acceleration data.
+        dtype
+            Float type of the X, Y and Z columns.
+        """
+        return self._acceleration_to_pandas(self.samples, calibrate, dtype)
+
+    def _acceleration_to_pandas(self, samples, calibrate, dtype=np.float32):
+        """Convert acceleration samples to a pandas data frame.
+
+        Samples are converted by blocks, written straight into the final columns, so
+        that no full size intermediate copy is made.
+        """
+        with timer(self.stats, "to_pandas"):
+            return self._convert_samples(samples, calibrate, dtype)
+
+    def _convert_samples(self, samples, calibrate, dtype):
+        """Convert acceleration samples to a pandas data frame, see to_pandas."""
+        time = samples_to_time(samples, self.info.sample_rate, self.time_offset)
+        if len(time) > 1 and (np.diff(time) < 0).any():
+            order = np.argsort(time, kind="stable")
+            samples = samples[order]
+            time = time[order]
+        # Columns are stored side by side, which is the layout of pandas blocks
+        columns = np.empty((3, len(samples)), dtype=dtype)
+        for start in range(0, len(samples), CONVERT_BLOCK_SIZE):
+            block = samples[start : start + CONVERT_BLOCK_SIZE]
+            acceleration = np.empty((len(block), 3))
+            for i, axis in enumerate(["x", "y", "z"]):
+                acceleration[:, i] = block[axis]
+            if self.nhanes:
+                acceleration = np.round(acceleration / NHANES_SCALE, 3)
+            elif calibrate:
+                acceleration = self.calibrate_acceleration(acceleration)
+            columns[:, start : start + len(block)] = acceleration.T
+        df = pd.DataFrame(
+            columns.T,
+            columns=["X", "Y", "Z"],
+            index=pd.Index(time, name="Timestamp"),
+            copy=False,
+        )
+        df["IdleSleepMode"] = samples["idle_sleep_mode"]
+        return df
+
+    def counts(self, epoch: int = 60, calibrate: bool = True, seconds: int = 3600):
+        """Return ActiGraph activity counts as pandas data frame.
+
+        Acceleration is converted and fed to the counts algorithm `seconds` at a
+        time, so that full resolution data is never held at once by a lazy reader.
+        Data is split into runs of contiguous samples, at gaps in the recording
+        (or idle sleep mode gaps, when they are not filled in). Counts are computed
+        separately for each run, whose epochs start with its first sample, and
+        incomplete epochs at the end of a run are dropped. Requires scipy.
+
+        Parameters:
+        -----------
+        epoch
+            Epoch length, in seconds.
+        calibrate
+            Calibrate acceleration data.
+        seconds
+            Number of seconds of acceleration data converted at a time.
+
+        Returns:
+        --------
+        Data frame of X, Y, Z and VectorMagnitude counts, indexed by the time of the
+        start of each complete epoch
+        """
+        sample_rate = self.info.sample_rate
+        period = 1 / sample_rate
+        # Counts of each run of contiguous samples, with the time of its start
+        runs: List[Tuple[float, List[np.ndarray]]] = []
+        calculator = CountsCalculator(sample_rate, epoch)
+        previous = None
+        for df in self._iter_frames(seconds, calibrate, np.float64):
+            if len(df) == 0:
+                continue
+            time = df.index.to_numpy()
+            acceleration = df[["X", "Y", "Z"]].to_numpy()
+            steps = np.diff(time, prepend=time[0] if previous is None else previous)
+            breaks = np.flatnonzero(np.abs(steps - period) > period / 2).tolist()
+            bounds = sorted({0, *breaks, len(time)})
+            for begin, end in zip(bounds[:-1], bounds[1:]):
+                if begin in breaks:
+                    if runs:
+                        runs[-1][1].append(calculator.finish())
+                        calculator = CountsCalculator(sample_rate, epoch)
+                    runs.append((float(time[begin]), []))
+                runs[-1][1].append(calculator.update(acceleration[begin:end]))
+            previous = time[-1]
+        if runs:
+            runs[-1][1].append(calculator.finish())
+        run_counts = [np.concatenate(chunks) for _, chunks in runs]
+        counts = np.concatenate([np.empty((0, 3)), *run_counts]).astype(np.int64)
+        time = np.concatenate(
+            [np.empty(0)]
+            + [
+                start + epoch * np.arange(len(c))
+                for (start, _), c in zip(runs, run_counts)
+            ]
+        )
+        df = pd.DataFrame(
+            counts, columns=["X", "Y", "Z"], index=pd.Index(time, name="Timestamp")
+        )
+        df["VectorMagnitude"] = np.sqrt((counts**2).sum(axis=1))
+        return df
+
+    def idle_sleep_mode_to_pandas(self, calibrate: bool = True, dtype=np.float32):
+        """Return idle sleep mode gaps as pandas data frame.
+
+        Each row is a gap from Start (included) to End (excluded), in seconds, during
+        which X, Y and Z hold the same values. With `fill_idle_sleep_mode=False`,
+        `to_pandas` only returns measured samples, and this table is a compact form
+        of the rest of the data, which `expand_idle_sleep_mode` fills in.
+
+        Parameters:
+        -----------
+        calibrate
+            Calibrate acceleration data.
+        dtype
+            Float type of the X, Y and Z columns.
+        """
+        segments = self.idle_sleep_mode_segments
+        acceleration = np.empty((len(segments), 3))
+        for i, axis in enumerate(["x", "y", "z"]):
+            acceleration[:, i] = segments[axis]
+        if calibrate:
+            acceleration = self.calibrate_acceleration(acceleration)
+        df = pd.DataFrame({"Start": segments["start"], "End": segments["end"]})
+        for i, column in enumerate(["X", "Y", "Z"]):
+            df[column] = acceleration[:, i].astype(dtype)
         return df
 
     def temperature_to_pandas(self, calibrate: bool = True):
@@ -426,6 +998,968 @@ class FileReader:
         df.sort_index(kind="stable", inplace=True)
         return df
 
+    def events_to_pandas(self, stream: str):
+        """Return the events of a stream as pandas data frame.
+
+        Battery voltage is given in volts, and lux values are scaled with the lux
+        scale factor and maximum of info.txt, when the file has them. Events which
+        are kept as raw payloads have Type and Payload (bytes) columns.
+
+        Parameters:
+        -----------
+        stream
+            Event stream, which must have been requested with `streams`.
+        """
+        if stream not in self.events:
+            raise ValueError(f"Stream {stream} was not decoded")
+        events = self.events[stream]
+        columns: Dict
+        if stream == "battery":
+            columns = {"Voltage": events["voltage"] / 1000}
+        elif stream == "lux":
+            lux = events["lux"].astype(np.float64)
+            if self.info.lux_scale_factor is not None:
+                lux *= self.info.lux_scale_factor
+            if self.info.lux_max_value is not None:
+                lux = np.minimum(lux, self.info.lux_max_value)
+            columns = {"Lux": lux}
+        elif stream in EVENT_READERS:
+            columns = {
+                name.capitalize(): events[name]
+                for name in EVENT_DTYPES[stream].names or ()
+                if name != "timestamp"
+            }
+        else:
+            columns = {
+                "Type": events["type"],
+                "Payload": [
+                    payload[:size].tobytes()
+                    for payload, size in zip(events["payload"], events["size"])
+                ],
+            }
+        df = pd.DataFrame(
+            columns, index=pd.Index(events["timestamp"], name="Timestamp")
+        )
+        df.sort_index(kind="stable", inplace=True)
+        return df
+
+    def export(
+        self,
+        directory: str,
+        format: str = "npy",
+        seconds: int = 3600,
+        calibrate: bool = True,
+        dtype=np.float32,
+    ):
+        """Write acceleration, temperature and metadata to columnar files.
+
+        Acceleration data is converted and written `seconds` at a time, without
+        building a data frame of the whole recording. With a lazy reader, the log
+        is also parsed incrementally, as in `iter_chunks`. The export can be opened
+        with `pygt3x.export.read_export`, which memory-maps it.
+
+        Parameters:
+        -----------
+        directory
+            Output directory, created if needed.
+        format
+            "npy" for one .npy file per column, or "arrow" for Arrow IPC files,
+            which requires pyarrow.
+        seconds
+            Number of seconds of acceleration data converted at a time.
+        calibrate
+            Calibrate acceleration and temperature data.
+        dtype
+            Float type of the X, Y and Z columns.
+        """
+        with ExportWriter(directory, format) as writer:
+            for df in self._iter_frames(seconds, calibrate, dtype):
+                writer.write("acceleration", df)
+            # Temperature is only complete once a lazy reader has read all chunks
+            if len(self.temperature) > 0:
+                writer.write("temperature", self.temperature_to_pandas(calibrate))
+            idle_sleep_mode_activated = self.idle_sleep_mode_activated
+            if idle_sleep_mode_activated is not None:
+                idle_sleep_mode_activated = bool(idle_sleep_mode_activated)
+            writer.metadata = {
+                "info": asdict(self.info),
+                "idle_sleep_mode_activated": idle_sleep_mode_activated,
+            }
+
+    def _iter_frames(self, seconds, calibrate, dtype):
+        """Yield acceleration data frames of bounded size, in time order."""
+        if self.lazy:
+            yield from self.iter_chunks(seconds, calibrate, dtype)
+            return
+        samples = self.samples
+        time = samples_to_time(samples, self.info.sample_rate, self.time_offset)
+        if len(time) > 1 and (np.diff(time) < 0).any():
+            samples = samples[np.argsort(time, kind="stable")]
+        del time
+        rows = seconds * self.info.sample_rate
+        for start in range(0, len(samples), rows):
+            yield self._acceleration_to_pandas(
+                samples[start : start + rows], calibrate, dtype
+            )
+
+
+def expand_idle_sleep_mode(acceleration, idle_sleep_mode, sample_rate: int):
+    """Fill in idle sleep mode gaps in acceleration data.
+
+    Parameters:
+    -----------
+    acceleration
+        Acceleration data frame, as returned by `FileReader.to_pandas`
+    idle_sleep_mode
+        Gaps, as returned by `FileReader.idle_sleep_mode_to_pandas`
+    sample_rate
+        Sampling rate
+
+    Returns:
+    --------
+    Acceleration data frame with one sample per gap sample, sorted by time
+    """
+    rows = (idle_sleep_mode["End"] - idle_sleep_mode["Start"]).to_numpy()
+    rows = rows * sample_rate
+    # Position of each filled sample within its gap
+    position = np.arange(rows.sum()) - np.repeat(np.cumsum(rows) - rows, rows)
+    second = np.repeat(idle_sleep_mode["Start"].to_numpy(), rows)
+    second += position // sample_rate
+    time = second + (position % sample_rate) / sample_rate
+    gaps = pd.DataFrame(
+        {
+            column: np.repeat(idle_sleep_mode[column].to_numpy(), rows)
+            for column in ["X", "Y", "Z"]
+        },
+        index=pd.Index(time, name="Timestamp"),
+    )
+    gaps["IdleSleepMode"] = True
+    return pd.concat([acceleration, gaps]).sort_index(kind="stable")
+
+
+def _join_records(records, sample_rate: int, fill_gaps: bool):
+    """Join acceleration records and idle sleep mode gaps.
+
+    Gaps are written straight into the joined samples, or returned as segments
+    if idle sleep mode is not filled in.
+
+    Parameters:
+    -----------
+    records
+        Acceleration records and idle sleep mode gaps
+    sample_rate
+        Sampling rate
+    fill_gaps
+        Fill in idle sleep mode gaps in the samples
+
+    Returns:
+    --------
+    Tuple of samples and idle sleep mode segments
+    """
+    gaps = [r for r in records if isinstance(r, _IdleSleepModeGap)]
+    segments = np.array(
+        [(g.start, g.end) + g.values for g in gaps], dtype=ISM_SEGMENT_DTYPE
+    )
+    if not fill_gaps:
+        records = [r for r in records if not isinstance(r, _IdleSleepModeGap)]
+        return concatenate_samples(records), segments
+    if not gaps:
+        return concatenate_samples(records), segments
+    sizes = [
+        len(r) * sample_rate if isinstance(r, _IdleSleepModeGap) else r.size
+        for r in records
+    ]
+    samples = np.empty(sum(sizes), dtype=SAMPLE_DTYPE)
+    output = samples.view(np.uint8)
+    offset = 0
+    segment = iter(segments)
+    run: List[np.ndarray] = []
+    for record, size in zip(records, sizes):
+        if not isinstance(record, _IdleSleepModeGap):
+            run.append(np.ascontiguousarray(record).reshape(-1).view(np.uint8))
+            continue
+        # Copy the records since the last gap at once, then fill in the gap
+        offset = _copy_run(run, output, offset)
+        run = []
+        fill_idle_sleep_mode(next(segment), sample_rate, samples[offset:])
+        offset += size
+    _copy_run(run, output, offset)
+    return samples, segments
+
+
+def _copy_run(run, output, offset):
+    """Copy the bytes of records into samples, returning the next offset."""
+    if not run:
+        return offset
+    size = sum(len(r) for r in run) // SAMPLE_DTYPE.itemsize
+    start = offset * SAMPLE_DTYPE.itemsize
+    np.concatenate(run, out=output[start : start + size * SAMPLE_DTYPE.itemsize])
+    return offset + size
+
+
+def _remove_duplicates(acceleration, stats=None, duplicate_filter=None):
+    """Remove identical acceleration records, keeping the first occurrence.
+
+    Parameters:
+    -----------
+    acceleration
+        Acceleration records and idle sleep mode gaps
+    stats
+        Statistics of the read, if they are collected
+    duplicate_filter
+        Filter remembering records from previous calls, if any
+    """
+    if duplicate_filter is None:
+        duplicate_filter = _DuplicateFilter()
+    with timer(stats, "deduplicate"):
+        acceleration, duplicates_removed = duplicate_filter.filter(acceleration)
+    if stats is not None:
+        stats.duplicates_removed += len(duplicates_removed)
+    if len(duplicates_removed) > 0:
+        logger.warning(
+            "%s duplicate accelerometer records removed.",
+            len(duplicates_removed),
+        )
+        for d in duplicates_removed:
+            if isinstance(d, _IdleSleepModeGap):
+                logger.debug(
+                    "Duplicate idle sleep mode second removed: %s %s",
+                    d.start,
+                    d.values,
+                )
+            else:
+                logger.debug("Duplicate accelerometer record removed: %s", d.tolist())
+    return acceleration
+
+
+@dataclass
+class _PartitionResult:
+    """Data decoded from a partition of log.bin, see `_decode_partition`."""
+
+    samples: Optional[np.ndarray]
+    segments: Optional[np.ndarray]
+    temperature: List[np.ndarray]
+    events: Dict[str, np.ndarray]
+    idle_sleep_mode_activated: Optional[bool]
+    stats: Optional[ReadStats]
+    log_records: List[logging.LogRecord] = field(default_factory=list)
+
+
+class _LogRecordCollector(logging.Handler):
+    """Keep log records, so that a worker can send them to the main process."""
+
+    def __init__(self, level):
+        """Initialise."""
+        super().__init__(level)
+        self.records: List[logging.LogRecord] = []
+
+    def emit(self, record):
+        """Store a log record, with its message formatted."""
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        self.records.append(record)
+
+
+def _slice_records(log_buffer, index):
+    """Copy records into their own buffer, to send them to another process."""
+    if len(index) == 0:
+        return b"", index
+    start = int(index["offset"][0])
+    last = index[-1]
+    end = int(last["offset"]) + HEADER_SIZE + int(last["payload_size"]) + 1
+    records = index.copy()
+    records["offset"] -= start
+    return bytes(log_buffer[start:end]), records
+
+
+def _last_timestamp(index):
+    """Return the timestamp of the last record of an index, or None if it is empty."""
+    if len(index) == 0:
+        return None
+    return int(index["timestamp"][-1])
+
+
+def _decode_partition(
+    settings, stats, idle_sleep_mode_activated, last_timestamp, log_buffer, index
+):
+    """Parse, deduplicate and join a partition of records kept by `select`.
+
+    Parameters:
+    -----------
+    settings
+        Parser options
+    stats
+        Empty statistics to collect for the partition, or None
+    idle_sleep_mode_activated
+        Idle sleep mode setting in effect at the start of the partition
+    last_timestamp
+        Timestamp of the last record of the log, for the last partition, which
+        fills in idle sleep mode lasting until the end of the recording
+    log_buffer
+        Buffer holding the records
+    index
+        Records to parse, within `log_buffer`
+    """
+    parser = _LogParser(settings, stats, idle_sleep_mode_activated)
+    parser.feed_selected(log_buffer, index)
+    if last_timestamp is None and len(index) > 0:
+        last_timestamp = int(index["timestamp"][-1])
+    parser.last_timestamp = last_timestamp
+    parser.finish()
+    acceleration = _remove_duplicates(parser.acceleration, stats)
+    samples = segments = None
+    if len(acceleration) > 0:
+        with timer(stats, "join"):
+            samples, segments = _join_records(
+                acceleration, settings.sample_rate, settings.fill_gaps
+            )
+    return _PartitionResult(
+        samples,
+        segments,
+        parser.temperature,
+        {
+            stream: concatenate_events(stream, events)
+            for stream, events in parser.events.items()
+        },
+        parser.idle_sleep_mode_activated,
+        stats,
+    )
+
+
+def _decode_partition_in_worker(level, *arguments):
+    """Decode a partition in a worker process, collecting its log records."""
+    package_logger = logging.getLogger("pygt3x")
+    collector = _LogRecordCollector(level)
+    propagate, package_level = package_logger.propagate, package_logger.level
+    package_logger.addHandler(collector)
+    # Records are handled by the main process instead
+    package_logger.propagate = False
+    package_logger.setLevel(level)
+    try:
+        result = _decode_partition(*arguments)
+    finally:
+        package_logger.removeHandler(collector)
+        package_logger.propagate = propagate
+        package_logger.setLevel(package_level)
+    result.log_records = collector.records
+    return result
+
+
+class _IdleSleepModeGap:
+    """Seconds of missing acceleration data to fill in because of idle sleep mode.
+
+    Gaps stand for one record per second, holding the last values recorded, which
+    are only materialised once records are joined.
+
+    Parameters:
+    -----------
+    start:
+        First second of the gap
+    end:
+        Second after the gap
+    values:
+        X, Y and Z values held during the gap
+    """
+
+    __slots__ = ("start", "end", "values")
+
+    def __init__(self, start: int, end: int, values: Tuple[int, int, int]):
+        """Initialise."""
+        self.start = start
+        self.end = end
+        self.values = values
+
+    def __len__(self):
+        """Return the number of seconds of the gap."""
+        return self.end - self.start
+
+    def split(self, seconds: int):
+        """Split the gap after a number of seconds."""
+        return (
+            _IdleSleepModeGap(self.start, self.start + seconds, self.values),
+            _IdleSleepModeGap(self.start + seconds, self.end, self.values),
+        )
+
+
+def _num_seconds(record):
+    """Return the number of seconds of a record or gap."""
+    if isinstance(record, _IdleSleepModeGap):
+        return len(record)
+    return 1
+
+
+def _first_second(record):
+    """Return the first timestamp of a record or gap."""
+    if isinstance(record, _IdleSleepModeGap):
+        return record.start
+    return int(record["timestamp"][0])
+
+
+def _last_second(record):
+    """Return the first timestamp of the last second of a record or gap."""
+    if isinstance(record, _IdleSleepModeGap):
+        return record.end - 1
+    return int(record["timestamp"][0])
+
+
+class _DuplicateFilter:
+    """Detect identical acceleration records, possibly over several batches.
+
+    Identical records share their first timestamp, so records are grouped by that
+    timestamp and only records within a group are compared, through a hash of their
+    content. The original order of the records is kept.
+
+    Idle sleep mode gaps can only be identical to other gaps, since they are the
+    only records flagged as idle sleep mode. They are compared as ranges of seconds.
+    """
+
+    def __init__(self):
+        """Initialise."""
+        # First timestamp -> [(content hash, record)] of the records kept so far
+        self.groups: Dict[int, List[Tuple[Optional[int], np.ndarray]]] = {}
+        # Values -> (starts, ends) of the gaps kept so far
+        self.gaps: Dict[Tuple[int, int, int], Tuple[List[int], List[int]]] = {}
+
+    def filter(self, acceleration):
+        """Remove records identical to a record that was already seen.
+
+        Returns:
+        --------
+        Records without duplicates, and the list of records which were duplicated
+        """
+        groups = self.groups
+        unique = []
+        duplicated: Dict = {}
+        for record in acceleration:
+            if isinstance(record, _IdleSleepModeGap):
+                unique.extend(self._filter_gap(record, duplicated))
+                continue
+            group = groups.setdefault(int(record["timestamp"][0]), [])
+            if group:
+                digest = hash(record.tobytes())
+                for i, (kept_digest, kept) in enumerate(group):
+                    if kept_digest is None:
+                        kept_digest = hash(kept.tobytes())
+                        group[i] = (kept_digest, kept)
+                    if kept_digest == digest and np.array_equal(kept, record):
+                        duplicated[id(kept)] = kept
+                        break
+                else:
+                    group.append((digest, record))
+                    unique.append(record)
+            else:
+                # Hashes are only computed when timestamps collide
+                group.append((None, record))
+                unique.append(record)
+        return unique, list(duplicated.values())
+
+    def _filter_gap(self, gap, duplicated):
+        """Return the parts of a gap which do not overlap gaps already seen."""
+        # Starts and ends of the disjoint gaps kept so far, sorted
+        starts, ends = self.gaps.setdefault(gap.values, ([], []))
+        parts = []
+        start = gap.start
+        i = bisect.bisect_right(ends, start)
+        while i < len(starts) and starts[i] < gap.end:
+            if start < starts[i]:
+                parts.append(_IdleSleepModeGap(start, starts[i], gap.values))
+            for second in range(max(start, starts[i]), min(gap.end, ends[i])):
+                duplicated[(gap.values, second)] = _IdleSleepModeGap(
+                    second, second + 1, gap.values
+                )
+            start = max(start, ends[i])
+            i += 1
+        if start < gap.end:
+            parts.append(_IdleSleepModeGap(start, gap.end, gap.values))
+        for part in parts:
+            position = bisect.bisect_left(starts, part.start)
+            starts.insert(position, part.start)
+            ends.insert(position, part.end)
+        return parts
+
+    def release(self, before: int):
+        """Forget records with a first timestamp older than `before`."""
+        self.groups = {
+            second: group for second, group in self.groups.items() if second >= before
+        }
+        for values, (starts, ends) in list(self.gaps.items()):
+            released = bisect.bisect_right(ends, before)
+            del starts[:released]
+            del ends[:released]
+            if not starts:
+                del self.gaps[values]
+            elif starts[0] < before:
+                starts[0] = before
+
+
+@dataclass
+class _ParserSettings:
+    """Reader options used to parse log.bin records, which can be sent to workers.
+
+    Attributes:
+    -----------
+    sample_rate:
+        Sampling rate
+    streams:
+        Data to decode, see `FileReader`
+    verify_checksums:
+        Drop records whose checksum does not match
+    fill_gaps:
+        Fill in idle sleep mode gaps in the samples
+    """
+
+    sample_rate: int
+    streams: FrozenSet[str]
+    verify_checksums: bool = True
+    fill_gaps: bool = True
+
+
+class _LogParser:
+    """Turn log.bin records into per-second acceleration records.
+
+    Records are fed in order, possibly over several calls to `feed`, and the state
+    needed to fill in idle sleep mode gaps and handle time travel is kept between
+    calls. Acceleration records which are complete can be taken from the front of
+    `acceleration` with `pop`. Idle sleep mode gaps are kept in `acceleration` as
+    `_IdleSleepModeGap` items, which count for one record per second.
+
+    Parameters:
+    -----------
+    settings:
+        Reader options
+    stats:
+        Statistics of the read, if they are collected
+    idle_sleep_mode_activated:
+        Idle sleep mode setting in effect before the first record, which Params
+        records update
+    """
+
+    def __init__(
+        self,
+        settings: _ParserSettings,
+        stats: Optional[ReadStats] = None,
+        idle_sleep_mode_activated: Optional[bool] = None,
+    ):
+        """Initialise parser state."""
+        self.settings = settings
+        self.stats = stats
+        self.sample_rate = settings.sample_rate
+        self.idle_sleep_mode_activated = idle_sleep_mode_activated
+        self.acceleration: List = []
+        # Number of seconds in acceleration, counting each second of the gaps
+        self.num_seconds = 0
+        self.temperature: List[np.ndarray] = []
+        self.streams = settings.streams
+        # Decoded events of each requested event stream, one array per feed
+        self.events: Dict[str, List[np.ndarray]] = {
+            stream: [] for stream in EVENT_STREAMS if stream in self.streams
+        }
+        # Types of the records to read, and of those parsed one by one by feed
+        self.types = stream_types(self.streams)
+        self.parsed_types = stream_types(self.streams.intersection(["acceleration"]))
+        # Types of the records to select by their own timestamp in time ranges
+        self.timestamped_types = [Types.TemperatureRecord.value] + [
+            type.value for stream in self.events for type in EVENT_STREAMS[stream]
+        ]
+        self.idle_sleep_mode_started = None
+        # This is used for filling in gaps created by idle sleep mode
+        self.last_values = None
+        self.last_idsm_ts = 0
+        self.dt_idm = 0
+        # First timestamp of the last acceleration record that was popped
+        self.last_popped_second: Optional[int] = None
+        # Whether a record was added before an earlier one, so that acceleration
+        # must be sorted before records are popped
+        self.unordered = False
+        # Timestamp of the last event, whether it is valid or not
+        self.last_timestamp = None
+
+    def pop(self, count: int):
+        """Remove and return the first `count` seconds of acceleration records.
+
+        Records are sorted by time first, so that records which travelled back in
+        time are popped with the seconds they belong to. Several records of the
+        same second count as several seconds.
+        """
+        acceleration = self.acceleration
+        if self.unordered:
+            # Stable, so that records of the same second keep their order
+            acceleration.sort(key=_first_second)
+            self.unordered = False
+        seconds = 0
+        end = 0
+        while end < len(acceleration) and seconds < count:
+            record = acceleration[end]
+            if isinstance(record, _IdleSleepModeGap):
+                if seconds + len(record) > count:
+                    acceleration[end : end + 1] = record.split(count - seconds)
+                    record = acceleration[end]
+                seconds += len(record)
+            else:
+                seconds += 1
+            end += 1
+        # Records of the same second are popped together, since their samples are
+        # interleaved once sorted by time
+        while (
+            0 < end < len(acceleration)
+            and not isinstance(acceleration[end], _IdleSleepModeGap)
+            and not isinstance(acceleration[end - 1], _IdleSleepModeGap)
+            and _first_second(acceleration[end]) == _first_second(acceleration[end - 1])
+        ):
+            seconds += 1
+            end += 1
+        records = acceleration[:end]
+        del acceleration[:end]
+        self.num_seconds -= seconds
+        if records:
+            self.last_popped_second = _last_second(records[-1])
+        return records
+
+    def _append(self, record):
+        """Append an acceleration record or gap."""
+        acceleration = self.acceleration
+        if acceleration and _first_second(record) < _last_second(acceleration[-1]):
+            self.unordered = True
+        acceleration.append(record)
+        self.num_seconds += _num_seconds(record)
+
+    def _append_gap(self, start: int, end: int):
+        """Append an idle sleep mode gap holding the last values recorded."""
+        if start < end:
+            values = self.last_values
+            assert values is not None
+            self._append(
+                _IdleSleepModeGap(
+                    start, end, (int(values["x"]), int(values["y"]), int(values["z"]))
+                )
+            )
+
+    def _replace(self, position: int, record):
+        """Replace the record of a second, indexed as in a list of seconds.
+
+        Raises:
+        -------
+        IndexError if there is no such second
+        """
+        acceleration = self.acceleration
+        if position < 0:
+            position += self.num_seconds
+        if not 0 <= position < self.num_seconds:
+            raise IndexError(position)
+        # Look for the second from the closest end of the list
+        if position < self.num_seconds // 2:
+            i, first = 0, 0
+            while True:
+                seconds = _num_seconds(acceleration[i])
+                if position < first + seconds:
+                    break
+                first += seconds
+                i += 1
+        else:
+            i, first = len(acceleration), self.num_seconds
+            while first > position:
+                i -= 1
+                first -= _num_seconds(acceleration[i])
+        old = acceleration[i]
+        if not isinstance(old, _IdleSleepModeGap):
+            acceleration[i] = record
+            return
+        before, after = old.split(position - first)
+        after = after.split(1)[1]
+        parts = [before, record, after]
+        acceleration[i : i + 1] = [p for p in parts if _num_seconds(p) > 0]
+
+    def _read_activity(self, log_buffer, index):
+        """Decode all activity records at once.
+
+        Records are grouped by type and payload size so that each group is decoded
+        with a single vectorized call.
+
+        Returns:
+        --------
+        List with the decoded payload of each activity record and None elsewhere
+        """
+        payloads = [None] * len(index)
+        for type, read_payloads in ACTIVITY_READERS.items():
+            is_type = index["type"] == type.value
+            if type in [Types.Activity, Types.Activity3]:
+                # 1-byte payloads are USB connection events, see feed
+                is_type &= index["payload_size"] != 1
+            for payload_size in np.unique(index["payload_size"][is_type]):
+                positions = np.flatnonzero(
+                    is_type & (index["payload_size"] == payload_size)
+                )
+                records = index[positions]
+                decoded = read_payloads(
+                    gather_payloads(log_buffer, records),
+                    records["timestamp"],
+                )
+                for position, payload in zip(positions.tolist(), decoded):
+                    payloads[position] = payload
+        return payloads
+
+    def _read_events(self, log_buffer, index):
+        """Decode the records of each requested event stream at once."""
+        for stream, events in self.events.items():
+            types = [type.value for type in EVENT_STREAMS[stream]]
+            records = index[np.isin(index["type"], types)]
+            if len(records) == 0:
+                continue
+            if stream in EVENT_READERS:
+                read_payloads, payload_size = EVENT_READERS[stream]
+                is_valid = records["payload_size"] == payload_size
+                for timestamp in records["timestamp"][~is_valid].tolist():
+                    logger.warning(
+                        "Unexpected %s payload size at %s", stream, timestamp
+                    )
+                records = records[is_valid]
+                events.append(
+                    read_payloads(
+                        gather_payloads(log_buffer, records), records["timestamp"]
+                    )
+                )
+                continue
+            # Raw payloads are gathered by size, then put back in record order
+            payload_size = int(records["payload_size"].max())
+            positions = []
+            decoded = []
+            for size in np.unique(records["payload_size"]):
+                is_size = np.flatnonzero(records["payload_size"] == size)
+                group = records[is_size]
+                positions.append(is_size)
+                decoded.append(
+                    read_raw_payloads(
+                        gather_payloads(log_buffer, group),
+                        group["timestamp"],
+                        group["type"],
+                        payload_size,
+                    )
+                )
+            order = np.argsort(np.concatenate(positions), kind="stable")
+            events.append(np.concatenate(decoded)[order])
+
+    def _read_temperature(self, log_buffer, index):
+        """Decode all temperature records at once, keeping them in record order."""
+        records = index[index["type"] == Types.TemperatureRecord.value]
+        if len(records) == 0:
+            return
+        positions = []
+        decoded = []
+        for payload_size in np.unique(records["payload_size"]):
+            is_size = np.flatnonzero(records["payload_size"] == payload_size)
+            group = records[is_size]
+            positions.append(is_size)
+            decoded.append(
+                read_temperature_payloads(
+                    gather_payloads(log_buffer, group), group["timestamp"]
+                )
+            )
+        order = np.argsort(np.concatenate(positions), kind="stable")
+        self.temperature.append(np.concatenate(decoded)[order])
+
+    def feed(self, log_buffer, index):
+        """Parse indexed records of a log buffer.
+
+        Parameters:
+        -----------
+        log_buffer
+            Decompressed log.bin content
+        index
+            Records of `log_buffer` to parse, in order. Records of types which are
+            not needed for the requested streams are skipped.
+        """
+        self.feed_selected(log_buffer, self.select(log_buffer, index))
+
+    def select(self, log_buffer, index):
+        """Keep the records to parse, with a valid checksum.
+
+        Records of types which are not needed for the requested streams are
+        dropped, and unknown types and checksum failures are logged.
+
+        Returns:
+        --------
+        Index of the records to parse
+        """
+        stats = self.stats
+        if len(index) > 0:
+            self.last_timestamp = int(index["timestamp"][-1])
+        if stats is not None:
+            stats.count_records(index["type"])
+        for event_type in np.unique(
+            index["type"][~np.isin(index["type"], KNOWN_TYPES)]
+        ).tolist():
+            logger.warning("Unsupported event type %s", event_type)
+        index = index[np.isin(index["type"], self.types)]
+        if self.settings.verify_checksums:
+            with timer(stats, "checksums"):
+                is_valid = validate_checksums(log_buffer, index)
+            failures = index["timestamp"][~is_valid].tolist()
+            for timestamp in failures:
+                logger.warning("Event checksum does not match at %s .", timestamp)
+            if stats is not None:
+                stats.checksum_failures += len(failures)
+            index = index[is_valid]
+        return index
+
+    def feed_selected(self, log_buffer, index):
+        """Decode and parse records kept by `select`."""
+        stats = self.stats
+        with timer(stats, "decode"):
+            self._read_events(log_buffer, index)
+            if "temperature" in self.streams:
+                self._read_temperature(log_buffer, index)
+            # Events and temperature were decoded at once, other records are parsed
+            # in order
+            index = index[np.isin(index["type"], self.parsed_types)]
+            if "acceleration" in self.streams:
+                activity = self._read_activity(log_buffer, index)
+            else:
+                activity = [None] * len(index)
+        with timer(stats, "parse"):
+            self._parse(log_buffer, index, activity)
+
+    def _parse(self, log_buffer, index, activity):
+        """Handle idle sleep mode and time travel, record by record."""
+        acceleration = self.acceleration
+        for offset, event_type, timestamp, payload_size, decoded in zip(
+            index["offset"].tolist(),
+            index["type"].tolist(),
+            index["timestamp"].tolist(),
+            index["payload_size"].tolist(),
+            activity,
+        ):
+            payload_start = offset + HEADER_SIZE
+            payload_bytes = log_buffer[payload_start : payload_start + payload_size]
+
+            type = Types(event_type)
+
+            if type == Types.Params:
+                activated = read_idle_sleep_mode_setting(payload_bytes)
+                if activated is not None:
+                    self.idle_sleep_mode_activated = activated
+
+            # dt is time delta w.r.t. last valid acceleration datapoint
+            if acceleration:
+                dt = timestamp - _last_second(acceleration[-1])
+            elif self.last_popped_second is not None:
+                dt = timestamp - self.last_popped_second
+            else:
+                dt = 0
+
+            # Time travel dt is relative to last event,
+            # no matter whether it had valid data
+            # or was e.g. ISM start/end
+            time_travel_dt = self.last_idsm_ts - timestamp
+            if time_travel_dt > 0:
+                logger.debug(
+                    "%s --> %s time drift by %s s",
+                    timestamp,
+                    dt,
+                    time_travel_dt,
+                )
+
+            # Idle sleep mode is encoded as an event with payload 8 when entering
+            # and 09 when leaving.
+            if type == Types.Event and payload_bytes == b"\x08":
+                if not self.idle_sleep_mode_activated:
+                    logger.error(
+                        "Found activation of idle sleep mode in the data, but idle "
+                        "sleep mode was not activated in the device. This is probably a"
+                        "bug in the parser."
+                    )
+                self.last_idsm_ts = timestamp
+                self.dt_idm = dt
+                if dt >= 2:
+                    ts = pd.to_datetime(timestamp, unit="s")
+                    logger.debug("Missed %s s before %s", dt, ts)
+
+                if self.idle_sleep_mode_started is not None:
+                    logger.warning(
+                        "Idle sleep mode was already active at %s",
+                        self.idle_sleep_mode_started,
+                    )
+                self.idle_sleep_mode_started = timestamp
+                continue
+            if type == Types.Event and payload_bytes == b"\x09":
+                if (
+                    self.idle_sleep_mode_started is not None
+                    and self.last_values is not None
+                ):
+                    self.last_idsm_ts = timestamp
+                    # Fill in missing data for dt past payloads
+                    fill_start = self.idle_sleep_mode_started - (self.dt_idm - 1)
+                    self._append_gap(fill_start, timestamp)
+                    self.idle_sleep_mode_started = None
+                    continue
+                else:
+                    logger.warning("Idle sleep mode was not active at %s", timestamp)
+                    continue
+
+            # An 'Activity' (id: 0x00) log record type with a 1-byte payload is
+            # captured on a USB connection event (and does not represent a reading
+            # from the activity monitor's accelerometer). This event is captured
+            # upon docking the activity monitor (via USB) to a PC or CentrePoint
+            # Data Hub (CDH) device. Therefore, such records cannot be parsed as the
+            # traditional activity log records and can be ignored.
+            if type in [Types.Activity, Types.Activity3]:
+                if payload_size == 1:
+                    continue
+
+            if type in ACTIVITY_READERS:
+                payload = decoded
+            else:
+                continue
+            if payload.shape[0] > 0:
+                self.last_values = payload[-1]
+                # Without the next line, if we miss an ISM stop event, we would
+                # think we are in ISM even when receiving accelerometer data.
+                self.idle_sleep_mode_started = None
+            if payload.shape[0] != 0:
+                if time_travel_dt > 0:
+                    logger.debug(
+                        "%s>%s time drift by %s s",
+                        timestamp,
+                        dt,
+                        time_travel_dt,
+                    )
+                    try:
+                        logger.debug(
+                            "Last valid second: %s", _last_second(acceleration[-1])
+                        )
+                        self._replace(-1 + int(dt), self._validate_payload(payload))
+                    except IndexError:
+                        # The record to replace was already popped
+                        logger.warning(
+                            "Record at %s travelled back in time beyond the data "
+                            "kept in memory.",
+                            timestamp,
+                        )
+                        self._append(self._validate_payload(payload))
+                else:
+                    self._append(self._validate_payload(payload))
+
+    def _validate_payload(self, payload):
+        """Warn about payloads which do not hold sample rate samples."""
+        shape = payload.shape
+        expected_shape = (self.sample_rate,)
+        if shape[1:] != expected_shape and shape != expected_shape:
+            logger.warning("Unexpected payload shape %s", shape)
+        return payload
+
+    def finish(self):
+        """Fill in idle sleep mode which lasted until the end of the recording."""
+        if self.idle_sleep_mode_started is not None and self.last_values is not None:
+            # Idle sleep mode was started but not finished before the recording
+            # ended. This means that we might be missing some records at the end of
+            # the file.
+            self._append_gap(
+                self.idle_sleep_mode_started - (self.dt_idm - 1), self.last_timestamp
+            )
+            self.idle_sleep_mode_started = None
+        if self.last_timestamp is not None:
+            logger.debug("last ts %s", self.last_timestamp)
+
 
 class LogReader:
     """
@@ -434,11 +1968,17 @@ class LogReader:
     Parameters:
         -----------
             source: IO stream for log.bin file data
+            stats: Statistics to which reading stages are added, if any
+            buffer: Whole log.bin content, if it is already in memory. It is then
+                indexed and read without reading from source.
     """
 
-    def __init__(self, source):
+    def __init__(self, source, stats: Optional[ReadStats] = None, buffer=None):
         """Initialise reader."""
         self.source = source
+        self.stats = stats
+        # Log data read by read_index, or given as buffer
+        self.buffer = buffer
 
     def read_event(self):
         """Parse an event."""
@@ -454,3 +1994,127 @@ class LogReader:
             return None
         raw_event = RawEvent(header, payload_bytes, checksum)
         return raw_event
+
+    def read_blocks(self, block_size: int, num_rows=None):
+        """Read log data by blocks and index their records.
+
+        Parameters:
+        -----------
+        block_size
+            Number of bytes to decompress at a time.
+        num_rows
+            Number of events to index.
+
+        Returns:
+        --------
+        Generator of (buffer, index) tuples, where buffer only contains complete
+        records and index offsets are relative to buffer.
+        """
+        if self.buffer is not None:
+            yield from self._split_buffer(block_size, num_rows)
+            return
+        remainder = b""
+        while num_rows is None or num_rows > 0:
+            data = self._read(block_size)
+            buffer = remainder + data
+            with timer(self.stats, "scan"):
+                index = scan_records(buffer)[:num_rows]
+            if num_rows is not None:
+                num_rows -= len(index)
+            if len(index) > 0:
+                last = index[-1]
+                end = int(last["offset"]) + HEADER_SIZE + int(last["payload_size"]) + 1
+                remainder = buffer[end:]
+                yield buffer, index
+            else:
+                remainder = buffer
+            if not data:
+                break
+
+    def _split_buffer(self, block_size: int, num_rows=None):
+        """Index log data held in memory by blocks, yielding views of it."""
+        buffer = self.buffer
+        if self.stats is not None:
+            self.stats.bytes_read += len(buffer)
+        start = 0
+        size = block_size
+        while start < len(buffer) and (num_rows is None or num_rows > 0):
+            with timer(self.stats, "scan"):
+                index = scan_records(buffer[start : start + size])[:num_rows]
+            if len(index) == 0:
+                if start + size >= len(buffer):
+                    # Only a truncated record is left
+                    break
+                # A record does not fit in the block
+                size *= 2
+                continue
+            if num_rows is not None:
+                num_rows -= len(index)
+            last = index[-1]
+            end = int(last["offset"]) + HEADER_SIZE + int(last["payload_size"]) + 1
+            yield buffer[start : start + end], index
+            start += end
+            size = block_size
+
+    def read_index(self, num_rows=None):
+        """Read the remaining log data and index its records.
+
+        Parameters:
+        -----------
+        num_rows
+            Number of events to index.
+        """
+        if self.buffer is None:
+            self.buffer = self._read()
+        elif self.stats is not None:
+            self.stats.bytes_read += len(self.buffer)
+        with timer(self.stats, "scan"):
+            return scan_records(self.buffer)[:num_rows]
+
+    def _read(self, size: int = -1):
+        """Read (and decompress) data from the source."""
+        with timer(self.stats, "inflate"):
+            data = self.source.read(size)
+        if self.stats is not None:
+            self.stats.bytes_read += len(data)
+        return data
+
+    def read_records(self, index):
+        """Read indexed records.
+
+        Records are taken from the data read by `read_index` if any. Otherwise, the
+        source is seeked to each run of consecutive records, which must be sorted by
+        offset.
+
+        Parameters:
+        -----------
+        index
+            Records to read.
+
+        Returns:
+        --------
+        Tuple of a buffer holding the records, and their index within this buffer.
+        """
+        offsets = index["offset"]
+        ends = offsets + HEADER_SIZE + index["payload_size"] + 1
+        # Runs of records which are stored next to each other
+        breaks = np.flatnonzero(offsets[1:] != ends[:-1]) + 1
+        run_starts = np.concatenate(([0], breaks)).tolist()
+        run_ends = np.concatenate((breaks, [len(index)])).tolist()
+        records = index.copy()
+        data = []
+        length = 0
+        for run_start, run_end in zip(run_starts, run_ends):
+            if run_start == run_end:
+                continue
+            start = int(offsets[run_start])
+            end = int(ends[run_end - 1])
+            if self.buffer is not None:
+                data.append(self.buffer[start:end])
+            else:
+                with timer(self.stats, "inflate"):
+                    self.source.seek(start)
+                data.append(self._read(end - start))
+            records["offset"][run_start:run_end] += length - start
+            length += end - start
+        return b"".join(data), records
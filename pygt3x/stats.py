@@ -0,0 +1,100 @@
+"""Statistics collected while reading files."""
+
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import numpy as np
+
+from pygt3x import Types
+
+TYPE_NAMES = {type.value: type.name for type in Types}
+
+
+@dataclass
+class ReadStats:
+    """
+    Timings and counters of a file read, as collected by `FileReader`.
+
+    Stages are timed each time they run, so that reading a file in chunks adds up
+    the time of every chunk. When log.bin is decoded by several workers, the time
+    of each worker is added as well. Stages are:
+
+    - inflate: decompressing log.bin (or NHANES activity.bin)
+    - scan: indexing log.bin records
+    - checksums: verifying record checksums
+    - decode: decoding activity, temperature and event payloads
+    - parse: handling idle sleep mode and time travel, record by record
+    - deduplicate: removing duplicate acceleration records
+    - join: joining acceleration records and filling in idle sleep mode gaps
+    - validate: checking the number of samples per second
+    - to_pandas: converting acceleration data to data frames
+    - metadata: reading info.txt and the calibration JSON files
+    - cache: loading or storing decoded data in the cache
+
+    Attributes:
+    -----------
+    stage_seconds:
+        Wall time of each stage which ran, in seconds
+    bytes_read:
+        Number of decompressed bytes read from the archive
+    record_counts:
+        Number of log.bin records indexed, by type name. Records of unknown
+        types are counted as "Unknown".
+    samples:
+        Number of acceleration samples produced, including filled samples
+    idle_sleep_mode_samples:
+        Number of samples filled in for idle sleep mode
+    duplicates_removed:
+        Number of duplicate acceleration records (or idle sleep mode seconds)
+        removed
+    checksum_failures:
+        Number of records dropped because their checksum did not match
+    """
+
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    bytes_read: int = 0
+    record_counts: Dict[str, int] = field(default_factory=dict)
+    samples: int = 0
+    idle_sleep_mode_samples: int = 0
+    duplicates_removed: int = 0
+    checksum_failures: int = 0
+
+    @contextmanager
+    def time(self, stage: str):
+        """Add the wall time of a block of code to a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + elapsed
+
+    def merge(self, other: Optional["ReadStats"]):
+        """Add the timings and counters of another read, such as a worker's."""
+        if other is None:
+            return
+        for stage, seconds in other.stage_seconds.items():
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+        for name, count in other.record_counts.items():
+            self.record_counts[name] = self.record_counts.get(name, 0) + count
+        self.bytes_read += other.bytes_read
+        self.samples += other.samples
+        self.idle_sleep_mode_samples += other.idle_sleep_mode_samples
+        self.duplicates_removed += other.duplicates_removed
+        self.checksum_failures += other.checksum_failures
+
+    def count_records(self, types):
+        """Count indexed records by type."""
+        values, counts = np.unique(types, return_counts=True)
+        for value, count in zip(values.tolist(), counts.tolist()):
+            name = TYPE_NAMES.get(value, "Unknown")
+            self.record_counts[name] = self.record_counts.get(name, 0) + count
+
+
+def timer(stats: Optional[ReadStats], stage: str):
+    """Time a stage if statistics are collected, and do nothing otherwise."""
+    if stats is None:
+        return nullcontext()
+    return stats.time(stage)
@@ -0,0 +1,322 @@
+"""Write deterministic synthetic GT3X/AGDC archives of any length.
+
+Archives hold valid log.bin records (with correct checksums) of one activity type,
+a Params record with the idle sleep mode setting, idle sleep mode events and,
+for AGDC archives, temperature records, along with info.txt and calibration
+JSON files. log.bin is written by blocks, so that archives of several weeks can
+be written with bounded memory.
+"""
+
+import json
+import zipfile
+from typing import List, Optional
+
+import numpy as np
+
+from pygt3x import Types
+from pygt3x.log_index import HEADER_SIZE, scan_records
+
+# 2024-01-01 00:00:00 UTC
+START_TIME = 1704067200
+# Number of seconds written at a time
+BLOCK_SECONDS = 3600
+# Idle sleep mode starts at this second of every block, for IDLE_SECONDS
+IDLE_START = 1800
+IDLE_SECONDS = 900
+# A temperature record is written every TEMPERATURE_PERIOD seconds
+TEMPERATURE_PERIOD = 4
+
+SEPARATOR = 0x1E
+# Seconds between 0001-01-01 and 1970-01-01, for .NET ticks in info.txt
+DOTNET_EPOCH_OFFSET = 62135596800
+
+# Acceleration scale (counts per g) of each activity type
+ACCELERATION_SCALES = {
+    Types.Activity: 341.0,
+    Types.Activity2: 256.0,
+    Types.Activity3: 1.0,
+}
+
+# Calibration of AGDC devices, for which 12-bit counts are 250 counts per g
+CALIBRATION = {
+    "offsetX": 32,
+    "offsetY": 18,
+    "offsetZ": 89,
+    "sensitivityXX": 25000,
+    "sensitivityYY": 25000,
+    "sensitivityZZ": 25000,
+    "sensitivityXY": 0,
+    "sensitivityXZ": 0,
+    "sensitivityYZ": 0,
+}
+
+TEMPERATURE_CALIBRATION = {
+    "calibrationTime": START_TIME,
+    "calibrationMethod": 1,
+    "isCalibrated": False,
+    "mcuTempLow": 970,
+    "mcuTempHigh": 1075,
+    "adxlTempLow": 68,
+    "adxlTempHigh": 536,
+    "tempLow": 10,
+    "tempHigh": 40,
+    "mcuTempCal1": 1042,
+    "mcuTempCal2": 1315,
+}
+
+
+def make_records(event_type: int, timestamps, payloads):
+    """
+    Build log.bin records with their header and checksum.
+
+    Parameters:
+    -----------
+    event_type:
+        Record type
+    timestamps:
+        Record timestamps, in seconds
+    payloads:
+        Payload bytes, one row per record
+
+    Returns:
+    --------
+    Record bytes, one row per record
+    """
+    payloads = np.asarray(payloads, dtype=np.uint8).reshape((len(timestamps), -1))
+    records = np.empty(
+        (len(timestamps), HEADER_SIZE + payloads.shape[1] + 1), dtype=np.uint8
+    )
+    records[:, 0] = SEPARATOR
+    records[:, 1] = event_type
+    records[:, 2:6] = np.asarray(timestamps, dtype="<u4").view(np.uint8).reshape(-1, 4)
+    records[:, 6:8] = np.array([payloads.shape[1]], dtype="<u2").view(np.uint8)
+    records[:, HEADER_SIZE:-1] = payloads
+    records[:, -1] = ~np.bitwise_xor.reduce(records[:, :-1], axis=1)
+    return records
+
+
+def pack_uint12(values):
+    """Pack 12-bit values, two by two in 3 bytes, one row per record."""
+    values = (values.astype(np.int64) & 0xFFF).reshape((values.shape[0], -1, 2))
+    first, second = values[:, :, 0], values[:, :, 1]
+    packed = np.stack(
+        [first >> 4, ((first & 0xF) << 4) | (second >> 8), second & 0xFF], axis=2
+    )
+    return packed.reshape((values.shape[0], -1)).astype(np.uint8)
+
+
+def activity_payloads(activity_type: Types, acceleration):
+    """
+    Encode acceleration counts as activity payloads.
+
+    Parameters:
+    -----------
+    activity_type:
+        Activity, Activity2 or Activity3
+    acceleration:
+        Counts with shape (records, samples, 3), in X, Y, Z order
+
+    Returns:
+    --------
+    Payload bytes, one row per record
+    """
+    if activity_type == Types.Activity2:
+        data = acceleration.astype("<i2")
+        return data.reshape((data.shape[0], -1)).view(np.uint8)
+    if activity_type == Types.Activity:
+        # Activity 1 stores Y before X
+        acceleration = acceleration[:, :, [1, 0, 2]]
+    return pack_uint12(acceleration.reshape((acceleration.shape[0], -1)))
+
+
+def synthetic_acceleration(seconds, sample_rate: int, counts_per_g: float, seed: int):
+    """
+    Generate deterministic acceleration counts for a range of seconds.
+
+    The signal is gravity on Z plus a walking-like oscillation and noise.
+
+    Returns:
+    --------
+    Counts with shape (seconds, sample_rate, 3)
+    """
+    rng = np.random.default_rng([seed, int(seconds[0])])
+    time = (seconds[:, None] + np.arange(sample_rate) / sample_rate)[:, :, None]
+    phase = 2 * np.pi * 1.8 * time + np.array([0, np.pi / 2, np.pi])
+    signal = 0.3 * np.sin(phase) + np.array([0, 0, 1])
+    signal += rng.normal(scale=0.02, size=signal.shape)
+    # Keep values within the range of 12-bit activity records
+    return np.clip(np.round(signal * counts_per_g), -2047, 2047).astype(np.int16)
+
+
+def _info(device_type: str, sample_rate: int, acceleration_scale: float, seconds: int):
+    """Return the content of info.txt."""
+
+    def ticks(timestamp):
+        return (timestamp + DOTNET_EPOCH_OFFSET) * 10_000_000
+
+    lines = {
+        "Serial Number": "SYN0000000001",
+        "Device Type": device_type,
+        "Firmware": "1.0.0",
+        "Battery Voltage": "4.10",
+        "Sample Rate": sample_rate,
+        "Start Date": ticks(START_TIME),
+        "Stop Date": ticks(START_TIME + seconds),
+        "Last Sample Time": ticks(START_TIME + seconds),
+        "TimeZone": "00:00:00",
+        "Download Date": ticks(START_TIME + seconds),
+        "Board Revision": 1,
+        "Unexpected Resets": 0,
+        "Acceleration Scale": acceleration_scale,
+        "Acceleration Min": -8.0,
+        "Acceleration Max": 8.0,
+        "Limb": "Wrist",
+        "Side": "Left",
+        "Subject Name": "synthetic",
+    }
+    return "".join(f"{key}: {value}\r\n" for key, value in lines.items())
+
+
+def _block_records(
+    activity_type: Types,
+    start: int,
+    seconds: int,
+    sample_rate: int,
+    idle_sleep_mode: bool,
+    temperature: bool,
+    seed: int,
+):
+    """Return the records of a block of seconds, in log order."""
+    timestamps = START_TIME + start + np.arange(seconds)
+    counts_per_g = ACCELERATION_SCALES[activity_type]
+    if activity_type == Types.Activity3:
+        counts_per_g = CALIBRATION["sensitivityXX"] / 100
+    acceleration = synthetic_acceleration(timestamps, sample_rate, counts_per_g, seed)
+    if activity_type == Types.Activity3:
+        # Uncalibrated counts include the offsets removed by calibration
+        acceleration += np.array(
+            [CALIBRATION[f"offset{axis}"] for axis in "XYZ"], dtype=np.int16
+        )
+    is_active = np.ones(seconds, dtype=bool)
+    groups: List[np.ndarray] = []
+    keys: List[int] = []
+    if idle_sleep_mode and seconds > IDLE_START + IDLE_SECONDS:
+        is_active[IDLE_START : IDLE_START + IDLE_SECONDS] = False
+        events = make_records(
+            Types.Event.value,
+            timestamps[[IDLE_START, IDLE_START + IDLE_SECONDS]],
+            [[0x08], [0x09]],
+        )
+        groups.extend(events)
+        keys.extend(timestamps[[IDLE_START, IDLE_START + IDLE_SECONDS]] * 4)
+    activity = make_records(
+        activity_type.value,
+        timestamps[is_active],
+        activity_payloads(activity_type, acceleration[is_active]),
+    )
+    groups.extend(activity)
+    keys.extend(timestamps[is_active] * 4 + 1)
+    if temperature:
+        times = timestamps[timestamps % TEMPERATURE_PERIOD == 0]
+        payloads = np.zeros((len(times), 6), dtype=np.uint8)
+        mcu = 1000 + (times // 60) % 50
+        adxl = 300 + (times // 60) % 40
+        payloads[:, 1:3] = mcu.astype("<u2").view(np.uint8).reshape(-1, 2)
+        payloads[:, 3] = 1
+        payloads[:, 4:6] = adxl.astype("<i2").view(np.uint8).reshape(-1, 2)
+        groups.extend(make_records(Types.TemperatureRecord.value, times, payloads))
+        keys.extend(times * 4 + 2)
+    order = np.argsort(np.array(keys), kind="stable")
+    return b"".join(groups[i].tobytes() for i in order.tolist())
+
+
+def write_archive(
+    file_name: str,
+    seconds: int,
+    sample_rate: int = 30,
+    format: str = "gt3x",
+    activity_type: Optional[Types] = None,
+    idle_sleep_mode: bool = True,
+    seed: int = 0,
+):
+    """
+    Write a synthetic archive.
+
+    Parameters:
+    -----------
+    file_name:
+        Output file name
+    seconds:
+        Length of the recording, in seconds
+    sample_rate:
+        Sample rate, in Hz
+    format:
+        "gt3x" for a Link-like archive, or "agdc" for an uncalibrated archive with
+        temperature records and calibration JSON files
+    activity_type:
+        Type of the activity records. Defaults to Activity2 for GT3X and Activity3
+        for AGDC.
+    idle_sleep_mode:
+        Enable idle sleep mode, which then lasts `IDLE_SECONDS` in every block of
+        `BLOCK_SECONDS`
+    seed:
+        Seed of the noise added to acceleration
+    """
+    if format not in ["gt3x", "agdc"]:
+        raise ValueError(f"Unknown format: {format}")
+    agdc = format == "agdc"
+    if activity_type is None:
+        activity_type = Types.Activity3 if agdc else Types.Activity2
+    with zipfile.ZipFile(file_name, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(
+            "info.txt",
+            _info(
+                "Insight Watch" if agdc else "Link",
+                sample_rate,
+                ACCELERATION_SCALES[activity_type],
+                seconds,
+            ),
+        )
+        if agdc:
+            calibration = {"calibrationMethod": 2, "isCalibrated": False}
+            calibration.update(
+                {f"{key}_{sample_rate}": value for key, value in CALIBRATION.items()}
+            )
+            archive.writestr("calibration.json", json.dumps(calibration, indent=2))
+            archive.writestr(
+                "temperature_calibration.json",
+                json.dumps(TEMPERATURE_CALIBRATION, indent=2),
+            )
+        with archive.open("log.bin", "w", force_zip64=True) as log:
+            # One parameter, with the idle sleep mode flag at address 2
+            param = [0, 0, 2, 0, 4 if idle_sleep_mode else 0, 0, 0, 0]
+            log.write(make_records(Types.Params.value, [START_TIME], [param]).tobytes())
+            for start in range(0, seconds, BLOCK_SECONDS):
+                log.write(
+                    _block_records(
+                        activity_type,
+                        start,
+                        min(BLOCK_SECONDS, seconds - start),
+                        sample_rate,
+                        idle_sleep_mode,
+                        agdc,
+                        seed,
+                    )
+                )
+
+
+def rewrite_log(source, target, transform):
+    """Copy an archive, with log.bin records changed by transform(index, records)."""
+    with zipfile.ZipFile(source) as input, zipfile.ZipFile(target, "w") as output:
+        for info in input.infolist():
+            data = input.read(info)
+            if info.filename == "log.bin":
+                index = scan_records(data)
+                records = [
+                    bytearray(data[offset : offset + HEADER_SIZE + size + 1])
+                    for offset, size in zip(
+                        index["offset"].tolist(), index["payload_size"].tolist()
+                    )
+                ]
+                data = b"".join(transform(index, records))
+            output.writestr(info, data)
@@ -0,0 +1,129 @@
+import io
+import struct
+
+import numpy as np
+import pytest
+
+from pygt3x.activity_payload import (
+    SAMPLE_DTYPE,
+    concatenate_samples,
+    iter_nhanes_samples,
+    read_activity1_payloads,
+    read_activity2_payloads,
+    read_activity3_payload,
+    read_activity3_payloads,
+    read_nhanes_samples,
+    read_temperature_payload,
+    read_temperature_payloads,
+    samples_to_array,
+    unpack_bitpack_acceleration,
+    unpack_bitpack_acceleration_records,
+)
+
+
+def pack_uint12(samples):
+    """Pack signed 12-bit samples, dropping the last nibble of odd sample counts."""
+    values = (samples.reshape(-1).astype(np.int64) & 0xFFF).tolist()
+    nibbles = []
+    for value in values:
+        nibbles.extend([value >> 8, (value >> 4) & 0xF, value & 0xF])
+    if len(nibbles) % 2:
+        nibbles.pop()
+    return bytes((high << 4) | low for high, low in zip(nibbles[0::2], nibbles[1::2]))
+
+
+@pytest.mark.parametrize("num_samples", [32, 31, 30, 1])
+def test_unpack_bitpack_acceleration_records(num_samples):
+    rng = np.random.default_rng(num_samples)
+    samples = rng.integers(-2048, 2048, size=(4, num_samples, 3))
+    data = np.array([list(pack_uint12(s)) for s in samples], dtype=np.uint8)
+    expected = samples.copy()
+    if num_samples % 2:
+        # The last nibble of odd sample counts is not stored
+        expected[:, -1, 2] &= ~0xF
+    output = unpack_bitpack_acceleration_records(data)
+    assert output.dtype == np.int16
+    np.testing.assert_array_equal(output, expected)
+    for record, row in zip(output, data):
+        np.testing.assert_array_equal(
+            unpack_bitpack_acceleration(row.tobytes()), record
+        )
+
+
+def test_read_activity_payloads():
+    rng = np.random.default_rng(0)
+    samples = rng.integers(-2048, 2048, size=(3, 32, 3))
+    data = np.array([list(pack_uint12(s)) for s in samples], dtype=np.uint8)
+    timestamps = np.array([100, 101, 103], dtype=np.uint32)
+
+    output = read_activity3_payloads(data, timestamps)
+    assert output.dtype == SAMPLE_DTYPE
+    assert output.shape == (3, 32)
+    np.testing.assert_array_equal(
+        output["timestamp"], np.broadcast_to(timestamps[:, None], (3, 32))
+    )
+    np.testing.assert_array_equal(output["sample"], np.tile(np.arange(32), (3, 1)))
+    np.testing.assert_array_equal(output["x"], samples[:, :, 0])
+    np.testing.assert_array_equal(output["y"], samples[:, :, 1])
+    np.testing.assert_array_equal(output["z"], samples[:, :, 2])
+    assert not output["idle_sleep_mode"].any()
+    for record, row, timestamp in zip(output, data, timestamps):
+        expected = read_activity3_payload(row.tobytes(), timestamp, 32)
+        np.testing.assert_array_equal(samples_to_array(record, 32), expected)
+        np.testing.assert_array_equal(expected[:, 0], timestamp + np.arange(32) / 32)
+
+    output = read_activity1_payloads(data, timestamps)
+    np.testing.assert_array_equal(output["x"], samples[:, :, 1])
+    np.testing.assert_array_equal(output["y"], samples[:, :, 0])
+
+    data = samples.astype("<i2").view(np.uint8).reshape((3, -1))
+    output = read_activity2_payloads(data, timestamps)
+    np.testing.assert_array_equal(samples_to_array(output, 32)[:, :, 1:4], samples)
+
+
+def test_concatenate_samples():
+    records = np.zeros((4, 30), dtype=SAMPLE_DTYPE)
+    records["timestamp"] = np.arange(4)[:, None]
+    records["x"] = np.arange(120).reshape((4, 30))
+    output = concatenate_samples(list(records[::-1]) + [records[0]])
+    assert output.dtype == SAMPLE_DTYPE
+    np.testing.assert_array_equal(
+        output, np.concatenate([records[::-1].reshape(-1), records[0]])
+    )
+    assert len(concatenate_samples([])) == 0
+
+
+@pytest.mark.parametrize("num_samples", [1000, 999])
+@pytest.mark.parametrize("block_size", [2, 7, 100, 5000])
+def test_read_nhanes_samples_by_blocks(num_samples, block_size):
+    rng = np.random.default_rng(num_samples)
+    values = rng.integers(-2048, 2048, size=(num_samples, 3))
+    data = pack_uint12(values)
+    expected = read_nhanes_samples(io.BytesIO(data), 30)
+    assert len(expected) == num_samples
+    np.testing.assert_array_equal(expected["x"], values[:, 1])
+    np.testing.assert_array_equal(expected["timestamp"], np.arange(num_samples) // 30)
+
+    samples = read_nhanes_samples(io.BytesIO(data), 30, len(data), block_size)
+    np.testing.assert_array_equal(samples, expected)
+    blocks = list(iter_nhanes_samples(io.BytesIO(data), 30, block_size))
+    assert all(len(block) <= max(block_size, 2) for block in blocks)
+    np.testing.assert_array_equal(concatenate_samples(blocks), expected)
+
+
+def test_read_temperature_payloads():
+    payloads = [
+        # Sensor 0 is unsigned and sensor 1 signed
+        struct.pack("<BHBh", 0, 40000, 1, -300),
+        struct.pack("<BhBH", 1, 25, 0, 1034),
+        # The last value of a sensor wins
+        struct.pack("<BHBhBH", 0, 1, 1, 2, 0, 3),
+    ]
+    expected = [[10, 40000, -300], [11, 1034, 25]]
+    data = np.frombuffer(b"".join(payloads[:2]), dtype=np.uint8).reshape((2, -1))
+    np.testing.assert_array_equal(read_temperature_payloads(data, [10, 11]), expected)
+    np.testing.assert_array_equal(
+        read_temperature_payload(payloads[2], 12), [[12, 3, 2]]
+    )
+    missing = read_temperature_payload(struct.pack("<BH", 0, 7), 13)
+    np.testing.assert_array_equal(missing, [[13, 7, np.nan]])
@@ -0,0 +1,129 @@
+import io
+import os
+import tarfile
+from zipfile import ZIP_STORED, ZipFile
+
+import pandas as pd
+import pytest
+
+from pygt3x.archive import Archive
+from pygt3x.reader import FileReader
+
+
+@pytest.fixture(scope="module")
+def stored_file(agdc_file_with_temperature, tmp_path_factory):
+    """Copy of an archive with log.bin stored without compression."""
+    file_name = tmp_path_factory.mktemp("stored") / "stored.agdc"
+    with ZipFile(agdc_file_with_temperature) as source:
+        with ZipFile(file_name, "w") as output:
+            for info in source.infolist():
+                output.writestr(info, source.read(info), compress_type=ZIP_STORED)
+    return file_name
+
+
+def test_member_view(stored_file, agdc_file_with_temperature):
+    with ZipFile(stored_file) as zip_file:
+        expected = zip_file.read("log.bin")
+    for source in [str(stored_file), stored_file.read_bytes()]:
+        archive = Archive(source)
+        view = archive.member_view("log.bin")
+        assert isinstance(view, memoryview)
+        assert view == expected
+        archive.close()
+    # Compressed members are not viewed
+    archive = Archive(str(agdc_file_with_temperature))
+    assert archive.member_view("log.bin") is None
+    archive.close()
+
+
+class _Window(io.RawIOBase):
+    """File object over the end of a file, which shares its descriptor."""
+
+    def __init__(self, f, offset):
+        self.f = f
+        self.offset = offset
+        f.seek(offset)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        return self.f.readinto(b)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            offset += self.offset
+        return self.f.seek(offset, whence) - self.offset
+
+    def tell(self):
+        return self.f.tell() - self.offset
+
+    def fileno(self):
+        return self.f.fileno()
+
+
+def test_member_view_file_objects(stored_file, tmp_path):
+    with ZipFile(stored_file) as zip_file:
+        expected = zip_file.read("log.bin")
+    data = stored_file.read_bytes()
+    # The archive follows other data in the same file
+    file_name = tmp_path / "padded"
+    file_name.write_bytes(os.urandom(1000) + data)
+    with open(file_name, "rb") as f:
+        archive = Archive(_Window(f, 1000))
+        assert archive.member_view("log.bin") == expected
+        assert archive.mmap is None
+        archive.close()
+    # Files positioned at their start are mapped
+    with open(stored_file, "rb") as f:
+        archive = Archive(f)
+        assert archive.member_view("log.bin") == expected
+        assert archive.mmap is not None
+        archive.close()
+
+
+@pytest.mark.parametrize(
+    "source_type", ["path", "bytes", "memoryview", "bytesio", "file", "tar"]
+)
+def test_stored_log(source_type, stored_file, agdc_file_with_temperature, tmp_path):
+    with FileReader(agdc_file_with_temperature) as reader:
+        expected = reader.to_pandas()
+        expected_temperature = reader.temperature_to_pandas()
+    data = stored_file.read_bytes()
+    tar_name = tmp_path / "archives.tar"
+    with tarfile.open(tar_name, "w") as tar:
+        tar.add(agdc_file_with_temperature, "compressed.agdc")
+        tar.add(stored_file, "stored.agdc")
+    with open(stored_file, "rb") as f, tarfile.open(tar_name) as tar:
+        source = {
+            "path": str(stored_file),
+            "bytes": data,
+            "memoryview": memoryview(bytearray(data)),
+            "bytesio": io.BytesIO(data),
+            "file": f,
+            "tar": tar.extractfile("stored.agdc"),
+        }[source_type]
+        with FileReader(source, collect_stats=True) as reader:
+            assert isinstance(reader.logreader.buffer, memoryview)
+            pd.testing.assert_frame_equal(reader.to_pandas(), expected)
+            pd.testing.assert_frame_equal(
+                reader.temperature_to_pandas(), expected_temperature
+            )
+            # Nothing was decompressed
+            assert "inflate" not in reader.stats.stage_seconds
+        with FileReader(source, lazy=True) as reader:
+            chunks = list(reader.iter_chunks(seconds=60))
+        pd.testing.assert_frame_equal(pd.concat(chunks), expected)
+        start, end = float(expected.index[1000]), float(expected.index[5000])
+        with FileReader(source, start=start, end=end) as reader:
+            pd.testing.assert_frame_equal(reader.to_pandas(), expected.iloc[1000:5000])
+
+
+def test_compressed_buffer(agdc_file_with_temperature):
+    with FileReader(agdc_file_with_temperature) as reader:
+        expected = reader.to_pandas()
+    with FileReader(memoryview(agdc_file_with_temperature.read_bytes())) as reader:
+        pd.testing.assert_frame_equal(reader.to_pandas(), expected)
@@ -0,0 +1,120 @@
+import asyncio
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from pygt3x.async_reader import AsyncFileReader
+from pygt3x.reader import FileReader
+
+
+@pytest.mark.parametrize("source_type", ["path", "bytes", "file"])
+def test_async_reader(source_type, agdc_file_with_temperature):
+    with FileReader(agdc_file_with_temperature) as reader:
+        expected = reader.to_pandas()
+        expected_temperature = reader.temperature_to_pandas()
+    data = agdc_file_with_temperature.read_bytes()
+    source = {
+        "path": str(agdc_file_with_temperature),
+        "bytes": data,
+        "file": io.BytesIO(data),
+    }[source_type]
+
+    async def read():
+        async with AsyncFileReader(source) as reader:
+            assert reader.info.sample_rate == 32
+            return await reader.to_pandas(), await reader.temperature_to_pandas()
+
+    df, temperature = asyncio.run(read())
+    pd.testing.assert_frame_equal(df, expected)
+    pd.testing.assert_frame_equal(temperature, expected_temperature)
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_async_iter_chunks(lazy, ism_enabled_file, agdc_file_with_temperature):
+    files = [ism_enabled_file, agdc_file_with_temperature]
+    expected = []
+    for file_name in files:
+        with FileReader(file_name) as reader:
+            expected.append(reader.to_pandas())
+
+    async def read(file_name, executor):
+        async with AsyncFileReader(
+            file_name.read_bytes(), executor, lazy=lazy
+        ) as reader:
+            return [df async for df in reader.iter_chunks(seconds=60)]
+
+    async def read_all():
+        with ThreadPoolExecutor(2) as executor:
+            return await asyncio.gather(*(read(f, executor) for f in files))
+
+    for chunks, df in zip(asyncio.run(read_all()), expected):
+        assert all(len(chunk) <= 60 * 32 for chunk in chunks)
+        pd.testing.assert_frame_equal(pd.concat(chunks), df)
+
+
+def test_async_iter_chunks_stopped_early(agdc_file_with_temperature):
+    async def read():
+        async with AsyncFileReader(agdc_file_with_temperature, lazy=True) as reader:
+            async for df in reader.iter_chunks(seconds=60):
+                return df
+
+    assert len(asyncio.run(read())) == 60 * 32
+
+
+def test_async_cancelled_while_decoding(agdc_file_with_temperature):
+    started = threading.Event()
+    release = threading.Event()
+    events = []
+
+    def frames(seconds, calibrate, dtype):
+        try:
+            yield 1
+            started.set()
+            release.wait(10)
+            events.append("decoded")
+            yield 2
+        finally:
+            events.append("closed")
+
+    def to_pandas(calibrate, dtype):
+        started.set()
+        release.wait(10)
+        events.append("converted")
+
+    async def cancel(coroutine):
+        loop = asyncio.get_running_loop()
+        task = asyncio.ensure_future(coroutine)
+        await loop.run_in_executor(None, started.wait)
+        task.cancel()
+        loop.call_later(0.1, release.set)
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    async def read():
+        async with AsyncFileReader(agdc_file_with_temperature) as reader:
+            reader.reader._iter_frames = frames
+            await cancel(_consume(reader.iter_chunks()))
+            # The generator was closed once the chunk was decoded
+            assert events == ["decoded", "closed"]
+            started.clear()
+            release.clear()
+            reader.reader.to_pandas = to_pandas
+            original_exit = reader.reader.__exit__
+
+            def exit(*args):
+                events.append("exit")
+                original_exit(*args)
+
+            reader.reader.__exit__ = exit
+            await cancel(reader.to_pandas())
+
+    asyncio.run(read())
+    # Leaving the context waited for the conversion
+    assert events[2:] == ["converted", "exit"]
+
+
+async def _consume(chunks):
+    return [chunk async for chunk in chunks]
@@ -0,0 +1,83 @@
+import multiprocessing
+import os
+
+import pandas as pd
+import pytest
+
+import pygt3x
+from pygt3x import batch
+from pygt3x.reader import FileReader
+
+
+class _CrashingReader(FileReader):
+    """Reader which kills its process for files named crash.*."""
+
+    def __enter__(self):
+        if os.path.basename(str(self.file_name)).startswith("crash."):
+            os._exit(1)
+        return super().__enter__()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_read_many(workers, ism_enabled_file, agdc_file_with_temperature, tmp_path):
+    broken_file = tmp_path / "broken.gt3x"
+    broken_file.write_bytes(b"not a zip file")
+    output = tmp_path / "output"
+    results = pygt3x.read_many(
+        [ism_enabled_file, broken_file, agdc_file_with_temperature],
+        str(output),
+        workers=workers,
+    )
+
+    assert [r.error is None for r in results] == [True, False, True]
+    assert results[1].error.startswith("BadZipFile")
+    assert results[1].outputs == []
+
+    for result, file_name in zip(
+        [results[0], results[2]], [ism_enabled_file, agdc_file_with_temperature]
+    ):
+        with FileReader(file_name) as reader:
+            expected = reader.to_pandas()
+            assert result.info == reader.info
+            if len(reader.temperature) > 0:
+                expected_temperature = reader.temperature_to_pandas()
+                pd.testing.assert_frame_equal(
+                    pd.read_pickle(result.outputs[1]), expected_temperature
+                )
+                assert result.temperature_rows == len(expected_temperature)
+        assert result.acceleration_rows == len(expected)
+        pd.testing.assert_frame_equal(pd.read_pickle(result.outputs[0]), expected)
+    assert len(results[0].outputs) == 1
+    assert len(results[2].outputs) == 2
+
+
+def test_read_many_name_collision(ism_enabled_file, tmp_path):
+    with pytest.raises(ValueError):
+        pygt3x.read_many([ism_enabled_file, ism_enabled_file], str(tmp_path))
+    with pytest.raises(ValueError):
+        pygt3x.read_many([ism_enabled_file], str(tmp_path), format="xlsx")
+
+
+def test_read_many_warnings(v1_file, tmp_path):
+    (result,) = pygt3x.read_many([v1_file], str(tmp_path), workers=1)
+    assert result.error is None
+    assert any("1 seconds have fewer" in w for w in result.warnings)
+
+
+def test_read_many_worker_killed(
+    ism_enabled_file, agdc_file_with_temperature, tmp_path, monkeypatch
+):
+    if multiprocessing.get_start_method() != "fork":
+        pytest.skip("Workers only see the patched reader when forked")
+    monkeypatch.setattr(batch, "FileReader", _CrashingReader)
+    crash_file = tmp_path / "crash.gt3x"
+    crash_file.write_bytes(ism_enabled_file.read_bytes())
+    files = [ism_enabled_file, crash_file, agdc_file_with_temperature]
+    results = pygt3x.read_many(files, str(tmp_path / "output"), workers=2)
+
+    assert [r.file_name for r in results] == [str(f) for f in files]
+    assert [r.error is None for r in results] == [True, False, True]
+    assert results[1].error.startswith("BrokenProcessPool")
+    with FileReader(agdc_file_with_temperature) as reader:
+        expected = reader.to_pandas()
+    pd.testing.assert_frame_equal(pd.read_pickle(results[2].outputs[0]), expected)
@@ -0,0 +1,27 @@
+import os
+
+import numpy as np
+
+from pygt3x.cache import ResultCache
+
+
+def test_cache_eviction(tmp_path):
+    array = np.zeros(1000, dtype=np.uint8)
+    ResultCache(str(tmp_path), max_size=10000).store("a", {"array": array}, {})
+    entry_size = sum(f.stat().st_size for f in (tmp_path / "a").iterdir())
+    cache = ResultCache(str(tmp_path), max_size=2 * entry_size + 100)
+    cache.store("b", {"array": array + 1}, {"name": "b"})
+    os.utime(tmp_path / "a", (1, 1))
+    os.utime(tmp_path / "b", (2, 2))
+
+    arrays, metadata = cache.load("a")
+    np.testing.assert_array_equal(arrays["array"], array)
+    assert metadata == {}
+    # b is now the least recently used entry
+    cache.store("c", {"array": array}, {})
+    assert sorted(os.listdir(tmp_path)) == ["a", "c"]
+    assert cache.load("b") is None
+
+    # Entries larger than the cache are not kept
+    ResultCache(str(tmp_path), max_size=1).store("d", {"array": array}, {})
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+import pygt3x
+from tests.synthetic import START_TIME, rewrite_log, write_archive
+from pygt3x.log_index import ACTIVITY_TYPES
+from pygt3x.reader import FileReader
+
+
+@pytest.mark.parametrize(
+    "fixture",
+    ["ism_enabled_file", "ism_disabled_file", "agdc_file_with_temperature", "v1_file"],
+)
+def test_inspect(fixture, request):
+    file_name = request.getfixturevalue(fixture)
+    summary = pygt3x.inspect(file_name)
+    with FileReader(file_name) as reader:
+        assert summary.info == reader.info
+        assert summary.calibration == reader.calibration
+        assert summary.temperature_calibration == reader.temperature_calibration
+        assert summary.idle_sleep_mode_activated == reader.idle_sleep_mode_activated
+        time = reader.acceleration[:, 0]
+    assert summary.first_timestamp == np.floor(time.min())
+    assert summary.last_timestamp == np.floor(time.max())
+    assert summary.error is None
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_inspect_directory(use_processes, ism_enabled_file, tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "a.gt3x").write_bytes(ism_enabled_file.read_bytes())
+    (tmp_path / "b.GT3X").write_bytes(b"not a zip file")
+    (tmp_path / "notes.txt").write_text("skipped")
+    summaries = pygt3x.inspect_directory(
+        str(tmp_path), workers=2, use_processes=use_processes
+    )
+    assert [s.file_name for s in summaries] == [
+        str(tmp_path / "b.GT3X"),
+        str(tmp_path / "sub" / "a.gt3x"),
+    ]
+    assert summaries[0].error.startswith("BadZipFile")
+    assert summaries[1].error is None
+    assert summaries[1].idle_sleep_mode_activated
+
+
+def corrupt_first_and_last_activity(index, records):
+    # Corrupt records claim to be a day away from the recording
+    (activity,) = np.nonzero(np.isin(index["type"], ACTIVITY_TYPES))
+    for position, shift in [(activity[0], -86400), (activity[-1], 86400)]:
+        record = records[position]
+        timestamp = int.from_bytes(record[2:6], "little") + shift
+        record[2:6] = timestamp.to_bytes(4, "little")
+    return records
+
+
+def test_inspect_corrupt_activity(tmp_path):
+    file_name = str(tmp_path / "synthetic.gt3x")
+    write_archive(file_name, 3600, 30)
+    damaged_file = str(tmp_path / "damaged.gt3x")
+    rewrite_log(file_name, damaged_file, corrupt_first_and_last_activity)
+    summary = pygt3x.inspect(damaged_file)
+    with FileReader(damaged_file) as reader:
+        time = reader.acceleration[:, 0]
+    assert summary.first_timestamp == np.floor(time.min()) == START_TIME + 1
+    assert summary.last_timestamp == np.floor(time.max()) == START_TIME + 3598
@@ -0,0 +1,89 @@
+import sys
+
+import numpy as np
+import pytest
+
+from pygt3x.reader import FileReader
+
+pytest.importorskip("scipy")
+
+from pygt3x.counts import CountsCalculator, counts  # noqa: E402
+
+
+@pytest.mark.parametrize("sample_rate", [30, 40, 90, 32, 256])
+def test_counts_by_blocks(sample_rate):
+    rng = np.random.default_rng(sample_rate)
+    acceleration = rng.normal(0, 0.5, (sample_rate * 185, 3))
+    expected = counts(acceleration, sample_rate, epoch=10)
+    assert expected.shape == (18, 3)
+    calculator = CountsCalculator(sample_rate, epoch=10)
+    blocks = [
+        calculator.update(acceleration[start : start + 997])
+        for start in range(0, len(acceleration), 997)
+    ]
+    blocks.append(calculator.finish())
+    np.testing.assert_array_equal(np.concatenate(blocks), expected)
+
+
+def test_counts_constant():
+    acceleration = np.tile([0.1, -0.2, 1.0], (30 * 120, 1))
+    np.testing.assert_array_equal(counts(acceleration, 30), np.zeros((2, 3)))
+
+
+def test_counts_agcounts():
+    agcounts = pytest.importorskip("agcounts.extract")
+    rng = np.random.default_rng(0)
+    for sample_rate in [30, 50, 64]:
+        acceleration = np.round(rng.normal(0, 0.5, (sample_rate * 300, 3)), 3)
+        np.testing.assert_array_equal(
+            counts(acceleration, sample_rate, 10),
+            agcounts.get_counts(acceleration, sample_rate, 10),
+        )
+
+
+@pytest.mark.parametrize("fixture", ["gt3x_file", "agdc_file_with_temperature"])
+def test_reader_counts(fixture, request):
+    file_name = request.getfixturevalue(fixture)
+    with FileReader(file_name) as reader:
+        df = reader.to_pandas(dtype=np.float64)
+        expected = counts(df[["X", "Y", "Z"]].to_numpy(), reader.info.sample_rate)
+        result = reader.counts(seconds=600)
+    with FileReader(file_name, lazy=True) as reader:
+        lazy_result = reader.counts(seconds=600)
+    np.testing.assert_array_equal(result[["X", "Y", "Z"]].to_numpy(), expected)
+    assert result.index[0] == df.index[0]
+    assert (np.diff(result.index) == 60).all()
+    np.testing.assert_allclose(
+        result["VectorMagnitude"], np.sqrt((expected**2).sum(axis=1))
+    )
+    assert result["VectorMagnitude"].sum() > 0
+    assert result.equals(lazy_result)
+
+
+def test_counts_without_scipy(monkeypatch):
+    monkeypatch.setitem(sys.modules, "scipy", None)
+    with pytest.raises(ImportError, match=r"pygt3x\[counts\]"):
+        CountsCalculator(30)
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_reader_counts_gaps(lazy, ism_enabled_file):
+    # Idle sleep mode gaps are not filled in, so that the recording has gaps
+    with FileReader(ism_enabled_file, fill_idle_sleep_mode=False) as reader:
+        df = reader.to_pandas(dtype=np.float64)
+        sample_rate = reader.info.sample_rate
+    breaks = np.flatnonzero(np.diff(df.index) > 1.5 / sample_rate) + 1
+    assert len(breaks) > 0
+    expected = []
+    expected_time = []
+    for begin, end in zip([0, *breaks], [*breaks, len(df)]):
+        run = df.iloc[begin:end]
+        run_counts = counts(run[["X", "Y", "Z"]].to_numpy(), sample_rate, epoch=5)
+        expected.append(run_counts)
+        expected_time.append(run.index[0] + 5 * np.arange(len(run_counts)))
+    with FileReader(ism_enabled_file, fill_idle_sleep_mode=False, lazy=lazy) as reader:
+        result = reader.counts(epoch=5, seconds=7)
+    np.testing.assert_array_equal(
+        result[["X", "Y", "Z"]].to_numpy(), np.concatenate(expected)
+    )
+    np.testing.assert_array_equal(result.index, np.concatenate(expected_time))
@@ -0,0 +1,101 @@
+import struct
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pygt3x import Types
+from pygt3x import reader as reader_module
+from pygt3x.event_payload import concatenate_events, read_raw_payloads
+from pygt3x.reader import FileReader
+
+
+def test_events(gt3x_file):
+    with FileReader(gt3x_file) as reader:
+        expected_acceleration = reader.to_pandas()
+        battery = []
+        capsense = []
+        reader.logreader.source.seek(0)
+        for event in reader.read_events():
+            timestamp = event.header.timestamp
+            if event.header.event_type == Types.Battery.value:
+                battery.append((timestamp, *struct.unpack("<H", event.payload)))
+            elif event.header.event_type == Types.Capsense.value:
+                capsense.append((timestamp, *struct.unpack("<HHBB", event.payload)))
+    streams = ["acceleration", "battery", "capsense", "lux"]
+    with FileReader(gt3x_file, streams=streams) as reader:
+        pd.testing.assert_frame_equal(reader.to_pandas(), expected_acceleration)
+        assert reader.events["battery"].tolist() == battery
+        assert reader.events["capsense"].tolist() == capsense
+        assert len(reader.events["lux"]) == 0
+        df = reader.events_to_pandas("battery")
+        np.testing.assert_allclose(
+            df["Voltage"], [b[1] / 1000 for b in battery], rtol=1e-6
+        )
+        df = reader.events_to_pandas("capsense")
+        assert list(df.columns) == ["Signal", "Reference", "State", "Bursts"]
+        assert len(df) == len(capsense)
+        with pytest.raises(ValueError):
+            reader.events_to_pandas("epoch")
+
+
+def test_events_chunks_and_time_range(agdc_file_with_temperature, tmp_path):
+    with FileReader(agdc_file_with_temperature, streams=["battery"]) as reader:
+        assert len(reader.samples) == 0
+        assert len(reader.temperature) == 0
+        battery = reader.events["battery"]
+    assert len(battery) > 0
+    with FileReader(
+        agdc_file_with_temperature, lazy=True, streams=["acceleration", "battery"]
+    ) as reader:
+        for _ in reader.iter_chunks(seconds=600):
+            pass
+        np.testing.assert_array_equal(reader.events["battery"], battery)
+    start = float(battery["timestamp"][10])
+    end = float(battery["timestamp"][20])
+    with FileReader(
+        agdc_file_with_temperature,
+        start=start,
+        end=end,
+        index_file=str(tmp_path / "index.npz"),
+        streams=["battery"],
+    ) as reader:
+        np.testing.assert_array_equal(reader.events["battery"], battery[10:20])
+
+
+def test_raw_events():
+    data = np.arange(6, dtype=np.uint8).reshape((2, 3))
+    small = read_raw_payloads(data, [1, 2], [Types.Epoch.value] * 2, 3)
+    large = read_raw_payloads(
+        np.full((1, 5), 9, dtype=np.uint8), [3], [Types.Epoch2.value], 5
+    )
+    events = concatenate_events("epoch", [small, large])
+    assert events["timestamp"].tolist() == [1, 2, 3]
+    assert events["size"].tolist() == [3, 3, 5]
+    assert events["payload"].tolist() == [
+        [0, 1, 2, 0, 0],
+        [3, 4, 5, 0, 0],
+        [9, 9, 9, 9, 9],
+    ]
+
+
+def test_unknown_stream(gt3x_file):
+    with pytest.raises(ValueError):
+        FileReader(gt3x_file, streams=["heart_rate"])
+
+
+def test_skip_unrequested_records(agdc_file_with_temperature, monkeypatch):
+    with FileReader(agdc_file_with_temperature) as reader:
+        expected = reader.temperature
+    checked_types = set()
+
+    def validate_checksums(buffer, index):
+        checked_types.update(index["type"].tolist())
+        return original(buffer, index)
+
+    original = reader_module.validate_checksums
+    monkeypatch.setattr(reader_module, "validate_checksums", validate_checksums)
+    with FileReader(agdc_file_with_temperature, streams=["temperature"]) as reader:
+        np.testing.assert_array_equal(reader.temperature, expected)
+        assert len(reader.samples) == 0
+    assert checked_types == {Types.TemperatureRecord.value}
@@ -0,0 +1,46 @@
+import sys
+
+import pandas as pd
+import pytest
+
+from pygt3x.export import read_export
+from pygt3x.reader import FileReader
+
+
+@pytest.mark.parametrize("format", ["npy", "arrow"])
+@pytest.mark.parametrize("lazy", [False, True])
+def test_export(format, lazy, agdc_file_with_temperature, tmp_path):
+    if format == "arrow":
+        pytest.importorskip("pyarrow")
+    with FileReader(agdc_file_with_temperature) as reader:
+        expected = reader.to_pandas()
+        expected_temperature = reader.temperature_to_pandas()
+        info = reader.info
+    with FileReader(agdc_file_with_temperature, lazy=lazy) as reader:
+        reader.export(str(tmp_path), format=format, seconds=600)
+
+    exported = read_export(str(tmp_path))
+    assert exported.info == info
+    pd.testing.assert_frame_equal(exported.to_pandas(), expected)
+    pd.testing.assert_frame_equal(
+        exported.to_pandas("temperature"), expected_temperature
+    )
+    if format == "npy":
+        # Columns are mapped read-only rather than loaded
+        assert not exported.arrays()["X"].flags.writeable
+
+
+def test_export_without_temperature(gt3x_file, tmp_path):
+    with FileReader(gt3x_file) as reader:
+        expected = reader.to_pandas()
+        reader.export(str(tmp_path))
+    exported = read_export(str(tmp_path))
+    pd.testing.assert_frame_equal(exported.to_pandas(), expected)
+    assert exported.arrays("temperature") == {}
+
+
+def test_export_without_pyarrow(agdc_file_with_temperature, tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with FileReader(agdc_file_with_temperature) as reader:
+        with pytest.raises(ImportError, match=r"pygt3x\[arrow\]"):
+            reader.export(str(tmp_path), format="arrow")
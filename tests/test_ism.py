@@ -1,4 +1,15 @@
-from pygt3x.reader import FileReader
+import numpy as np
+import pandas as pd
+
+from pygt3x.activity_payload import SAMPLE_DTYPE, idle_sleep_mode_to_samples
+from pygt3x.reader import (
+    FileReader,
+    _DuplicateFilter,
+    _IdleSleepModeGap,
+    _LogParser,
+    _ParserSettings,
+    expand_idle_sleep_mode,
+)
 
 
 def test_ism_enabled(ism_enabled_file, ism_disabled_file):
@@ -14,3 +25,87 @@ def test_ism_enabled(ism_enabled_file, ism_disabled_file):
         == df_enabled.loc[1616169537:1616169574, "X"].iloc[0]
     ).all()
     assert (df_enabled.index == df_disabled.index).all()
+
+
+def test_ism_segments(ism_enabled_file):
+    with FileReader(ism_enabled_file) as reader:
+        samples = reader.samples
+        segments = reader.idle_sleep_mode_segments
+        sample_rate = reader.info.sample_rate
+    with FileReader(ism_enabled_file, fill_idle_sleep_mode=False) as reader:
+        np.testing.assert_array_equal(
+            reader.samples, samples[~samples["idle_sleep_mode"]]
+        )
+        np.testing.assert_array_equal(reader.idle_sleep_mode_segments, segments)
+        chunks = list(reader.iter_chunks(seconds=7))
+        assert sum(len(chunk) for chunk in chunks) == len(reader.samples)
+    assert len(segments) > 0
+    np.testing.assert_array_equal(
+        idle_sleep_mode_to_samples(segments, sample_rate),
+        samples[samples["idle_sleep_mode"]],
+    )
+
+
+def test_duplicate_gaps():
+    duplicate_filter = _DuplicateFilter()
+    gaps = [
+        _IdleSleepModeGap(10, 20, (1, 2, 3)),
+        _IdleSleepModeGap(5, 25, (1, 2, 3)),
+        _IdleSleepModeGap(15, 18, (0, 0, 0)),
+    ]
+    unique, duplicated = duplicate_filter.filter(gaps)
+    assert [(g.start, g.end, g.values) for g in unique] == [
+        (10, 20, (1, 2, 3)),
+        (5, 10, (1, 2, 3)),
+        (20, 25, (1, 2, 3)),
+        (15, 18, (0, 0, 0)),
+    ]
+    assert len(duplicated) == 10
+    duplicate_filter.release(22)
+    unique, duplicated = duplicate_filter.filter([_IdleSleepModeGap(0, 30, (1, 2, 3))])
+    assert [(g.start, g.end) for g in unique] == [(0, 22), (25, 30)]
+
+
+def test_parser_gaps():
+    parser = _LogParser(_ParserSettings(4, frozenset(["acceleration"])))
+
+    def record(timestamp):
+        record = np.zeros(4, dtype=SAMPLE_DTYPE)
+        record["timestamp"] = timestamp
+        return record
+
+    parser._append(record(0))
+    parser._append(_IdleSleepModeGap(1, 11, (1, 2, 3)))
+    parser._append(record(11))
+    assert parser.num_seconds == 12
+    # Time travel into a gap splits it
+    parser._replace(-4, record(8))
+    assert [getattr(r, "start", None) for r in parser.acceleration] == [
+        None,
+        1,
+        None,
+        9,
+        None,
+    ]
+    popped = parser.pop(5)
+    assert [len(r) if isinstance(r, _IdleSleepModeGap) else 1 for r in popped] == [
+        1,
+        4,
+    ]
+    assert parser.last_popped_second == 4
+    assert parser.num_seconds == 7
+
+
+def test_idle_sleep_mode_to_pandas(ism_enabled_file):
+    with FileReader(ism_enabled_file) as reader:
+        expected = reader.to_pandas()
+    with FileReader(ism_enabled_file, fill_idle_sleep_mode=False) as reader:
+        df = reader.to_pandas()
+        idle_sleep_mode = reader.idle_sleep_mode_to_pandas()
+        sample_rate = reader.info.sample_rate
+    assert not df["IdleSleepMode"].any()
+    assert list(idle_sleep_mode.columns) == ["Start", "End", "X", "Y", "Z"]
+    assert len(idle_sleep_mode) == len(reader.idle_sleep_mode_segments)
+    pd.testing.assert_frame_equal(
+        expand_idle_sleep_mode(df, idle_sleep_mode, sample_rate), expected
+    )
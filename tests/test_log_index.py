@@ -0,0 +1,115 @@
+from zipfile import ZipFile
+
+import numpy as np
+import pytest
+
+from pygt3x import Types
+from pygt3x.log_index import (
+    RECORD_DTYPE,
+    load_index,
+    partition_records,
+    save_index,
+    scan_records,
+    validate_checksums,
+)
+from pygt3x.reader import FileReader, LogReader
+
+
+def read_log(file_name):
+    with ZipFile(file_name) as zip_file:
+        return zip_file.read("log.bin")
+
+
+def read_headers(file_name):
+    with ZipFile(file_name) as zip_file, zip_file.open("log.bin") as f:
+        reader = LogReader(f)
+        headers = []
+        evt = reader.read_event()
+        while evt is not None:
+            header = evt.header
+            headers.append(
+                (
+                    header.separator,
+                    header.event_type,
+                    header.timestamp,
+                    header.payload_size,
+                )
+            )
+            evt = reader.read_event()
+    return headers
+
+
+@pytest.mark.parametrize("fixture", ["gt3x_file", "agdc_file_with_temperature"])
+def test_scan_records_matches_read_event(fixture, request):
+    file_name = request.getfixturevalue(fixture)
+    index = scan_records(read_log(file_name))
+    expected = read_headers(file_name)
+    assert len(index) == len(expected)
+    assert (
+        list(
+            zip(
+                index["separator"].tolist(),
+                index["type"].tolist(),
+                index["timestamp"].tolist(),
+                index["payload_size"].tolist(),
+            )
+        )
+        == expected
+    )
+    sizes = index["payload_size"].astype(np.int64) + 9
+    assert (index["offset"][1:] == np.cumsum(sizes)[:-1]).all()
+
+
+def test_scan_records_truncated():
+    record = bytes([0x1E, 0x1B, 1, 0, 0, 0, 2, 0, 0xAA, 0xBB, 0x00])
+    assert len(scan_records(record * 2)) == 2
+    assert len(scan_records(record * 2 + record[:-1])) == 2
+    assert len(scan_records(b"")) == 0
+
+
+def test_validate_checksums(gt3x_file):
+    buffer = bytearray(read_log(gt3x_file))
+    index = scan_records(buffer)
+    assert validate_checksums(buffer, index).all()
+    # Corrupt the payload of the second record and the checksum of the last one
+    buffer[int(index["offset"][1]) + 8] ^= 0x01
+    last = index[-1]
+    buffer[int(last["offset"]) + 8 + int(last["payload_size"])] ^= 0x01
+    is_valid = validate_checksums(buffer, index)
+    assert np.flatnonzero(~is_valid).tolist() == [1, len(index) - 1]
+    assert validate_checksums(buffer, index[2:-1]).all()
+    assert not validate_checksums(buffer, index[1:2]).any()
+
+
+def test_skip_checksum_verification(agdc_file):
+    with FileReader(agdc_file) as reader:
+        expected = reader.to_pandas()
+    with FileReader(agdc_file, verify_checksums=False) as reader:
+        df = reader.to_pandas()
+    assert df.equals(expected)
+
+
+def test_sidecar_index(agdc_file, tmp_path):
+    index = scan_records(read_log(agdc_file))
+    file_name = str(tmp_path / "log.idx")
+    assert load_index(file_name, 1, 2) is None
+    save_index(file_name, index, 1, 2)
+    np.testing.assert_array_equal(load_index(file_name, 1, 2), index)
+    assert load_index(file_name, 1, 3) is None
+
+
+def test_partition_records():
+    index = np.zeros(12, dtype=RECORD_DTYPE)
+    index["type"] = Types.Activity2.value
+    index["payload_size"] = 180
+    index["timestamp"] = [10, 11, 12, 13, 12, 14, 15, 16, 20, 21, 22, 23]
+    # An idle sleep mode event and a temperature record
+    index["type"][8] = Types.Event.value
+    index["type"][10] = Types.TemperatureRecord.value
+    index["timestamp"][10] = 5
+    types = [Types.Activity2.value, Types.Event.value]
+    # 3 and 5 are around 4, which travels back to 12, 9 follows an event and 11
+    # skips a second
+    assert partition_records(index, 12, types) == [0, 1, 2, 6, 7]
+    assert partition_records(index, 2, types) == [0, 6]
+    assert partition_records(index, 1, types) == [0]
@@ -0,0 +1,308 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.synthetic import IDLE_START, START_TIME, rewrite_log, write_archive
+from pygt3x import reader as reader_module
+from pygt3x.activity_payload import SAMPLE_DTYPE
+from pygt3x.log_index import ACTIVITY_TYPES
+from pygt3x.reader import FileReader, _DuplicateFilter
+
+
+def make_record(timestamp, value, sample_rate=4):
+    record = np.zeros(sample_rate, dtype=SAMPLE_DTYPE)
+    record["timestamp"] = timestamp
+    record["sample"] = np.arange(sample_rate)
+    for axis in ["x", "y", "z"]:
+        record[axis] = value
+    return record
+
+
+def test_remove_duplicates():
+    records = [
+        make_record(12, 1),
+        make_record(10, 2),
+        make_record(12, 1),
+        make_record(12, 3),
+        make_record(11, 4),
+        make_record(12, 1),
+        make_record(11, 4),
+    ]
+    unique, duplicated = _DuplicateFilter().filter(records)
+    assert [r["timestamp"][0] for r in unique] == [12, 10, 12, 11]
+    assert [r["x"][0] for r in unique] == [1, 2, 3, 4]
+    assert len(duplicated) == 2
+    assert unique[0] is records[0]
+
+
+@pytest.mark.parametrize(
+    "fixture, seconds",
+    [("ism_enabled_file", 7), ("agdc_file_with_temperature", 600), ("v1_file", 100)],
+)
+def test_iter_chunks(fixture, seconds, request, monkeypatch):
+    file_name = request.getfixturevalue(fixture)
+    with FileReader(file_name) as reader:
+        expected = reader.to_pandas()
+        expected_temperature = reader.temperature
+    # Make sure chunks are produced while the log is being read
+    monkeypatch.setattr(reader_module, "CHUNK_READ_SIZE", 1000)
+    monkeypatch.setattr(reader_module, "MAX_TIME_TRAVEL", 0)
+    with FileReader(file_name, lazy=True) as reader:
+        assert len(reader.acceleration) == 0
+        chunks = list(reader.iter_chunks(seconds=seconds))
+        np.testing.assert_array_equal(reader.temperature, expected_temperature)
+    assert all(len(chunk) <= seconds * reader.info.sample_rate for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks), expected)
+
+
+@pytest.mark.parametrize("fixture", ["ism_enabled_file", "agdc_file_with_temperature"])
+def test_time_range(fixture, request, tmp_path):
+    file_name = request.getfixturevalue(fixture)
+    with FileReader(file_name) as reader:
+        expected = reader.to_pandas()
+        expected_temperature = reader.temperature_to_pandas()
+    timestamps = expected.index
+    start = timestamps[len(timestamps) // 3] // 1 + 0.5
+    end = timestamps[len(timestamps) // 2] // 1
+    index_file = str(tmp_path / "index")
+    for _ in range(2):
+        with FileReader(
+            file_name, start=start, end=end, index_file=index_file
+        ) as reader:
+            df = reader.to_pandas()
+            temperature = reader.temperature_to_pandas()
+        pd.testing.assert_frame_equal(
+            df, expected[(timestamps >= start) & (timestamps < end)]
+        )
+        pd.testing.assert_frame_equal(
+            temperature,
+            expected_temperature[
+                (expected_temperature.index >= start)
+                & (expected_temperature.index < end)
+            ],
+        )
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_time_range_trailing_idle_sleep_mode(workers, ism_enabled_file):
+    # The recording ends in idle sleep mode, from about 179 s on
+    with FileReader(ism_enabled_file) as reader:
+        expected = reader.to_pandas()
+    timestamps = expected.index
+    for start, end in [(196, 203), (247, 278), (-4, 248)]:
+        start, end = timestamps[0] + start, timestamps[0] + end
+        with FileReader(
+            ism_enabled_file, start=start, end=end, workers=workers
+        ) as reader:
+            df = reader.to_pandas()
+        assert df["IdleSleepMode"].any()
+        pd.testing.assert_frame_equal(
+            df, expected[(timestamps >= start) & (timestamps < end)]
+        )
+
+
+def corrupt_before_idle_sleep_mode(index, records):
+    # The last activity record before idle sleep mode, which holds the fill values
+    (position,) = np.flatnonzero(
+        np.isin(index["type"], ACTIVITY_TYPES)
+        & (index["timestamp"] == START_TIME + IDLE_START - 1)
+    )
+    records[position][-1] ^= 0xFF
+    return records
+
+
+def travel_back_in_time(index, records):
+    # A record of second 3005, with other values, is logged after second 3010
+    position = {t: i for i, t in enumerate(index["timestamp"].tolist())}
+    record = bytearray(records[position[START_TIME + 3020]])
+    record[2:6] = (START_TIME + 3005).to_bytes(4, "little")
+    record[-1] = 0
+    record[-1] = ~np.bitwise_xor.reduce(np.frombuffer(bytes(record), np.uint8)) & 0xFF
+    records.insert(position[START_TIME + 3010] + 1, record)
+    return records
+
+
+@pytest.mark.parametrize(
+    "transform, start, end",
+    [
+        (corrupt_before_idle_sleep_mode, 2000, 2100),
+        (travel_back_in_time, 3008, 3030),
+        (travel_back_in_time, 2990, 3008),
+    ],
+)
+def test_time_range_damaged_log(transform, start, end, tmp_path, caplog):
+    file_name = str(tmp_path / "synthetic.gt3x")
+    write_archive(file_name, 3600, 30)
+    damaged_file = str(tmp_path / "damaged.gt3x")
+    rewrite_log(file_name, damaged_file, transform)
+    with FileReader(damaged_file) as reader:
+        expected = reader.to_pandas()
+    start, end = START_TIME + start, START_TIME + end
+    expected = expected[(expected.index >= start) & (expected.index < end)]
+    assert len(expected) >= (end - start) * 30
+    index_file = str(tmp_path / "index")
+    for _ in range(2):
+        with FileReader(
+            damaged_file, start=start, end=end, index_file=index_file
+        ) as reader:
+            pd.testing.assert_frame_equal(reader.to_pandas(), expected)
+    assert "Idle sleep mode was not active" not in caplog.text
+
+
+def travel_over_gap(index, records):
+    # A record of second 3004 is logged after second 3010, with 3006-3008 missing
+    records = travel_back_in_time(index, records)
+    position = {t: i for i, t in enumerate(index["timestamp"].tolist())}
+    record = records[position[START_TIME + 3010] + 1]
+    record[2:6] = (START_TIME + 3004).to_bytes(4, "little")
+    record[-1] = 0
+    record[-1] = ~np.bitwise_xor.reduce(np.frombuffer(bytes(record), np.uint8)) & 0xFF
+    for second in [3006, 3007, 3008]:
+        records[position[START_TIME + second]] = b""
+    return records
+
+
+@pytest.mark.parametrize("transform", [travel_back_in_time, travel_over_gap])
+def test_iter_chunks_time_travel(transform, tmp_path, monkeypatch):
+    file_name = str(tmp_path / "synthetic.gt3x")
+    write_archive(file_name, 3600, 30)
+    damaged_file = str(tmp_path / "damaged.gt3x")
+    rewrite_log(file_name, damaged_file, transform)
+    with FileReader(damaged_file) as reader:
+        expected = reader.to_pandas()
+    monkeypatch.setattr(reader_module, "CHUNK_READ_SIZE", 1000)
+    monkeypatch.setattr(reader_module, "MAX_TIME_TRAVEL", 20)
+    for seconds in range(3, 12):
+        with FileReader(damaged_file, lazy=True) as reader:
+            chunks = list(reader.iter_chunks(seconds=seconds))
+        # A second logged twice counts as two seconds
+        assert all(len(np.unique(chunk.index // 1)) <= seconds for chunk in chunks)
+        pd.testing.assert_frame_equal(pd.concat(chunks), expected)
+
+
+def test_acceleration_cached(agdc_file_with_temperature):
+    with FileReader(agdc_file_with_temperature) as reader:
+        acceleration = reader.acceleration
+        assert reader.acceleration is acceleration
+        assert acceleration.shape == (len(reader.samples), 5)
+        reader.samples = reader.samples[:10]
+        assert len(reader.acceleration) == 10
+        with pytest.warns(DeprecationWarning):
+            reader.acceleration = acceleration
+        assert reader.acceleration is acceleration
+
+
+def test_to_pandas_dtype(ism_enabled_file, monkeypatch):
+    # Convert over several blocks
+    monkeypatch.setattr(reader_module, "CONVERT_BLOCK_SIZE", 1000)
+    with FileReader(ism_enabled_file) as reader:
+        df = reader.to_pandas()
+        df64 = reader.to_pandas(dtype=np.float64)
+        assert (df.dtypes == ["float32", "float32", "float32", "bool"]).all()
+        assert (df64.dtypes == ["float64", "float64", "float64", "bool"]).all()
+        pd.testing.assert_frame_equal(df64.astype(df.dtypes), df)
+        expected = pd.DataFrame(
+            reader.calibrate_acceleration(reader.acceleration[:, 1:4]),
+            columns=["X", "Y", "Z"],
+            index=pd.Index(reader.acceleration[:, 0], name="Timestamp"),
+        )
+        pd.testing.assert_frame_equal(df64[["X", "Y", "Z"]], expected)
+
+        # Samples out of order are sorted by time
+        reader.samples = reader.samples[::-1]
+        pd.testing.assert_frame_equal(reader.to_pandas(), df)
+
+
+def test_cache(agdc_file_with_temperature, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    with FileReader(agdc_file_with_temperature) as reader:
+        expected = reader.to_pandas()
+        expected_temperature = reader.temperature_to_pandas()
+        info = reader.info
+    for _ in range(2):
+        with FileReader(agdc_file_with_temperature, cache_dir=cache_dir) as reader:
+            pd.testing.assert_frame_equal(reader.to_pandas(), expected)
+            pd.testing.assert_frame_equal(
+                reader.temperature_to_pandas(), expected_temperature
+            )
+            assert reader.info == info
+        # The second read comes from the cache
+        monkeypatch.setattr(FileReader, "_get_data", None)
+    assert isinstance(reader.samples, np.memmap)
+
+    start = float(expected.index[1000])
+    end = float(expected.index[5000])
+    with FileReader(
+        agdc_file_with_temperature, cache_dir=cache_dir, start=start, end=end
+    ) as reader:
+        pd.testing.assert_frame_equal(reader.to_pandas(), expected.iloc[1000:5000])
+
+
+def test_sample_counts(monkeypatch):
+    reader = FileReader("unused.gt3x")
+    monkeypatch.setattr(reader, "info", SimpleNamespace(sample_rate=4), raising=False)
+    samples = np.concatenate(
+        [make_record(10, 1), make_record(11, 1, 3), make_record(12, 1, 2)]
+        + [make_record(13, 1), make_record(14, 1, 5), make_record(20, 1, 1)]
+    )
+    reader._validate_sample_counts(samples)
+    # Out of order samples are counted the same way
+    reader._validate_sample_counts(samples[::-1])
+    summary = reader.sample_counts
+    assert summary.seconds == 12
+    assert summary.short_seconds == 6
+    assert summary.long_seconds == 2
+    assert summary.short_ranges == [(11, 13), (20, 21), (11, 13), (20, 21)]
+    assert summary.long_ranges == [(14, 15), (14, 15)]
+
+
+def test_skip_sample_count_validation(v1_file):
+    with FileReader(v1_file) as reader:
+        assert reader.sample_counts.short_ranges == [(637756581, 637756582)]
+    with FileReader(v1_file, validate_sample_counts=False) as reader:
+        assert reader.sample_counts is None
+
+
+@pytest.mark.parametrize(
+    "fixture",
+    [
+        "gt3x_file",
+        "agdc_file",
+        "agdc_file_with_temperature",
+        "ism_enabled_file",
+        "ism_disabled_file",
+        "synthetic_file",
+    ],
+)
+@pytest.mark.parametrize("fill_idle_sleep_mode", [True, False])
+def test_workers(fixture, fill_idle_sleep_mode, request):
+    file_name = request.getfixturevalue(fixture)
+    streams = ["acceleration", "temperature", "battery", "epoch"]
+    options = dict(streams=streams, fill_idle_sleep_mode=fill_idle_sleep_mode)
+    with FileReader(file_name, **options) as reader:
+        expected = reader.to_pandas()
+        expected_segments = reader.idle_sleep_mode_segments
+        expected_temperature = reader.temperature
+        expected_events = reader.events
+        expected_activated = reader.idle_sleep_mode_activated
+    with FileReader(file_name, workers=3, collect_stats=True, **options) as reader:
+        pd.testing.assert_frame_equal(reader.to_pandas(), expected)
+        np.testing.assert_array_equal(
+            reader.idle_sleep_mode_segments, expected_segments
+        )
+        np.testing.assert_array_equal(reader.temperature, expected_temperature)
+        for stream in ["battery", "epoch"]:
+            np.testing.assert_array_equal(
+                reader.events[stream], expected_events[stream]
+            )
+        assert reader.idle_sleep_mode_activated == expected_activated
+        assert reader.stats.samples == len(expected)
+
+
+@pytest.fixture
+def synthetic_file(tmp_path):
+    file_name = str(tmp_path / "synthetic.agdc")
+    write_archive(file_name, 3 * 3600, 30, "agdc")
+    return file_name
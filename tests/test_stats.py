@@ -0,0 +1,65 @@
+import pytest
+
+from tests.synthetic import IDLE_SECONDS, write_archive
+from pygt3x.reader import FileReader
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_collect_stats(lazy, tmp_path):
+    file_name = str(tmp_path / "synthetic.agdc")
+    seconds = 3000
+    write_archive(file_name, seconds, 30, "agdc")
+    with FileReader(file_name, lazy=lazy, collect_stats=True) as reader:
+        if lazy:
+            chunks = list(reader.iter_chunks(seconds=600))
+            num_samples = sum(len(df) for df in chunks)
+        else:
+            num_samples = len(reader.to_pandas())
+        stats = reader.stats
+    assert stats.samples == num_samples == seconds * 30
+    assert stats.idle_sleep_mode_samples == IDLE_SECONDS * 30
+    assert stats.record_counts == {
+        "Params": 1,
+        "Event": 2,
+        "Activity3": seconds - IDLE_SECONDS,
+        "TemperatureRecord": seconds // 4,
+    }
+    assert stats.bytes_read > 0
+    assert stats.duplicates_removed == 0
+    assert stats.checksum_failures == 0
+    assert {
+        "inflate",
+        "scan",
+        "checksums",
+        "decode",
+        "parse",
+        "deduplicate",
+        "join",
+        "validate",
+        "to_pandas",
+    } <= set(stats.stage_seconds)
+    assert all(t >= 0 for t in stats.stage_seconds.values())
+
+
+def test_stats_disabled(ism_enabled_file):
+    with FileReader(ism_enabled_file) as reader:
+        assert reader.stats is None
+
+
+def test_stats_counters(ism_enabled_file, tmp_path):
+    with FileReader(ism_enabled_file) as reader:
+        expected = len(reader.samples)
+    with FileReader(ism_enabled_file, collect_stats=True) as reader:
+        stats = reader.stats
+    assert stats.samples == expected
+    assert stats.bytes_read == reader.zipfile.getinfo("log.bin").file_size
+    cache_dir = str(tmp_path / "cache")
+    for _ in range(2):
+        with FileReader(
+            ism_enabled_file, cache_dir=cache_dir, collect_stats=True
+        ) as reader:
+            stats = reader.stats
+    # The second read comes from the cache
+    assert "cache" in stats.stage_seconds
+    assert "decode" not in stats.stage_seconds
+    assert stats.samples == expected
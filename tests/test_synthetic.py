@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from tests.synthetic import (
+    IDLE_SECONDS,
+    IDLE_START,
+    START_TIME,
+    synthetic_acceleration,
+    write_archive,
+)
+from pygt3x import Types
+from pygt3x.reader import FileReader
+
+
+@pytest.mark.parametrize(
+    "format, activity_type",
+    [
+        ("gt3x", Types.Activity),
+        ("gt3x", Types.Activity2),
+        ("agdc", Types.Activity3),
+    ],
+)
+def test_write_archive(format, activity_type, tmp_path, caplog):
+    file_name = str(tmp_path / f"synthetic.{format}")
+    seconds = 3000
+    write_archive(file_name, seconds, 30, format, activity_type)
+    with FileReader(file_name, fill_idle_sleep_mode=False) as reader:
+        assert reader.idle_sleep_mode_activated
+        assert reader.info.sample_rate == 30
+        samples = reader.samples
+        segments = reader.idle_sleep_mode_segments
+        assert (reader.temperature.shape[0] > 0) == (format == "agdc")
+        assert reader.sample_counts.short_seconds == 0
+    assert "checksum" not in caplog.text
+    assert segments["start"].tolist() == [START_TIME + IDLE_START]
+    assert segments["end"].tolist() == [START_TIME + IDLE_START + IDLE_SECONDS]
+    assert len(samples) == (seconds - IDLE_SECONDS) * 30
+    if activity_type != Types.Activity3:
+        timestamps = START_TIME + np.arange(seconds)
+        scale = 341 if activity_type == Types.Activity else 256
+        expected = synthetic_acceleration(timestamps, 30, scale, 0)
+        is_active = np.ones(seconds, dtype=bool)
+        is_active[IDLE_START : IDLE_START + IDLE_SECONDS] = False
+        expected = expected[is_active].reshape((-1, 3))
+        for i, axis in enumerate(["x", "y", "z"]):
+            np.testing.assert_array_equal(samples[axis], expected[:, i])